@@ -0,0 +1,474 @@
+"""
+Toplu senaryo motoru: K küçük hat varyantını tek process'te, tek bir
+vektörel durum üzerinde yan yana simüle eder.
+
+Paket ve feeder durumları (pozisyon, boy, kuyruk, bloke süresi) senaryo
+boyutlu NumPy dizilerinde tutulur; her zaman adımında tek bir vektörel
+işlem tüm senaryoları farklı hız ve üretim oranlarıyla ilerletir.
+
+Bu motor SimPy olay motorunun sabit adımlı bir yaklaşığıdır (adım =
+ConveyorLine.step_time): lider takibi, segment geçişi ve feeder giriş
+penceresi aynı kurallarla, fakat adım sınırlarında hesaplanır. Sonuçlar
+sıralı koşuyla birebir aynı değildir; geniş parametre taramalarında
+eleme (screening) içindir, RunStore önbelleğine yazılmaz.
+
+Desteklenmeyenler: ZPA segmentleri, hız programı, arızalar, ayırıcılar
+ve fifo dışındaki merge politikaları. policy = "none" ile feeder'lar config
+sırasıyla, "fifo" ile her senaryoda kuyruk başı paketi en eski olandan
+başlayarak aktarım dener (kuyruktaki paketlerin üretim zamanları feeder
+başına halka tamponda tutulur). Hakemin boşluk açılınca tur açması
+modellenmez; denemeler aktarım aralığındadır.
+
+KPI isimleri ve tanımları MultiSegmentSimulation.collect_kpis ile aynıdır
+(doluluk paket boyu + min_gap, tek "nominal" hız rejimi); desteklenmeyen
+bölümlerin KPI'ları (sorter, faults, ...) zaten üretilmez.
+
+Bilinen sapmalar: koşu sonu anlık durum KPI'ları (SNAPSHOT_KPIS: segment
+doluluğu, hattaki paket, kuyruk) tek bir andaki paket dağılımıdır; tek
+paketlik fark kısa segmentte doluluğu ~0.25 kaydırır, kuyruğu ±1 değiştirir.
+Olay motorunda paketler segment sonunda durup kendi fazlarıyla ilerler,
+burada ortak adım ızgarasındadır; bloke olay sayıları da adım sınırlarına
+yuvarlanır. Süre boyunca biriken KPI'lar (throughput, aktarım, bloke oranı)
+bu sapmalardan çok daha az etkilenir.
+"""
+
+import numpy as np
+from typing import List
+
+
+UNSUPPORTED_SECTIONS = ("speed_schedule", "faults", "diverters")
+BATCH_MERGE_POLICIES = ("none", "fifo")
+
+# Koşu sonu anlık durum KPI'ları (isim sonekleri): tek paketlik farkla
+# toleransı aşabilir, bkz. modül notu
+SNAPSHOT_KPIS = ("utilization", "current_queue", "packets_in_transit", "occupied_length")
+
+
+def unsupported_reason(config: dict) -> str:
+    """Config toplu motorda koşulamıyorsa nedenini, koşulabiliyorsa boş string döndürür"""
+    sections = [name for name in UNSUPPORTED_SECTIONS if config.get(name)]
+    if sections:
+        return f"desteklenmeyen bölümler: {', '.join(sections)}"
+    if config.get('latency', {}).get('enabled', False):
+        return "gecikme dağılımları (paket bazında olay gerekir)"
+    if config.get('interference', {}).get('enabled', False):
+        return "bloke kök neden ataması (paket bazında olay gerekir)"
+    merge_cfg = config.get('merge', {})
+    if merge_cfg.get('mode', 'poll') != 'poll':
+        return "öngörülü merge"
+    if merge_cfg.get('policy', 'none') not in BATCH_MERGE_POLICIES:
+        return f"merge politikası: {merge_cfg['policy']}"
+    if any(s.get('type', 'continuous') != 'continuous' for s in config.get('conveyor_segments', [])):
+        return "ZPA segmenti"
+    if not config.get('conveyor_segments'):
+        return "segment yok"
+    return ""
+
+
+class BatchedLineEngine:
+    """
+    K senaryoyu paylaşılan vektörel durumla simüle eder.
+
+    Kullanım:
+        engine = BatchedLineEngine([config_1, config_2, ...], duration=120.0)
+        results = engine.run()      # Senaryo başına KPI sözlüğü
+    """
+
+    def __init__(self, configs: List[dict], duration: float = None,
+                 step_time: float = 0.1, transfer_interval: float = 0.5, seed: int = 0):
+        """
+        Args:
+            configs: Senaryo config'leri (MultiSegmentSimulation ile aynı yapı)
+            duration: Simülasyon süresi (None ise ilk config'deki)
+            step_time: Vektörel zaman adımı (saniye)
+            transfer_interval: Feeder aktarım denemesi aralığı (saniye)
+            seed: Paket tipi seçimi için rastgelelik tohumu
+        """
+        for i, config in enumerate(configs):
+            reason = unsupported_reason(config)
+            if reason:
+                raise ValueError(f"Senaryo {i} toplu motorda koşulamaz: {reason}")
+        if not configs:
+            raise ValueError("En az bir senaryo gerekli")
+
+        self.configs = configs
+        self.duration = duration if duration is not None else configs[0]['simulation']['duration']
+        self.step_time = step_time
+        self.transfer_every = max(1, round(transfer_interval / step_time))
+        self.rng = np.random.default_rng(seed)
+
+        K = len(configs)
+        S = max(len(c['conveyor_segments']) for c in configs)
+        F = max(1, max(len(c.get('feeders', [])) for c in configs))
+        M = max([1] + [len(f.get('packet_mix') or []) for c in configs for f in c.get('feeders', [])])
+        self.K, self.S, self.F = K, S, F
+
+        # Segmentler [K, S]; kısa senaryolar hat sonunda sıfır boylu segmentlerle doldurulur
+        self.seg_start = np.zeros((K, S))
+        self.seg_length = np.zeros((K, S))
+        self.seg_speed = np.ones((K, S))
+        self.total_length = np.zeros(K)
+        self.min_gap = np.zeros(K)
+        self.segment_ids: List[List[str]] = []
+        self.segment_count = np.zeros(K, dtype=np.int64)
+
+        # Feeder'lar [K, F]; eksik feeder'lar üretim oranı 0 ile pasif
+        self.feeder_active = np.zeros((K, F), dtype=bool)
+        self.entry = np.zeros((K, F))
+        self.interval = np.full((K, F), np.inf)
+        self.max_queue = np.zeros((K, F), dtype=np.int64)
+        self.mix_length = np.zeros((K, F, M))
+        self.mix_cum = np.ones((K, F, M))
+        self.feeder_ids: List[List[str]] = []
+        # fifo senaryoları: feeder'lar kuyruk başı paketin üretim zamanına göre denenir
+        self.fifo = np.array([c.get('merge', {}).get('policy', 'none') == 'fifo' for c in configs])
+
+        min_spacing = np.inf
+        for k, config in enumerate(configs):
+            pkt_cfg = config.get('packet', {})
+            gap = pkt_cfg.get('min_gap', 0.5)
+            default_length = pkt_cfg.get('default_length', 0.3)
+            types = pkt_cfg.get('types', {})
+            self.min_gap[k] = gap
+
+            offset = 0.0
+            ids = []
+            for s, seg_cfg in enumerate(config['conveyor_segments']):
+                self.seg_start[k, s] = offset
+                self.seg_length[k, s] = seg_cfg['length']
+                self.seg_speed[k, s] = seg_cfg['speed']
+                offset += seg_cfg['length']
+                ids.append(seg_cfg['id'])
+            self.seg_start[k, len(ids):] = offset
+            self.seg_speed[k, len(ids):] = self.seg_speed[k, len(ids) - 1]
+            self.total_length[k] = offset
+            self.segment_ids.append(ids)
+            self.segment_count[k] = len(ids)
+
+            fids = []
+            for f, feeder_cfg in enumerate(config.get('feeders', [])):
+                segment_idx = feeder_cfg.get('connection_segment', 0)
+                entry = (self.seg_start[k, segment_idx] + feeder_cfg.get('connection_offset', 0.0)
+                         if 0 <= segment_idx < len(ids) else 0.0)
+                self.entry[k, f] = max(0.0, min(entry, offset - 0.1))
+                self.interval[k, f] = 1.0 / feeder_cfg['production_rate']
+                self.max_queue[k, f] = feeder_cfg.get('max_queue_size', 100)
+                self.feeder_active[k, f] = True
+                fids.append(feeder_cfg['id'])
+
+                mix = [types[name] for name in feeder_cfg.get('packet_mix') or [] if name in types]
+                if mix:
+                    weights = np.array([t.get('weight', 1.0) for t in mix])
+                    lengths = [t.get('length', default_length) for t in mix]
+                    self.mix_length[k, f, :len(mix)] = lengths
+                    self.mix_length[k, f, len(mix):] = lengths[-1]
+                    self.mix_cum[k, f, :len(mix)] = np.cumsum(weights) / weights.sum()
+                    min_spacing = min(min_spacing, min(lengths) + gap)
+                else:
+                    self.mix_length[k, f, :] = default_length
+                    min_spacing = min(min_spacing, default_length + gap)
+            self.feeder_ids.append(fids)
+
+        # Paket yuvaları [K, P]: min aralıkla hatta sığabilecek en fazla paket
+        P = int(self.total_length.max() / min_spacing) + 2 if np.isfinite(min_spacing) else 1
+        self.P = P
+        self.pos = np.full((K, P), -np.inf)
+        self.length = np.zeros((K, P))
+        self.active = np.zeros((K, P), dtype=bool)
+        # Paketin düz segment index'i; sadece segment sonunu geçince artırılır
+        self.seg_index = np.zeros((K, P), dtype=np.int64)
+
+        # Feeder durumu
+        self.queue = np.zeros((K, F), dtype=np.int64)
+        self.head_length = self._draw_lengths()
+        self.next_production = np.zeros((K, F))
+        self.total_produced = np.zeros((K, F), dtype=np.int64)
+        # Kuyruktaki paketlerin üretim zamanları: halka tampon [K, F, Q]
+        Q = int(self.max_queue.max()) if self.fifo.any() else 1
+        self.queue_created = np.full((K, F, max(Q, 1)), np.inf)
+        self.queue_head = np.zeros((K, F), dtype=np.int64)
+        # fifo senaryolarının merge KPI'ları (MergeArbiter ile aynı tanımlar)
+        self.contested_grants = np.zeros((K, F), dtype=np.int64)
+        self.total_merge_wait = np.zeros((K, F))
+        self.total_transferred = np.zeros((K, F), dtype=np.int64)
+        self.is_blocked = np.zeros((K, F), dtype=bool)
+        self.last_block_time = np.zeros((K, F))
+        self.total_blocked_time = np.zeros((K, F))
+        self.block_events = np.zeros((K, F), dtype=np.int64)
+
+        self.total_processed = np.zeros(K, dtype=np.int64)
+        # Segment sonundan çıkan paket sayısı (rejim throughput'u için)
+        self.segment_exits = np.zeros(K * S, dtype=np.int64)
+        self.now = 0.0
+
+        # Düzleştirilmiş segment tablosu: her senaryo satırı hat boyundan büyük
+        # bir kaydırmayla ayrılır; tüm paketlerin segmenti tek searchsorted ile
+        # bulunur ve hız/segment sonu düz index'le okunur
+        self._row_shift = (np.arange(K) * (self.total_length.max() + 1.0))[:, None]
+        self._flat_starts = (self.seg_start + self._row_shift).ravel()
+        self._flat_speed = self.seg_speed.ravel()
+        self._flat_end = (self.seg_start + self.seg_length).ravel()
+        self._row_first_segment = (np.arange(K) * S)[:, None]
+        self._row_first_slot = (np.arange(K) * P)[:, None]
+        self.seg_index += self._row_first_segment
+        # Düz index'in senaryonun gerçek segmenti olup olmadığı (dolgu değil)
+        self._flat_real = (np.arange(S)[None, :] < self.segment_count[:, None]).ravel()
+
+    def _draw_lengths(self) -> np.ndarray:
+        """Her feeder için bir sonraki paketin boyunu karışım ağırlıklarıyla çeker [K, F]"""
+        u = self.rng.random((self.K, self.F))
+        index = (u[..., None] >= self.mix_cum).sum(axis=-1).clip(max=self.mix_length.shape[2] - 1)
+        return np.take_along_axis(self.mix_length, index[..., None], axis=-1)[..., 0]
+
+    def _segment_index(self, positions: np.ndarray) -> np.ndarray:
+        """Pozisyonların düz segment index'leri [K, P] (satır * S + segment)"""
+        flat = np.searchsorted(self._flat_starts, (positions + self._row_shift).ravel(), side='right') - 1
+        flat = flat.reshape(positions.shape)
+        return flat.clip(self._row_first_segment, self._row_first_segment + self.S - 1)
+
+    def _produce(self, now: float):
+        """Üretim zamanı gelen feeder'lar kuyruğa paket ekler (dolu kuyrukta atılır)"""
+        due = self.feeder_active & (self.next_production <= now + 1e-9)
+        if not due.any():
+            return
+        count = np.where(due, np.floor((now + 1e-9 - self.next_production) / self.interval) + 1, 0)
+        count = count.astype(np.int64)
+        self.total_produced += count
+        accepted = np.minimum(count, self.max_queue - self.queue)
+        if self.fifo.any():
+            Q = self.queue_created.shape[2]
+            for i in range(int(accepted.max(initial=0))):
+                k, f = np.nonzero(accepted > i)
+                tail = (self.queue_head[k, f] + self.queue[k, f] + i) % Q
+                self.queue_created[k, f, tail] = self.next_production[k, f] + i * self.interval[k, f]
+        self.queue += accepted
+        self.next_production += count * self.interval
+
+    def _window_free(self) -> np.ndarray:
+        """Feeder'ların kuyruk başı paketinin giriş penceresinde yer var mı [K, F]"""
+        entry = self.entry[:, :, None]
+        pos, length, active = self.pos[:, None, :], self.length[:, None, :], self.active[:, None, :]
+        front = np.where(active & (pos < entry), pos + length / 2, -np.inf).max(axis=2)
+        back = np.where(active & (pos >= entry), pos - length / 2, np.inf).min(axis=2)
+        half = self.head_length / 2
+        gap = self.min_gap[:, None]
+        return (self.entry - half - front >= gap) & (back - (self.entry + half) >= gap)
+
+    def _transfer(self, now: float, eligible: np.ndarray = None):
+        """
+        Kuyruklu feeder'lar giriş penceresinde yer varsa bir paket aktarır.
+        Feeder'lar config sırasıyla (fifo senaryolarında kuyruk başı paketi
+        en eski olandan başlayarak, eşitlikte config sırasıyla) denenir; her
+        aktarım sonrakilerin yer kontrolünde görünür. Her sıra için
+        senaryolar vektörel.
+
+        Args:
+            eligible: Yalnızca bu feeder'lar dener [K, F] (None ise hepsi)
+        """
+        rows = np.arange(self.K)
+        requesting = self.feeder_active & (self.queue > 0)
+        if eligible is not None:
+            requesting &= eligible
+        order_key = np.broadcast_to(np.arange(self.F, dtype=float), (self.K, self.F))
+        head_created = contested = None
+        if self.fifo.any():
+            head_created = np.take_along_axis(
+                self.queue_created, (self.queue_head % self.queue_created.shape[2])[..., None], axis=2)[..., 0]
+            order_key = np.where(self.fifo[:, None] & (self.queue > 0), head_created, np.inf)
+            order_key = np.where(self.fifo[:, None], order_key, np.arange(self.F))
+            # Tur başındaki giriş pencereleri (paket gövdesi ± min_gap/2) örtüşen
+            # başka bir bekleyen feeder varsa izin çekişmelidir (is_contested)
+            half_window = self.head_length / 2 + self.min_gap[:, None] / 2
+            lo, hi = self.entry - half_window, self.entry + half_window
+            overlap = (lo[:, :, None] < hi[:, None, :]) & (lo[:, None, :] < hi[:, :, None])
+            overlap &= requesting[:, :, None] & requesting[:, None, :] & ~np.eye(self.F, dtype=bool)
+            contested = overlap.any(axis=2)
+        order = np.argsort(order_key, axis=1, kind='stable')
+
+        for r in range(self.F):
+            f = order[:, r]
+            waiting = requesting[rows, f] & (self.queue[rows, f] > 0)
+            if not waiting.any():
+                continue
+            entry = self.entry[rows, f]
+            half = self.head_length[rows, f] / 2
+            front = np.where(self.active & (self.pos < entry[:, None]),
+                             self.pos + self.length / 2, -np.inf).max(axis=1)
+            back = np.where(self.active & (self.pos >= entry[:, None]),
+                            self.pos - self.length / 2, np.inf).min(axis=1)
+            free_slot = ~self.active.all(axis=1)
+            ok = (waiting & free_slot &
+                  (entry - half - front >= self.min_gap) &
+                  (back - (entry + half) >= self.min_gap))
+
+            if ok.any():
+                slot = np.argmin(self.active, axis=1)
+                k, fk = rows[ok], f[ok]
+                self.pos[k, slot[ok]] = entry[ok]
+                self.length[k, slot[ok]] = self.head_length[k, fk]
+                self.active[k, slot[ok]] = True
+                self.seg_index[k, slot[ok]] = self._segment_index(entry[:, None])[ok, 0]
+                if head_created is not None:
+                    self.total_merge_wait[k, fk] += now - head_created[k, fk]
+                    self.contested_grants[k, fk] += contested[k, fk]
+                self.queue[k, fk] -= 1
+                self.queue_head[k, fk] += 1
+                self.total_transferred[k, fk] += 1
+                unblocked = self.is_blocked[k, fk]
+                self.total_blocked_time[k[unblocked], fk[unblocked]] += \
+                    now - self.last_block_time[k[unblocked], fk[unblocked]]
+                self.is_blocked[k, fk] = False
+                self.head_length[k, fk] = self._draw_lengths()[k, fk]
+
+            blocked = waiting & ~ok & ~self.is_blocked[rows, f]
+            k, fk = rows[blocked], f[blocked]
+            self.is_blocked[k, fk] = True
+            self.last_block_time[k, fk] = now
+            self.block_events[k, fk] += 1
+
+    def _move(self):
+        """
+        Tüm senaryolarda tüm paketleri bir adım ilerletir.
+
+        Segment sonunu adım içinde geçen paket, kalan süreyi sonraki
+        segmentin hızıyla gider. Lider takibi öndeki paketten arkaya doğru
+        birikimli minimumla tek vektörel işlemde yapılır:
+        yeni_i + c_i = min_{j önde} (hedef_j + c_j), c = birikimli aralık.
+        Adım başında liderine dayalı paketin hedefi kendi pozisyonudur.
+        """
+        dt = self.step_time
+        pos = np.where(self.active, self.pos, 0.0)
+        index = self.seg_index
+        speed = self._flat_speed[index]
+        seg_end = self._flat_end[index]
+        next_speed = self._flat_speed[np.minimum(index + 1, self._row_first_segment + self.S - 1)]
+
+        to_end = (seg_end - pos) / speed
+        target = np.where(to_end < dt, seg_end + next_speed * (dt - to_end), pos + speed * dt)
+        target[~self.active] = -np.inf
+
+        # Önden arkaya sıralı (pasif yuvalar sonda)
+        order = np.argsort(-self.pos, axis=1, kind='stable') + self._row_first_slot
+        t_sorted = target.ravel()[order]
+        l_sorted = self.length.ravel()[order]
+        p_sorted = self.pos.ravel()[order]
+        spacing = np.zeros_like(l_sorted)
+        spacing[:, 1:] = (l_sorted[:, :-1] + l_sorted[:, 1:]) / 2 + self.min_gap[:, None]
+        c = np.cumsum(spacing, axis=1)
+        # Olay motorundaki gibi adım başında liderine dayalı paket bu adımı
+        # bekleyerek geçirir; zincir önden arkaya adım adım çözülür
+        waiting = np.zeros(p_sorted.shape, dtype=bool)
+        with np.errstate(invalid='ignore'):     # Pasif yuvalar: -inf - -inf
+            waiting[:, 1:] = p_sorted[:, :-1] - spacing[:, 1:] - p_sorted[:, 1:] <= 1e-9
+        t_sorted = np.where(waiting, p_sorted, t_sorted)
+        new_sorted = np.maximum(np.minimum.accumulate(t_sorted + c, axis=1) - c, p_sorted)
+
+        self.pos.ravel()[order] = new_sorted
+        self.pos[~self.active] = -np.inf
+
+        # Segment sonunu geçen paketlerin index'i ilerler (kısa segmentlerde birden fazla)
+        last_segment = self._row_first_segment + self.S - 1
+        crossed = self.active & (self.pos >= self._flat_end[self.seg_index]) & (self.seg_index < last_segment)
+        while crossed.any():
+            left = self.seg_index[crossed]
+            np.add.at(self.segment_exits, left[self._flat_real[left]], 1)
+            self.seg_index[crossed] += 1
+            crossed &= (self.pos >= self._flat_end[self.seg_index]) & (self.seg_index < last_segment)
+
+        exited = self.active & (self.pos >= self.total_length[:, None])
+        if exited.any():
+            # Dolgu segmenti olmayan senaryoda son segmentin çıkışı hat sonudur
+            left = self.seg_index[exited]
+            np.add.at(self.segment_exits, left[self._flat_real[left]], 1)
+            self.total_processed += exited.sum(axis=1)
+            self.active &= ~exited
+            self.pos[exited] = -np.inf
+
+    def run(self) -> List[dict]:
+        """Tüm senaryoları duration boyunca ilerletir ve KPI'larını döndürür"""
+        steps = int(round(self.duration / self.step_time))
+        for n in range(steps):
+            now = n * self.step_time
+            self._produce(now)
+            if n % self.transfer_every == 0:
+                self._transfer(now)
+            elif self.fifo.any():
+                # Hakem aktaramayan feeder'ı yalnızca penceresi açıldığı adımda yeniden dener
+                retry = self.fifo[:, None] & self.is_blocked
+                if retry.any():
+                    self._transfer(now, retry & self._window_free())
+            self._move()
+        self.now = steps * self.step_time
+        return self.collect_kpis()
+
+    def collect_kpis(self) -> List[dict]:
+        """
+        Senaryo başına, collect_kpis ile aynı isimli ve aynı tanımlı KPI
+        sözlükleri (doluluk: paket boyu + min_gap; hız programı olmadığından
+        tek "nominal" rejim).
+        """
+        now = self.now
+        index = self.seg_index - self._row_first_segment
+        blocked = self.total_blocked_time + np.where(self.is_blocked, now - self.last_block_time, 0.0)
+        exits = self.segment_exits.reshape(self.K, self.S)
+
+        results = []
+        for k in range(self.K):
+            active = self.active[k]
+            occupied_by_segment = np.bincount(index[k][active], weights=self.length[k][active] + self.min_gap[k],
+                                              minlength=self.S)
+            occupied = float(occupied_by_segment.sum())
+            total_length = self.total_length[k]
+            processed = int(self.total_processed[k])
+            kpis = {
+                'line.total_processed': processed,
+                'line.throughput': processed / now if now > 0 else 0.0,
+                'line.packets_in_transit': int(self.active[k].sum()),
+                'line.utilization': min(1.0, occupied / total_length) if total_length else 0.0,
+                'line.occupied_length': occupied,
+            }
+            for s, segment_id in enumerate(self.segment_ids[k]):
+                length = self.seg_length[k, s]
+                kpis[f'segment.{segment_id}.utilization'] = (min(1.0, occupied_by_segment[s] / length)
+                                                             if length else 0.0)
+            for s, segment_id in enumerate(self.segment_ids[k]):
+                prefix = f'segment.{segment_id}.regime.nominal'
+                kpis[f'{prefix}.duration'] = now
+                kpis[f'{prefix}.throughput'] = int(exits[k, s]) / now if now > 0 else 0.0
+                kpis[f'{prefix}.belt_distance'] = self.seg_speed[k, s] * now
+            for f, feeder_id in enumerate(self.feeder_ids[k]):
+                prefix = f"feeder.{feeder_id}"
+                transferred = int(self.total_transferred[k, f])
+                blocked_time = float(blocked[k, f])
+                kpis[f'{prefix}.total_produced'] = int(self.total_produced[k, f])
+                kpis[f'{prefix}.total_transferred'] = transferred
+                kpis[f'{prefix}.current_queue'] = int(self.queue[k, f])
+                kpis[f'{prefix}.total_blocked_time'] = blocked_time
+                kpis[f'{prefix}.blocked_ratio'] = blocked_time / now if now > 0 else 0.0
+                kpis[f'{prefix}.utilization_rate'] = (now - blocked_time) / now if now > 0 else 1.0
+                kpis[f'{prefix}.transfer_rate'] = transferred / now if now > 0 else 0.0
+                kpis[f'{prefix}.block_events'] = int(self.block_events[k, f])
+            if self.fifo[k]:
+                kpis.update(self._merge_kpis(k, now))
+            results.append(kpis)
+        return results
+
+    def _merge_kpis(self, k: int, now: float) -> dict:
+        """fifo senaryosunun merge KPI'ları (MergeArbiter.get_statistics tanımları)"""
+        feeders = range(len(self.feeder_ids[k]))
+        transferred = self.total_transferred[k]
+        ratios = [transferred[f] / self.total_produced[k, f] for f in feeders if self.total_produced[k, f] > 0]
+        square_sum = sum(r * r for r in ratios)
+        kpis = {
+            'merge.throughput': int(transferred.sum()) / now if now > 0 else 0.0,
+            'merge.fairness_index': (float(sum(ratios) ** 2 / (len(ratios) * square_sum))
+                                     if ratios and square_sum else 1.0),
+        }
+        for f, feeder_id in enumerate(self.feeder_ids[k]):
+            kpis[f'merge.{feeder_id}.contested_grants'] = int(self.contested_grants[k, f])
+            kpis[f'merge.{feeder_id}.avg_merge_wait'] = (float(self.total_merge_wait[k, f] / transferred[f])
+                                                         if transferred[f] else 0.0)
+        return kpis
+
+    def __repr__(self) -> str:
+        return f"BatchedLineEngine(K={self.K}, S={self.S}, F={self.F}, P={self.P})"
@@ -3,13 +3,49 @@ ConveyorLine: Birden fazla segment'ten oluşan konveyör hattı.
 Her segment farklı hıza sahip olabilir.
 """
 
+import math
 import simpy
-from typing import List, Optional, Tuple, Dict
+from bisect import bisect_left, bisect_right
+from typing import Callable, List, Optional, Tuple, Dict
 from .packet import Packet
+from .probes import (NO_PROBES, SEGMENT as SEGMENT_EVENT, EXIT as EXIT_EVENT, DIVERTED as DIVERTED_EVENT,
+                     RECIRCULATED as RECIRCULATED_EVENT)
+
+
+# Çıkış işleyicisinin dönüş değeri: paket hattan alındı ama hattan ayrılmış
+# sayılmaz (devridaim); işlenen paket sayılmaz, EXIT yerine RECIRCULATED yayılır
+EXIT_ABSORBED = "absorbed"
+
+
+def _position(packet: Packet) -> float:
+    return packet.position
+
+
+def _remove_packet(packets: List[Packet], packet: Packet):
+    """
+    Paketi pozisyona göre sıralı listeden çıkarır.
+    Segment/hat sonundan çıkan paket listenin son elemanıdır: O(1).
+    Aradan çıkan paket (ayırıcı) pozisyonuyla bisect ile bulunur.
+    """
+    if packets and packets[-1] is packet:
+        packets.pop()
+        return
+    i = bisect_left(packets, packet.position, key=_position)
+    while i < len(packets) and packets[i].position == packet.position:
+        if packets[i] is packet:
+            del packets[i]
+            return
+        i += 1
+    for i, p in enumerate(packets):
+        if p is packet:
+            del packets[i]
+            return
 
 
 class ConveyorSegment:
-    """Tek bir konveyör segmenti"""
+    """Tek bir konveyör segmenti (sürekli bant, paket pozisyonları adım adım izlenir)"""
+
+    kind = "continuous"
 
     def __init__(self,
                  env: simpy.Environment,
@@ -19,7 +55,8 @@ class ConveyorSegment:
                  start_offset: float,  # Hat başından itibaren bu segment'in başlangıç pozisyonu
                  min_gap: float = 0.5,
                  description: str = "",
-                 direction: str = "horizontal"):  # "horizontal" veya "vertical"
+                 direction: str = "horizontal",  # "horizontal" veya "vertical"
+                 default_packet_length: float = 0.3):  # Nominal kapasite için paket boyu
         self.env = env
         self.id = id
         self.length = length
@@ -29,14 +66,46 @@ class ConveyorSegment:
         self.min_gap = min_gap
         self.description = description
         self.direction = direction  # Segment yönü
+        self.default_packet_length = default_packet_length
+        self.index = -1  # Hattaki sırası (ConveyorLine.add_segment atar)
 
+        # Pozisyona göre artan sıralı (en arkadaki paket başta, en öndeki sonda).
+        # Sıralı paket gövdeleri arasındaki boşluklar segmentin boş bant aralıklarıdır.
         self.packets: List[Packet] = []
 
+        # Paketlerin kapladığı bant: her paket için paket boyu + min_gap (metre)
+        self._occupied_length = 0.0
+
+        # Liderine yaklaştığı için bekleyen paketlerin toplam bekleme süresi
+        self.total_accumulation_time = 0.0
+        self.total_exits = 0  # Segmentten çıkan (sonraki segmente/ayırıcıya/hattan) paket
+        self.probes = NO_PROBES   # Gözlemci veri yolu (ProbeBus.attach atar)
+
+        # Duruş (arıza/sıkışma): duruş paketlere dokunmadan O(1) uygulanır.
+        # Segment, toplam duruş süresini bir "duruş saati"nde (pause_clock)
+        # tutar; her paket adımı bittiğinde adım boyunca geçen duruşu bu
+        # saatten okuyup yolundan düşer.
+        self._stop_depth = 0                    # İç içe duruş sayısı
+        self._stopped_since = 0.0
+        self._paused_total = 0.0
+        self._resume_event: Optional[simpy.Event] = None
+        self.stop_count = 0
+
+        # Hız rejimleri: rejim adı -> {süre, segmentten çıkan paket, bant yolu}
+        self.regime = "nominal"
+        self._regime_since = env.now
+        self._regime_pause_mark = 0.0
+        self.regime_stats: Dict[str, dict] = {}
+
     @property
     def capacity(self) -> int:
-        """Segment kapasitesi"""
-        packet_length = 0.3
-        return int(self.length / (packet_length + self.min_gap))
+        """Nominal segment kapasitesi (varsayılan boyda paket sayısı)"""
+        return int(self.length / (self.default_packet_length + self.min_gap))
+
+    @property
+    def occupied_length(self) -> float:
+        """Segmentteki paketlerin kapladığı bant uzunluğu (metre, min_gap dahil)"""
+        return self._occupied_length
 
     def get_local_position(self, global_position: float) -> float:
         """Global pozisyonu segment-lokal pozisyona çevirir"""
@@ -51,25 +120,374 @@ class ConveyorSegment:
         return self.start_offset <= global_position < self.end_offset
 
     def has_space_at(self, global_position: float, packet_length: float = 0.3) -> bool:
-        """Belirtilen global pozisyonda yer var mı?"""
-        req_space = packet_length + self.min_gap
+        """Belirtilen global pozisyonda yer var mı? (sadece en yakın komşulara bakar)"""
+        i = bisect_left(self.packets, global_position, key=_position)
+        for p in self.packets[max(0, i - 1):i + 1]:
+            req_space = (p.length + packet_length) / 2 + self.min_gap
+            if abs(p.position - global_position) < req_space:
+                return False
+        return True
+
+    def insert_packet(self, packet: Packet):
+        """Paketi pozisyon sırasını koruyarak segmente ekler"""
+        self.packets.insert(bisect_left(self.packets, packet.position, key=_position), packet)
+        self._occupied_length += packet.length + self.min_gap
+        if self.probes.handlers[SEGMENT_EVENT]:
+            self.probes.emit(SEGMENT_EVENT, packet, self.index)
+
+    def remove_packet(self, packet: Packet):
+        """Paketi segmentten çıkarır"""
+        _remove_packet(self.packets, packet)
+        self._occupied_length -= packet.length + self.min_gap
+        if not self.packets:
+            self._occupied_length = 0.0  # Kayan nokta birikimini sıfırla
+        self.total_exits += 1
+        self._regime_entry()['exits'] += 1
+
+    def _regime_entry(self) -> dict:
+        return self.regime_stats.setdefault(
+            self.regime, {'duration': 0.0, 'exits': 0, 'belt_distance': 0.0})
 
+    def _close_regime(self):
+        """Mevcut rejimin süresini ve bant yolunu şimdiye kadar biriktirir"""
+        now = self.env.now
+        elapsed = now - self._regime_since
+        pause_clock = self.pause_clock()
+        entry = self._regime_entry()
+        entry['duration'] += elapsed
+        entry['belt_distance'] += self.speed * (elapsed - (pause_clock - self._regime_pause_mark))
+        self._regime_since = now
+        self._regime_pause_mark = pause_clock
+
+    def set_speed(self, speed: float, regime: Optional[str] = None):
+        """
+        Segment hızını değiştirir (sürücü/VFD hız ayarı).
+        Paketlerin yeniden planlanması ConveyorLine.set_segment_speed ile yapılır.
+
+        Args:
+            speed: Yeni hız (m/s)
+            regime: Hız rejimi adı (örn: "eco"); None ise hızdan türetilir
+        """
+        if speed <= 0:
+            raise ValueError(f"Segment hızı pozitif olmalı: {self.id} ({speed})")
+        self._close_regime()
+        self.speed = speed
+        self.regime = regime or f"{speed:g} m/s"
+
+    def get_regime_statistics(self) -> Dict[str, dict]:
+        """
+        Hız rejimi bazında throughput ve enerjiyle ilişkili metrikler.
+        belt_distance: Bandın o rejimde kat ettiği yol (motor yükü ile orantılı).
+        """
+        self._close_regime()
+        return {
+            name: {
+                'duration': entry['duration'],
+                'exits': entry['exits'],
+                'throughput': entry['exits'] / entry['duration'] if entry['duration'] > 0 else 0.0,
+                'belt_distance': entry['belt_distance'],
+                'avg_speed': entry['belt_distance'] / entry['duration'] if entry['duration'] > 0 else 0.0,
+            }
+            for name, entry in self.regime_stats.items()
+        }
+
+    def free_intervals(self) -> List[Tuple[float, float]]:
+        """Segment içindeki boş bant aralıkları [(başlangıç, bitiş), ...] (global, metre)"""
+        intervals = []
+        cursor = self.start_offset
         for p in self.packets:
-            distance = abs(p.position - global_position)
-            if distance < req_space:
-                return False
+            body_start = p.position - p.length / 2
+            if body_start > cursor:
+                intervals.append((cursor, min(body_start, self.end_offset)))
+            cursor = max(cursor, p.position + p.length / 2)
+        if cursor < self.end_offset:
+            intervals.append((cursor, self.end_offset))
+        return intervals
+
+    def largest_free_interval(self) -> float:
+        """Segmentteki en uzun boş bant aralığı (metre)"""
+        return max((end - start for start, end in self.free_intervals()), default=0.0)
+
+    def can_enter(self) -> bool:
+        """Segment başından paket girebilir mi? (sürekli bantta aralığı lider kısıtı korur)"""
+        return not self.stopped
+
+    @property
+    def stopped(self) -> bool:
+        """Segment duruşta mı?"""
+        return self._stop_depth > 0
+
+    def pause_clock(self) -> float:
+        """Şimdiye kadarki toplam duruş süresi (devam eden duruş dahil)"""
+        if self.stopped:
+            return self._paused_total + (self.env.now - self._stopped_since)
+        return self._paused_total
+
+    @property
+    def total_downtime(self) -> float:
+        return self.pause_clock()
+
+    def stop(self) -> bool:
+        """
+        Segmenti durdurur (O(1), paketlere dokunmaz).
+        Çakışan duruşlar iç içe sayılır; hepsi bitince segment yeniden çalışır.
+
+        Returns:
+            True eğer segment bu çağrıyla durduysa
+        """
+        self._stop_depth += 1
+        if self._stop_depth > 1:
+            return False
+        self._stopped_since = self.env.now
+        self._resume_event = self.env.event()
+        self.stop_count += 1
+        return True
+
+    def resume(self) -> bool:
+        """
+        Bir duruşu sonlandırır; son duruş bittiğinde bekleyen paketleri uyandırır.
+
+        Returns:
+            True eğer segment bu çağrıyla yeniden çalışmaya başladıysa
+        """
+        if self._stop_depth == 0:
+            return False
+        self._stop_depth -= 1
+        if self._stop_depth > 0:
+            return False
+        self._paused_total += self.env.now - self._stopped_since
+        event, self._resume_event = self._resume_event, None
+        event.succeed()
         return True
 
+    def wait_running(self) -> simpy.Event:
+        """Segment yeniden çalıştığında tetiklenen olay (çalışıyorsa hemen)"""
+        if self._resume_event is None:
+            return self.env.timeout(0)
+        return self._resume_event
+
+    def get_availability(self) -> float:
+        """Segmentin çalışır durumda geçirdiği süre oranı"""
+        now = self.env.now
+        if now <= 0:
+            return 1.0
+        return 1.0 - self.pause_clock() / now
+
     def get_utilization(self) -> float:
-        """Segment doluluk oranı"""
-        if self.capacity == 0:
+        """Segment doluluk oranı (kaplanan bant metresi / segment uzunluğu)"""
+        if self.length == 0:
             return 0.0
-        return len(self.packets) / self.capacity
+        # En öndeki paketin min_gap payı segment sonunu aşabilir
+        return min(1.0, self.occupied_length / self.length)
 
     def __repr__(self) -> str:
         return f"Segment({self.id}, {self.length}m @ {self.speed}m/s, packets={len(self.packets)})"
 
 
+class ZoneSegment(ConveyorSegment):
+    """
+    Bölgeli sıfır basınçlı birikme (ZPA) konveyörü.
+
+    Bant sabit uzunluklu bölgelere ayrılır; her bölgede bir fotosel ve bir
+    paket yeri vardır. Bir paket, önündeki bölge boşaldığında (fotosel
+    serbest) bir sonraki bölgeye bırakılır; paketler birbirine hiç temas
+    etmeden birikir.
+
+    Bölge doluluğu tek bir tamsayı bitmap'inde tutulur (bit k = bölge k dolu).
+    Paketler sürekli pozisyon adımları yerine bölgeden bölgeye olaylarla
+    ilerler: bölge başına bir olay.
+    """
+
+    kind = "zpa"
+
+    def __init__(self,
+                 env: simpy.Environment,
+                 id: str,
+                 length: float,
+                 speed: float,
+                 start_offset: float,
+                 zone_length: float = 0.8,
+                 min_gap: float = 0.5,
+                 description: str = "",
+                 direction: str = "horizontal",
+                 default_packet_length: float = 0.3):
+        super().__init__(env, id, length, speed, start_offset, min_gap, description, direction,
+                         default_packet_length)
+
+        # Bölge sayısı: kalan uzunluk son bölgelere paylaştırılır
+        self.zone_count = max(1, int(length / zone_length))
+        self.zone_length = length / self.zone_count
+
+        self.zone_bits = 0                              # Bölge doluluk bitmap'i
+        self._zone_of: Dict[str, int] = {}             # paket id -> bulunduğu bölge
+        self._zone_free_events: Dict[int, simpy.Event] = {}
+
+        # İstatistikler
+        self.total_zone_releases = 0
+
+    @property
+    def capacity(self) -> int:
+        """Segment kapasitesi: bölge başına bir paket"""
+        return self.zone_count
+
+    def zone_at(self, global_position: float) -> int:
+        """Global pozisyonun düştüğü bölge"""
+        zone = int((global_position - self.start_offset) / self.zone_length)
+        return min(max(zone, 0), self.zone_count - 1)
+
+    def zone_start(self, zone: int) -> float:
+        """Bölgenin global başlangıç pozisyonu"""
+        return self.start_offset + zone * self.zone_length
+
+    def is_zone_free(self, zone: int) -> bool:
+        """Bölge fotoseli serbest mi?"""
+        return not (self.zone_bits >> zone) & 1
+
+    @property
+    def occupied_zones(self) -> int:
+        """Dolu bölge sayısı"""
+        return bin(self.zone_bits).count("1")
+
+    @property
+    def occupied_length(self) -> float:
+        """Dolu bölgelerin toplam uzunluğu (metre)"""
+        return self.occupied_zones * self.zone_length
+
+    def has_space_at(self, global_position: float, packet_length: float = 0.3) -> bool:
+        """Pozisyonun bulunduğu bölge boş mu?"""
+        return self.is_zone_free(self.zone_at(global_position))
+
+    def blocking_packets(self, global_position: float, packet_length: float = 0.3) -> List[Packet]:
+        """
+        Pozisyonun bölgesini tutan paket(ler); bölge komşuları bisect ile aranır.
+        Bölgede paket yoksa bölgeyi bir önceki bölgeden ilerlemek için ayırmış
+        paket döner (bölge 0'ı önceki segmentin paketi ayırır: boş liste).
+        """
+        zone = self.zone_at(global_position)
+        lo = bisect_left(self.packets, self.zone_start(zone - 1), key=_position)
+        hi = bisect_left(self.packets, self.zone_start(zone + 2), key=_position)
+        nearby = self.packets[lo:hi]
+        holders = [p for p in nearby if self._zone_of.get(p.id) == zone]
+        if not holders and zone > 0 and not self.is_zone_free(zone):
+            holders = [p for p in nearby if self._zone_of.get(p.id) == zone - 1]
+        return holders
+
+    def can_enter(self) -> bool:
+        """Segment çalışıyor ve ilk bölge boşsa segment başından paket girebilir"""
+        return not self.stopped and self.is_zone_free(0)
+
+    def insert_packet(self, packet: Packet):
+        """Paketi pozisyonunun bulunduğu bölgeye yerleştirir"""
+        zone = self.zone_at(packet.position)
+        self.zone_bits |= 1 << zone
+        self._zone_of[packet.id] = zone
+        super().insert_packet(packet)
+
+    def remove_packet(self, packet: Packet):
+        """Paketi segmentten çıkarır ve bölgesini serbest bırakır"""
+        zone = self._zone_of.pop(packet.id, None)
+        if zone is not None:
+            self._release_zone(zone)
+        super().remove_packet(packet)
+
+    def _release_zone(self, zone: int):
+        """Bölgeyi boşaltır ve o bölgeyi bekleyen paketi uyandırır"""
+        self.zone_bits &= ~(1 << zone)
+        self.total_zone_releases += 1
+        event = self._zone_free_events.pop(zone, None)
+        if event is not None:
+            event.succeed()
+
+    def wait_zone_free(self, zone: int) -> simpy.Event:
+        """Bölge boşaldığında tetiklenen olay"""
+        if zone not in self._zone_free_events:
+            self._zone_free_events[zone] = self.env.event()
+        return self._zone_free_events[zone]
+
+    def convey(self, packet: Packet, line: "ConveyorLine"):
+        """
+        Paketi bölgeden bölgeye segment sonuna kadar taşır (SimPy generator).
+        Bölge k+1 boşalmadan paket bölge k'dan bırakılmaz. Segment sonunda
+        bir sonraki segmentin girişi (veya lider aralığı) uygun olana kadar
+        son bölgede bekler.
+        """
+        zone = self._zone_of[packet.id]
+
+        while zone < self.zone_count - 1:
+            if not self.is_zone_free(zone + 1):
+                self.total_accumulation_time += yield from line._wait_for(
+                    self.wait_zone_free(zone + 1))
+                continue
+
+            # Sonraki bölgeyi ayır, yolculuk boyunca iki bölge de dolu kalır
+            self.zone_bits |= 1 << (zone + 1)
+            target = self.zone_start(zone + 1)
+            yield from self._travel_to(packet, target, line)
+
+            self._release_zone(zone)
+            zone += 1
+            self._zone_of[packet.id] = zone
+            packet.position = target
+            line._notify_moved(packet)
+
+        # Son bölge: çıkış koşulu sağlanana kadar bekle
+        next_segment = line.next_segment(self)
+        wait_start = self.env.now
+        while True:
+            if next_segment is None:
+                break
+            if next_segment.stopped:
+                yield from line._wait_for(next_segment.wait_running())
+                continue
+            if next_segment.kind == "zpa":
+                if next_segment.can_enter():
+                    # Sonraki segmentin ilk bölgesini şimdiden ayır
+                    next_segment.zone_bits |= 1
+                    break
+                yield from line._wait_for(next_segment.wait_zone_free(0))
+            else:
+                if line._leader_clearance(packet) >= self.end_offset - packet.position:
+                    break
+                yield from line._sleep(line.step_time)
+        self.total_accumulation_time += self.env.now - wait_start
+
+        yield from self._travel_to(packet, self.end_offset, line)
+
+        self.remove_packet(packet)
+        packet.position = self.end_offset
+        packet.segment_index = self.index + 1
+        if next_segment is not None:
+            next_segment.insert_packet(packet)
+        line._notify_moved(packet)
+
+    def _travel_to(self, packet: Packet, target: float, line: "ConveyorLine"):
+        """
+        Paketi bölge içinde hedef pozisyona taşır. Hız değişikliği yolculuğu
+        keserse alınan yol uygulanır ve kalan yol yeni hızla planlanır;
+        yolculuk sırasında segment durduysa duruş süresi yoldan düşülür.
+        """
+        while True:
+            if self.stopped:
+                yield from line._wait_for(self.wait_running())
+                continue
+            speed = self.speed
+            delay = (target - packet.position) / speed
+            pause_mark = self.pause_clock()
+            elapsed = yield from line._sleep(delay)
+            moving = elapsed - (self.pause_clock() - pause_mark)
+            if moving >= delay:
+                break
+            packet.position += speed * moving
+
+    def get_utilization(self) -> float:
+        """Segment doluluk oranı (dolu bölge / toplam bölge)"""
+        return self.occupied_zones / self.zone_count
+
+    def __repr__(self) -> str:
+        return (f"ZoneSegment({self.id}, {self.length}m @ {self.speed}m/s, "
+                f"zones={self.zone_bits:0{self.zone_count}b})")
+
+
 class ConveyorLine:
     """
     Birden fazla segment'ten oluşan konveyör hattı.
@@ -88,41 +506,211 @@ class ConveyorLine:
 
         self.segments: List[ConveyorSegment] = []
         self.total_length = 0.0
+        # Segment başlangıç pozisyonları (artan sıralı): pozisyon -> segment
+        # araması bisect ile O(log S), segment sayısından bağımsız maliyet
+        self._segment_offsets: List[float] = []
 
-        # İstatistikler
+        # Hareket adımı (saniye)
+        self.step_time = 0.1
+
+        # İstatistikler: hattan ayrılan her paket (hat sonu + ayırıcı)
         self.total_packets_processed = 0
-        self.packets_in_transit: List[Packet] = []  # Tüm hattaki paketler
+        self.total_packets_diverted = 0
+        # Tüm hattaki paketler - pozisyona göre artan sıralı. Paketler birbirini
+        # geçemediği için sıra sadece merge ve çıkışlarda değişir.
+        self.packets_in_transit: List[Packet] = []
+
+        # Hat sonu çıkış işleyicisi (örn. ConveyorNetwork yönlendirmesi).
+        # Paketi kabul ederse True döner; False ise paket hat sonunda bekler.
+        # EXIT_ABSORBED dönerse paket hattan alınır ama çıkış sayılmaz (devridaim).
+        self.exit_handler: Optional[Callable[[Packet], bool]] = None
+        self.exit_retry_interval = 0.1
+
+        # Paket id -> hareket process'i (hız değişiminde hedefli yeniden planlama)
+        self._move_processes: Dict[str, simpy.Process] = {}
+        # Paket id -> paket bir sonraki ilerlediğinde veya hattan ayrıldığında
+        # tetiklenen olay (giriş penceresi bekleyen merge hakemi kullanır)
+        self._move_events: Dict[str, simpy.Event] = {}
+        self._segments_by_id: Dict[str, ConveyorSegment] = {}
+
+        # Ayırıcı (diverter) noktaları: artan sıralı global pozisyonlar.
+        # Paket bir noktayı geçtiğinde divert_handler(paket, nokta_index)
+        # çağrılır; True dönerse paket hattan alınır.
+        self.divert_points: List[float] = []
+        self.divert_handler: Optional[Callable[[Packet, int], bool]] = None
+
+        # Gözlemci veri yolu (ProbeBus.attach atar): çıkış ve ayrılma olayları
+        self.probes = NO_PROBES
+
+        # Duruşlar: en az bir segment durmuşsa hat duruşta sayılır
+        self._stopped_segments = 0
+        self._line_stopped_since = 0.0
+        self._line_downtime = 0.0
 
     def add_segment(self, id: str, length: float, speed: float,
-                    description: str = "", direction: str = "horizontal"):
-        """Hatta yeni segment ekler (sona eklenir)"""
-        segment = ConveyorSegment(
-            env=self.env,
-            id=id,
-            length=length,
-            speed=speed,
-            start_offset=self.total_length,
-            min_gap=self.min_gap,
-            description=description,
-            direction=direction
-        )
+                    description: str = "", direction: str = "horizontal",
+                    segment_type: str = "continuous", zone_length: float = None):
+        """
+        Hatta yeni segment ekler (sona eklenir).
+
+        Args:
+            segment_type: "continuous" (sürekli bant) veya "zpa" (bölgeli birikme)
+            zone_length: ZPA bölge uzunluğu (varsayılan: paket boyu + min_gap)
+        """
+        if segment_type == "zpa":
+            segment = ZoneSegment(
+                env=self.env,
+                id=id,
+                length=length,
+                speed=speed,
+                start_offset=self.total_length,
+                zone_length=zone_length or (self.default_packet_length + self.min_gap),
+                min_gap=self.min_gap,
+                description=description,
+                direction=direction,
+                default_packet_length=self.default_packet_length
+            )
+        elif segment_type == "continuous":
+            segment = ConveyorSegment(
+                env=self.env,
+                id=id,
+                length=length,
+                speed=speed,
+                start_offset=self.total_length,
+                min_gap=self.min_gap,
+                description=description,
+                direction=direction,
+                default_packet_length=self.default_packet_length
+            )
+        else:
+            raise ValueError(f"Bilinmeyen segment tipi: {segment_type}")
+        segment.index = len(self.segments)
         self.segments.append(segment)
+        self._segments_by_id[segment.id] = segment
+        self._segment_offsets.append(segment.start_offset)
         self.total_length += length
         return segment
 
     def get_segment_at(self, global_position: float) -> Optional[ConveyorSegment]:
         """Belirtilen pozisyondaki segment'i döndürür"""
-        for segment in self.segments:
-            if segment.contains_position(global_position):
-                return segment
-        return None
+        i = self.get_segment_index_at(global_position)
+        return self.segments[i] if i >= 0 else None
 
     def get_segment_index_at(self, global_position: float) -> int:
-        """Belirtilen pozisyondaki segment index'ini döndürür"""
-        for i, segment in enumerate(self.segments):
-            if segment.contains_position(global_position):
-                return i
-        return -1
+        """Belirtilen pozisyondaki segment index'ini döndürür (O(log S))"""
+        if not 0.0 <= global_position < self.total_length:
+            return -1
+        return bisect_right(self._segment_offsets, global_position) - 1
+
+    def get_segment(self, segment_id: str) -> ConveyorSegment:
+        """Segment id'sine göre segment döndürür"""
+        if segment_id not in self._segments_by_id:
+            raise ValueError(f"Bilinmeyen segment: {segment_id}")
+        return self._segments_by_id[segment_id]
+
+    def set_segment_speed(self, segment_id: str, speed: float, regime: Optional[str] = None):
+        """
+        Çalışma sırasında segment hızını değiştirir.
+
+        Sadece o segment üzerindeki paketlerin bekleyen hareket olayları
+        kesilip yeni hızla yeniden planlanır; diğer paketlere dokunulmaz.
+        """
+        segment = self.get_segment(segment_id)
+        segment.set_speed(speed, regime)
+        for packet in list(segment.packets):
+            process = self._move_processes.get(packet.id)
+            if process is not None and process.is_alive and process is not self.env.active_process:
+                process.interrupt("speed_change")
+
+    def set_divert_points(self, positions: List[float],
+                          handler: Callable[[Packet, int], bool]):
+        """
+        Hat üzerindeki ayırıcı noktalarını tanımlar.
+
+        Args:
+            positions: Global pozisyonlar (artan sıralı olmalı)
+            handler: handler(paket, nokta_index) -> paket ayrıldıysa True
+        """
+        if list(positions) != sorted(positions):
+            raise ValueError("Ayırıcı pozisyonları artan sıralı olmalı")
+        self.divert_points = list(positions)
+        self.divert_handler = handler
+
+    def remove_packet(self, packet: Packet):
+        """Paketi hattın ortasından çıkarır (ayırıcı); lider/takipçi zincirini onarır"""
+        if 0 <= packet.segment_index < len(self.segments):
+            self.segments[packet.segment_index].remove_packet(packet)
+        _remove_packet(self.packets_in_transit, packet)
+
+        leader, follower = packet.leader, packet.follower
+        if follower is not None:
+            follower.leader = leader
+        if leader is not None:
+            leader.follower = follower
+        packet.leader = None
+        packet.follower = None
+        self._move_processes.pop(packet.id, None)
+        self._notify_moved(packet)
+
+    def _check_diverts(self, packet: Packet) -> bool:
+        """
+        Paketin geçtiği ayırıcı noktalarını sırayla işler. Paket bir sonraki
+        noktanın index'ini taşır; adım başına maliyet O(1).
+
+        Returns:
+            True eğer paket bir ayırıcıda hattan alındıysa
+        """
+        points = self.divert_points
+        while packet.divert_index < len(points) and points[packet.divert_index] <= packet.position:
+            index = packet.divert_index
+            packet.divert_index += 1
+            if self.divert_handler(packet, index):
+                self.total_packets_processed += 1
+                self.total_packets_diverted += 1
+                packet.exited_at = self.env.now
+                if self.probes.handlers[DIVERTED_EVENT]:
+                    self.probes.emit(DIVERTED_EVENT, packet, index)
+                self.remove_packet(packet)
+                return True
+        return False
+
+    def stop_segment(self, segment_id: str):
+        """
+        Segmenti durdurur (arıza, sıkışma). O(1): paketlere dokunulmaz,
+        segmentteki paketler kendi adımlarının sonunda durduklarını görür.
+        Durmuş segmente feeder aktarımı ve önceki segmentten geçiş yapılamaz;
+        arkadaki paketler birikir ve yukarı akış feeder'ları bloke olur.
+        """
+        if self.get_segment(segment_id).stop():
+            if self._stopped_segments == 0:
+                self._line_stopped_since = self.env.now
+            self._stopped_segments += 1
+
+    def resume_segment(self, segment_id: str):
+        """Segment duruşunu sonlandırır; bekleyen paketler devam eder"""
+        if self.get_segment(segment_id).resume():
+            self._stopped_segments -= 1
+            if self._stopped_segments == 0:
+                self._line_downtime += self.env.now - self._line_stopped_since
+
+    @property
+    def total_downtime(self) -> float:
+        """En az bir segmentin durduğu toplam süre"""
+        if self._stopped_segments > 0:
+            return self._line_downtime + (self.env.now - self._line_stopped_since)
+        return self._line_downtime
+
+    def get_availability(self) -> float:
+        """Hattın tüm segmentleri çalışır durumdayken geçen süre oranı"""
+        now = self.env.now
+        if now <= 0:
+            return 1.0
+        return 1.0 - self.total_downtime / now
+
+    def next_segment(self, segment: ConveyorSegment) -> Optional[ConveyorSegment]:
+        """Segment'ten sonra gelen segment (son segment ise None) - O(1)"""
+        i = segment.index + 1
+        return self.segments[i] if i < len(self.segments) else None
 
     def get_speed_at(self, global_position: float) -> float:
         """Belirtilen pozisyondaki hızı döndürür"""
@@ -139,23 +727,144 @@ class ConveyorLine:
 
     @property
     def capacity(self) -> int:
-        """Toplam hat kapasitesi"""
+        """Nominal hat kapasitesi (varsayılan boyda paket sayısı)"""
         return sum(s.capacity for s in self.segments)
 
+    @property
+    def occupied_length(self) -> float:
+        """Hattaki paketlerin kapladığı toplam bant uzunluğu (metre)"""
+        return sum(s.occupied_length for s in self.segments)
+
     @property
     def packets(self) -> List[Packet]:
         """Tüm hattaki paketler (geriye uyumluluk için)"""
         return self.packets_in_transit
 
+    def required_spacing(self, leader: Packet, follower: Packet) -> float:
+        """İki ardışık paketin merkezleri arasında olması gereken minimum mesafe"""
+        return (leader.length + follower.length) / 2 + self.min_gap
+
+    def _gap_edges(self, global_position: float) -> Tuple[float, float]:
+        """
+        Pozisyonun hemen arkasındaki paketin ön kenarı ile hemen önündeki
+        paketin arka kenarını döndürür (komşu yoksa ±sonsuz).
+
+        Hat pozisyona göre sıralı tutulduğu için sıralı paket gövdeleri bir
+        aralık yapısı gibi kullanılır: sorgu bisect ile O(log n).
+        """
+        packets = self.packets_in_transit
+        i = bisect_left(packets, global_position, key=_position)
+        behind_edge = -math.inf
+        ahead_edge = math.inf
+        if i > 0:
+            behind = packets[i - 1]
+            behind_edge = behind.position + behind.length / 2
+        if i < len(packets):
+            ahead = packets[i]
+            ahead_edge = ahead.position - ahead.length / 2
+        return behind_edge, ahead_edge
+
+    def free_interval_at(self, global_position: float) -> Optional[Tuple[float, float]]:
+        """
+        Pozisyonu içeren boş bant aralığı (O(log n)).
+
+        Returns:
+            (başlangıç, bitiş) global metre, veya pozisyon bir paketin
+            gövdesi üzerindeyse None
+        """
+        behind_edge, ahead_edge = self._gap_edges(global_position)
+        if not behind_edge <= global_position <= ahead_edge:
+            return None
+        return max(behind_edge, 0.0), min(ahead_edge, self.total_length)
+
     def has_space_at(self, global_position: float, packet_length: float = 0.3) -> bool:
-        """Belirtilen pozisyonda yer var mı? (tüm hat genelinde kontrol)"""
-        req_space = packet_length + self.min_gap
+        """
+        Belirtilen pozisyona packet_length boyunda bir paket sığar mı?
+        Paket gövdesinin iki yanında en az min_gap boşluk kalmalıdır.
+        Sadece giriş noktasının iki komşusuna bakılır: O(log n).
+        """
+        segment = self.get_segment_at(global_position)
+        if segment is not None and segment.stopped:
+            return False
+        if segment is not None and segment.kind == "zpa":
+            return segment.has_space_at(global_position, packet_length)
 
-        for p in self.packets_in_transit:
-            distance = abs(p.position - global_position)
-            if distance < req_space:
-                return False
-        return True
+        behind_edge, ahead_edge = self._gap_edges(global_position)
+        half = packet_length / 2
+        return (global_position - half - behind_edge >= self.min_gap and
+                ahead_edge - (global_position + half) >= self.min_gap)
+
+    def blocking_packets(self, global_position: float, packet_length: float = 0.3) -> List[Packet]:
+        """
+        has_space_at False döndürdüğünde girişi engelleyen paketler: gövdesi
+        giriş penceresine (paket gövdesi ± min_gap) taşan paketler. Sıralı
+        listede bisect ile giriş noktasından dışa doğru yürünür: O(log n + k).
+        ZPA segmentinde bölgeyi dolduran paket döner.
+        """
+        segment = self.get_segment_at(global_position)
+        if segment is not None and segment.kind == "zpa":
+            blockers = segment.blocking_packets(global_position, packet_length)
+            if not blockers and segment.zone_at(global_position) == 0 and not segment.is_zone_free(0):
+                # İlk bölgeyi önceki segmentin son paketi ayırmış
+                i = bisect_left(self.packets_in_transit, segment.start_offset, key=_position)
+                if i > 0:
+                    blockers = [self.packets_in_transit[i - 1]]
+            return blockers
+
+        half = packet_length / 2
+        window_start = global_position - half - self.min_gap
+        window_end = global_position + half + self.min_gap
+        packets = self.packets_in_transit
+        i = bisect_left(packets, global_position, key=_position)
+        blockers = []
+        # Gövdeler örtüşmediği için ön/arka kenarlar da pozisyon sırasındadır
+        j = i - 1
+        while j >= 0 and packets[j].position + packets[j].length / 2 > window_start:
+            blockers.append(packets[j])
+            j -= 1
+        j = i
+        while j < len(packets) and packets[j].position - packets[j].length / 2 < window_end:
+            blockers.append(packets[j])
+            j += 1
+        return blockers
+
+    def wait_packet_moved(self, packet: Packet) -> simpy.Event:
+        """Paket bir sonraki ilerlediğinde veya hattan ayrıldığında tetiklenen olay"""
+        if packet.id not in self._move_events:
+            self._move_events[packet.id] = self.env.event()
+        return self._move_events[packet.id]
+
+    def _notify_moved(self, packet: Packet):
+        """Paketin hareketini bekleyen olayı tetikler (bekleyen yoksa O(1) kontrol)"""
+        if self._move_events:
+            event = self._move_events.pop(packet.id, None)
+            if event is not None:
+                event.succeed()
+
+    def wait_window_change(self, global_position: float,
+                           packet_length: float = 0.3) -> Optional[simpy.Event]:
+        """
+        Giriş penceresinin açılabileceği ilk anda tetiklenen olay: duran
+        segment yeniden çalıştığında, ZPA bölgesi boşaldığında veya sürekli
+        bantta pencereyi tutan paketlerden biri ilerlediğinde/hattan ayrıldığında.
+        Pencere yalnızca bu olaylarla değişir; sorgulama aralığı beklenmez.
+
+        Returns:
+            Olay, veya pencere zaten boşsa None
+        """
+        global_position = max(0.0, min(global_position, self.total_length - 0.1))
+        if self.has_space_at(global_position, packet_length):
+            return None
+        segment = self.get_segment_at(global_position)
+        if segment is not None and segment.stopped:
+            return segment.wait_running()
+        if segment is not None and segment.kind == "zpa":
+            return segment.wait_zone_free(segment.zone_at(global_position))
+
+        blockers = self.blocking_packets(global_position, packet_length)
+        if not blockers:
+            return None
+        return self.env.any_of([self.wait_packet_moved(p) for p in blockers])
 
     def accept_packet(self, packet: Packet, entry_position: float = 0.0) -> bool:
         """
@@ -175,91 +884,221 @@ class ConveyorLine:
             return False
 
         # Paketi başlat
-        packet.position = entry_position
-        packet.current_conveyor = self.id
-        packet.entered_conveyor_at = self.env.now
+        packet.enter_conveyor(self.id, self.env.now, entry_position)
+        self._admit(packet, entry_position)
+        return True
 
-        # Segment'e ekle
-        segment = self.get_segment_at(entry_position)
-        if segment:
-            segment.packets.append(packet)
+    def _admit(self, packet: Packet, entry_position: float):
+        """
+        Pozisyonu atanmış paketi segmentine, sıralı listeye ve lider/takipçi
+        zincirine ekler ve hareket process'ini başlatır (yer kontrolü yapılmaz).
+        """
+        # Segment'e ekle; segment index'i paket üzerinde saklanır, hareket
+        # sırasında sadece sınır geçişlerinde bir artırılır
+        packet.segment_index = self.get_segment_index_at(entry_position)
+        if packet.segment_index >= 0:
+            self.segments[packet.segment_index].insert_packet(packet)
+        packet.divert_index = bisect_left(self.divert_points, entry_position)
+
+        # Sıralı hatta ekle ve lider/takipçi zincirine bağla
+        i = bisect_left(self.packets_in_transit, entry_position, key=_position)
+        follower = self.packets_in_transit[i - 1] if i > 0 else None
+        leader = self.packets_in_transit[i] if i < len(self.packets_in_transit) else None
+        self.packets_in_transit.insert(i, packet)
 
-        self.packets_in_transit.append(packet)
+        packet.leader = leader
+        packet.follower = follower
+        if leader is not None:
+            leader.follower = packet
+        if follower is not None:
+            follower.leader = packet
 
         # Hareket process'ini başlat
-        self.env.process(self._move_packet(packet))
+        self._move_processes[packet.id] = self.env.process(self._move_packet(packet))
 
-        return True
+    def _leader_clearance(self, packet: Packet) -> float:
+        """Paketin liderine çarpmadan ilerleyebileceği mesafe (O(1))"""
+        leader = packet.leader
+        if leader is None:
+            return float('inf')
+        # required_spacing ile aynı ifade; her adımda çağrıldığı için satır içi
+        return leader.position - ((leader.length + packet.length) / 2 + self.min_gap) - packet.position
+
+    def _wait_for(self, event: simpy.Event):
+        """
+        Hız değişikliğiyle kesilebilen bekleme (SimPy generator).
+        Geçen süreyi döndürür; kesildiyse çağıran hareketi yeni hızla yeniden planlar.
+        """
+        start = self.env.now
+        try:
+            yield event
+        except simpy.Interrupt:
+            pass
+        return self.env.now - start
+
+    def _sleep(self, delay: float):
+        """
+        Kesilebilen zaman aşımı beklemesi. Kesilmezse tam olarak delay döner
+        (env.now farkındaki yuvarlama kesilme sanılmasın), kesilirse geçen süre.
+        """
+        start = self.env.now
+        try:
+            yield self.env.timeout(delay)
+        except simpy.Interrupt:
+            return self.env.now - start
+        return delay
 
     def _move_packet(self, packet: Packet):
         """
         Paketi hat boyunca hareket ettirir.
         Segment geçişlerinde hız değişir.
+
+        Her adımda paket sadece liderine bakar: lideriyle arasında gereken
+        mesafe kalmadıysa bekler (birikme). Böylece hızlı segmentten yavaş
+        segmente geçişte paketler üst üste binmez, arkada kuyruk oluşur.
         """
         while packet.position < self.total_length:
-            # Mevcut segment'i bul
-            current_segment = self.get_segment_at(packet.position)
-            if not current_segment:
+            # Mevcut segment (paket üzerindeki index'ten, arama yok)
+            if not 0 <= packet.segment_index < len(self.segments):
                 break
+            current_segment = self.segments[packet.segment_index]
+
+            # Durmuş segmentte bant yeniden çalışana kadar tek olayla bekle
+            if current_segment.stopped:
+                yield from self._wait_for(current_segment.wait_running())
+                continue
+
+            # ZPA segmentleri paketi bölge bölge kendisi taşır
+            if current_segment.kind == "zpa":
+                yield from current_segment.convey(packet, self)
+                if self.divert_points and self._check_diverts(packet):
+                    return
+                continue
+
+            # Lider çok yakınsa bir adım bekle
+            if self._leader_clearance(packet) <= 1e-9:
+                current_segment.total_accumulation_time += yield from self._sleep(self.step_time)
+                continue
 
             # Bu segment'in sonuna kadar olan mesafe
             distance_to_segment_end = current_segment.end_offset - packet.position
             speed = current_segment.speed
 
             # Adım hesapla (küçük adımlarla hareket)
-            step_time = 0.1  # 100ms adımlar
-            step_distance = speed * step_time
-
-            if step_distance >= distance_to_segment_end:
-                # Segment sonuna ulaşacak
+            next_segment = None
+            if speed * self.step_time >= distance_to_segment_end:
+                # Segment sonuna ulaşacak - sonraki segment girişi kapalıysa bekle
+                next_segment = self.next_segment(current_segment)
+                if next_segment is not None and next_segment.stopped:
+                    current_segment.total_accumulation_time += yield from self._wait_for(
+                        next_segment.wait_running())
+                    continue
+                if next_segment is not None and not next_segment.can_enter():
+                    current_segment.total_accumulation_time += yield from self._sleep(self.step_time)
+                    continue
                 travel_time = distance_to_segment_end / speed
+                step_distance = distance_to_segment_end
+            else:
+                travel_time = self.step_time
+                step_distance = speed * self.step_time
+
+            # Döngü başında segment çalışıyordu: duruş saati toplam duruştur.
+            # Bekleme _sleep ile aynıdır; en sık yol olduğundan ek generator
+            # katmanı olmadan satır içi yazılır
+            pause_mark = current_segment._paused_total
+            start = self.env.now
+            try:
                 yield self.env.timeout(travel_time)
+                elapsed = travel_time
+            except simpy.Interrupt:
+                elapsed = self.env.now - start
+            paused = current_segment.pause_clock() - pause_mark
+            if elapsed < travel_time or paused > 0:
+                # Hız değişti veya adım sırasında segment durdu: sadece bandın
+                # hareket ettiği süredeki yol uygulanır, kalan yol sonraki
+                # turda (gerekirse duruş bittikten sonra) yeniden planlanır
+                travel_time = max(elapsed - paused, 0.0)
+                step_distance = speed * travel_time
+
+            # Adım sonunda liderin yeni pozisyonuna göre ilerle
+            advance = min(step_distance, self._leader_clearance(packet))
+            if advance >= distance_to_segment_end and next_segment is not None \
+                    and not next_segment.can_enter():
+                advance = 0.0
+            if advance <= 0:
+                current_segment.total_accumulation_time += travel_time
+                continue
 
+            if advance >= distance_to_segment_end:
                 # Eski segment'ten çıkar
-                if packet in current_segment.packets:
-                    current_segment.packets.remove(packet)
+                current_segment.remove_packet(packet)
 
                 packet.position = current_segment.end_offset
+                packet.segment_index += 1
 
-                # Yeni segment'e geç
-                next_segment = self.get_segment_at(packet.position)
-                if next_segment and packet.position < self.total_length:
-                    next_segment.packets.append(packet)
+                # Yeni segment'e geç (en arkadaki paket olarak)
+                if next_segment is not None:
+                    next_segment.insert_packet(packet)
             else:
-                # Normal adım
-                yield self.env.timeout(step_time)
+                # Kayan nokta yuvarlaması paketi segment sınırına taşımasın;
+                # sınır geçişi sadece yukarıdaki dalda yapılır
+                packet.position = min(packet.position + advance,
+                                      math.nextafter(current_segment.end_offset, 0.0))
+                if advance < step_distance:
+                    current_segment.total_accumulation_time += travel_time * (1 - advance / step_distance)
+            self._notify_moved(packet)
 
-                old_segment = current_segment
-                packet.position += step_distance
+            if self.divert_points and self._check_diverts(packet):
+                return
 
-                # Segment değişti mi kontrol et
-                new_segment = self.get_segment_at(packet.position)
-                if new_segment and new_segment != old_segment:
-                    if packet in old_segment.packets:
-                        old_segment.packets.remove(packet)
-                    new_segment.packets.append(packet)
+        # Hat sonuna ulaştı - çıkış kabul edilmezse hat sonunda bekle
+        while not self._packet_reached_end(packet):
+            yield from self._sleep(self.exit_retry_interval)
+        self._move_processes.pop(packet.id, None)
 
-        # Hat sonuna ulaştı
-        self._packet_reached_end(packet)
+    def _packet_reached_end(self, packet: Packet) -> bool:
+        """
+        Paket hat sonuna ulaştığında çağrılır.
 
-    def _packet_reached_end(self, packet: Packet):
-        """Paket hat sonuna ulaştığında çağrılır"""
-        # Segment'lerden çıkar
-        for segment in self.segments:
-            if packet in segment.packets:
-                segment.packets.remove(packet)
+        Returns:
+            True eğer paket hat sonundan alındıysa, False eğer çıkış işleyicisi
+            paketi kabul etmediyse (paket hat sonunda bekler)
+        """
+        # Çıkış işleyicisi paketi başka hatta bağlayabilir; takipçiyi önce sakla
+        follower = packet.follower
+
+        result = True
+        if self.exit_handler is not None:
+            result = self.exit_handler(packet)
+            if not result:
+                return False
+
+        # Hat sonundaki paket sıralı listenin son elemanıdır
+        _remove_packet(self.packets_in_transit, packet)
+        if follower is not None and follower.leader is packet:
+            follower.leader = None
+        if packet.current_conveyor == self.id:
+            packet.leader = None
+            packet.follower = None
+        self._notify_moved(packet)
 
-        # Ana listeden çıkar
-        if packet in self.packets_in_transit:
-            self.packets_in_transit.remove(packet)
+        # Devridaime alınan paket hattan ayrılmış sayılmaz (hat başına geri döner)
+        if result is EXIT_ABSORBED:
+            if self.probes.handlers[RECIRCULATED_EVENT]:
+                self.probes.emit(RECIRCULATED_EVENT, packet, len(self.segments))
+            return True
 
         self.total_packets_processed += 1
+        packet.exited_at = self.env.now
+        if self.probes.handlers[EXIT_EVENT]:
+            self.probes.emit(EXIT_EVENT, packet, len(self.segments))
+        return True
 
     def get_utilization(self) -> float:
-        """Toplam hat doluluk oranı"""
-        if self.capacity == 0:
+        """Toplam hat doluluk oranı (kaplanan bant metresi / hat uzunluğu)"""
+        if self.total_length == 0:
             return 0.0
-        return len(self.packets_in_transit) / self.capacity
+        return min(1.0, self.occupied_length / self.total_length)
 
     def get_segment_utilizations(self) -> Dict[str, float]:
         """Her segment'in doluluk oranını döndürür"""
@@ -272,9 +1111,13 @@ class ConveyorLine:
             'total_length': self.total_length,
             'segment_count': len(self.segments),
             'total_capacity': self.capacity,
+            'occupied_length': self.occupied_length,
             'packets_in_transit': len(self.packets_in_transit),
             'total_processed': self.total_packets_processed,
+            'total_diverted': self.total_packets_diverted,
             'utilization': self.get_utilization(),
+            'downtime': self.total_downtime,
+            'availability': self.get_availability(),
             'segments': [
                 {
                     'id': s.id,
@@ -282,6 +1125,14 @@ class ConveyorLine:
                     'speed': s.speed,
                     'packets': len(s.packets),
                     'utilization': s.get_utilization(),
+                    'occupied_length': s.occupied_length,
+                    'largest_gap': s.largest_free_interval(),
+                    'accumulation_time': s.total_accumulation_time,
+                    'regimes': s.get_regime_statistics(),
+                    'stop_count': s.stop_count,
+                    'downtime': s.total_downtime,
+                    'availability': s.get_availability(),
+                    'type': s.kind,
                     'description': s.description
                 }
                 for s in self.segments
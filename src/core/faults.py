@@ -0,0 +1,237 @@
+"""
+Arıza enjeksiyonu: Bant duruşları, sıkışmalar ve MTBF/MTTR programları.
+
+Duruşlar ya deterministik bir takvimden (at + duration) ya da
+MTBF (arızalar arası ortalama süre) / MTTR (ortalama onarım süresi)
+dağılımlarından üretilir. Duruş ConveyorLine.stop_segment ile O(1)
+uygulanır; duruş sonrası birikmiş iş yükünün (feeder kuyrukları)
+arıza öncesi seviyesine dönme süresi ölçülür.
+
+İş yükü yalnızca kuyruğa giren paketle artar: duruş başından toparlanmaya
+kadar hattın probe veri yoluna QUEUED aboneliği açılır ve tepe değer her
+kuyruk olayında güncellenir. Hat bir veri yoluna bağlı değilse duruş
+boyunca toparlanma kontrol aralığıyla örneklenir.
+"""
+
+import random
+import simpy
+from typing import Dict, List, Optional
+from .conveyor_line import ConveyorLine
+from .probes import NO_PROBES, QUEUED
+
+
+FAULT_DISTRIBUTIONS = ("exponential", "fixed")
+
+
+class FaultRecord:
+    """Tek bir duruşun kaydı"""
+
+    def __init__(self, segment_id: str, kind: str, start: float, backlog_before: int):
+        self.segment_id = segment_id
+        self.kind = kind
+        self.start = start
+        self.end: Optional[float] = None
+        self.backlog_before = backlog_before
+        self.backlog_peak = backlog_before
+        self.recovered_at: Optional[float] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end is None else self.end - self.start
+
+    @property
+    def recovery_time(self) -> Optional[float]:
+        """Duruş bitiminden iş yükünün arıza öncesi seviyeye dönmesine kadar geçen süre"""
+        if self.end is None or self.recovered_at is None:
+            return None
+        return self.recovered_at - self.end
+
+    def to_dict(self) -> dict:
+        return {
+            'segment': self.segment_id,
+            'kind': self.kind,
+            'start': self.start,
+            'end': self.end,
+            'duration': self.duration,
+            'backlog_before': self.backlog_before,
+            'backlog_peak': self.backlog_peak,
+            'recovery_time': self.recovery_time,
+        }
+
+
+class FaultInjector:
+    """
+    Hat segmentlerine duruş enjekte eder.
+
+    Kullanım:
+        injector = FaultInjector(env, line, feeders, seed=0)
+        injector.schedule_stop("SEGMENT_3", at=40.0, duration=15.0, kind="jam")
+        injector.add_random_failures("SEGMENT_5", mtbf=300.0, mttr=20.0)
+        injector.start()
+    """
+
+    def __init__(self, env: simpy.Environment, line: ConveyorLine,
+                 feeders: List = None, seed: int = 0,
+                 recovery_check_interval: float = 1.0):
+        """
+        Args:
+            env: SimPy environment
+            line: Duruşların uygulanacağı hat
+            feeders: İş yükü (kuyruk) takibi için feeder'lar
+            seed: MTBF/MTTR örneklemesi için rastgelelik tohumu
+            recovery_check_interval: Toparlanma kontrol aralığı (saniye)
+        """
+        self.env = env
+        self.line = line
+        self.feeders = list(feeders or [])
+        self.seed = seed
+        self.recovery_check_interval = recovery_check_interval
+
+        self._scheduled: List[tuple] = []       # (segment_id, at, duration, kind)
+        self._random: List[tuple] = []          # (segment_id, mtbf, mttr, distribution, kind)
+        self.records: List[FaultRecord] = []
+        # Duruşu veya toparlanması süren kayıtlar: tepe iş yükü izlenir
+        self._tracked: List[FaultRecord] = []
+        self._queue_subscription = None
+
+    def schedule_stop(self, segment_id: str, at: float, duration: float, kind: str = "stop"):
+        """Deterministik duruş programlar"""
+        self.line.get_segment(segment_id)
+        self._scheduled.append((segment_id, at, duration, kind))
+
+    def add_random_failures(self, segment_id: str, mtbf: float, mttr: float,
+                            distribution: str = "exponential", kind: str = "failure"):
+        """
+        Segmente MTBF/MTTR dağılımlarından rastgele arızalar ekler.
+
+        Args:
+            mtbf: Arızalar arası ortalama çalışma süresi (saniye)
+            mttr: Ortalama onarım süresi (saniye)
+            distribution: "exponential" veya "fixed"
+        """
+        self.line.get_segment(segment_id)
+        if distribution not in FAULT_DISTRIBUTIONS:
+            raise ValueError(f"Bilinmeyen arıza dağılımı: {distribution} "
+                             f"(geçerli: {', '.join(FAULT_DISTRIBUTIONS)})")
+        self._random.append((segment_id, mtbf, mttr, distribution, kind))
+
+    def load_config(self, entries: List[dict]):
+        """Config'deki [[faults]] girdilerini yükler (at/duration veya mtbf/mttr)"""
+        for entry in entries:
+            if 'mtbf' in entry:
+                self.add_random_failures(
+                    entry['segment'], entry['mtbf'], entry['mttr'],
+                    distribution=entry.get('distribution', 'exponential'),
+                    kind=entry.get('kind', 'failure')
+                )
+            else:
+                self.schedule_stop(entry['segment'], entry['at'], entry['duration'],
+                                   kind=entry.get('kind', 'stop'))
+
+    def start(self):
+        """Tüm duruş process'lerini başlatır"""
+        for segment_id, at, duration, kind in self._scheduled:
+            self.env.process(self._scheduled_stop(segment_id, at, duration, kind))
+        for segment_id, mtbf, mttr, distribution, kind in self._random:
+            rng = random.Random(f"{self.seed}:faults:{segment_id}")
+            self.env.process(self._random_failures(segment_id, mtbf, mttr, distribution, kind, rng))
+
+    @property
+    def backlog(self) -> int:
+        """Feeder kuyruklarında bekleyen toplam paket"""
+        return sum(len(f.queue) for f in self.feeders)
+
+    def _sample(self, mean: float, distribution: str, rng: random.Random) -> float:
+        if distribution == "fixed":
+            return mean
+        return rng.expovariate(1.0 / mean)
+
+    def _scheduled_stop(self, segment_id: str, at: float, duration: float, kind: str):
+        if at > self.env.now:
+            yield self.env.timeout(at - self.env.now)
+        yield from self._outage(segment_id, duration, kind)
+
+    def _random_failures(self, segment_id: str, mtbf: float, mttr: float,
+                         distribution: str, kind: str, rng: random.Random):
+        while True:
+            yield self.env.timeout(self._sample(mtbf, distribution, rng))
+            yield from self._outage(segment_id, self._sample(mttr, distribution, rng), kind)
+
+    def _track(self, record: FaultRecord):
+        """Kaydın tepe iş yükünü kuyruk olaylarıyla izlemeye başlar"""
+        self._tracked.append(record)
+        if self._queue_subscription is None and self.line.probes is not NO_PROBES:
+            self._queue_subscription = self.line.probes.subscribe(QUEUED, self._on_queued)
+
+    def _untrack(self, record: FaultRecord):
+        self._tracked.remove(record)
+        if not self._tracked and self._queue_subscription is not None:
+            self.line.probes.unsubscribe(self._queue_subscription)
+            self._queue_subscription = None
+
+    def _on_queued(self, event: int, packet, where: int):
+        backlog = self.backlog
+        for record in self._tracked:
+            if backlog > record.backlog_peak:
+                record.backlog_peak = backlog
+
+    def _outage(self, segment_id: str, duration: float, kind: str):
+        """Segmenti duration boyunca durdurur ve toparlanmayı izlemeye başlar"""
+        record = FaultRecord(segment_id, kind, self.env.now, self.backlog)
+        self.records.append(record)
+        self._track(record)
+        self.line.stop_segment(segment_id)
+        print(f"⛔ t={self.env.now:.1f}s: {segment_id} durdu ({kind}, {duration:.1f}s)")
+
+        if self._queue_subscription is not None:
+            yield self.env.timeout(duration)
+        else:
+            # Veri yolu yok: duruş boyunca kontrol aralığıyla örnekle
+            end = self.env.now + duration
+            while self.env.now < end:
+                yield self.env.timeout(min(self.recovery_check_interval, end - self.env.now))
+                record.backlog_peak = max(record.backlog_peak, self.backlog)
+
+        self.line.resume_segment(segment_id)
+        record.end = self.env.now
+        record.backlog_peak = max(record.backlog_peak, self.backlog)
+        print(f"🔧 t={self.env.now:.1f}s: {segment_id} yeniden çalışıyor")
+        self.env.process(self._watch_recovery(record))
+
+    def _watch_recovery(self, record: FaultRecord):
+        """İş yükü arıza öncesi seviyeye inene kadar periyodik kontrol"""
+        while self.backlog > record.backlog_before:
+            record.backlog_peak = max(record.backlog_peak, self.backlog)
+            yield self.env.timeout(self.recovery_check_interval)
+        record.recovered_at = self.env.now
+        self._untrack(record)
+
+    def get_statistics(self) -> dict:
+        """Duruş, erişilebilirlik ve toparlanma istatistikleri"""
+        now = self.env.now
+        availability = self.line.get_availability()
+        uptime = now * availability
+        recoveries = [r.recovery_time for r in self.records if r.recovery_time is not None]
+        per_segment: Dict[str, dict] = {}
+        for record in self.records:
+            entry = per_segment.setdefault(record.segment_id, {'faults': 0, 'downtime': 0.0})
+            entry['faults'] += 1
+            entry['downtime'] += record.duration if record.duration is not None else now - record.start
+
+        return {
+            'fault_count': len(self.records),
+            'line_downtime': self.line.total_downtime,
+            'availability': availability,
+            'throughput': self.line.total_packets_processed / now if now > 0 else 0.0,
+            # Sadece hattın tamamen çalışır olduğu süreye göre throughput
+            'availability_adjusted_throughput': (self.line.total_packets_processed / uptime
+                                                 if uptime > 0 else 0.0),
+            'avg_recovery_time': sum(recoveries) / len(recoveries) if recoveries else 0.0,
+            'max_recovery_time': max(recoveries, default=0.0),
+            'unrecovered': sum(1 for r in self.records if r.recovery_time is None),
+            'segments': per_segment,
+            'records': [r.to_dict() for r in self.records],
+        }
+
+    def __repr__(self) -> str:
+        return f"FaultInjector({self.line.id}, faults={len(self.records)})"
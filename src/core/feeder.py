@@ -2,11 +2,14 @@
 Feeder Line: Ana konveyöre paket besleyen kaynak hatlar
 """
 
+import random
 import simpy
 from typing import Optional, Tuple, List, Union
 from .packet import Packet
 from .conveyor import Conveyor
 from .conveyor_line import ConveyorLine
+from .probes import (NO_PROBES, CREATED, QUEUED, MERGED, DROPPED, BLOCKED, UNBLOCKED,
+                     QUEUE_SAMPLE)
 
 
 class FeederLine:
@@ -27,7 +30,11 @@ class FeederLine:
                  production_rate: float = 0.2,  # paket/saniye (varsayılan: her 5 saniyede 1)
                  entry_position: float = 0.0,  # Global giriş pozisyonu
                  max_queue_size: int = 100,
-                 connection_point: Tuple[float, float] = None  # Geriye uyumluluk için
+                 connection_point: Tuple[float, float] = None,  # Geriye uyumluluk için
+                 destinations: Optional[List[str]] = None,
+                 priority_weight: float = 1.0,
+                 packet_mix: Optional[List[dict]] = None,
+                 seed: int = 0
                 ):
         """
         Args:
@@ -38,12 +45,38 @@ class FeederLine:
             entry_position: Hat üzerindeki global giriş pozisyonu (metre)
             max_queue_size: Maksimum kuyruk boyutu
             connection_point: (Eski API) Ana konveyöre bağlantı noktası (x, y)
+            destinations: Üretilen paketlere sırayla atanacak hedefler (None ise hedefsiz)
+            priority_weight: Ağırlıklı merge politikasında feeder ağırlığı
+            packet_mix: Üretilecek paket tipleri [{name, length, width, height, weight}, ...]
+                        weight seçim olasılığı ağırlığıdır (None ise varsayılan boyda paket)
+            seed: Paket tipi seçimi için rastgelelik tohumu
         """
         self.env = env
         self.id = id
         self.target_conveyor = target_conveyor
         self.production_rate = production_rate
         self.max_queue_size = max_queue_size
+        self.destinations = list(destinations) if destinations else []
+        self.priority_weight = priority_weight
+        self.packet_mix = list(packet_mix) if packet_mix else []
+        self._mix_weights = [t.get('weight', 1.0) for t in self.packet_mix]
+        # Feeder başına ayrı akış: feeder eklemek diğerlerinin paket dizisini değiştirmez
+        self._rng = random.Random(f"{seed}:{id}")
+
+        # Merge arbitrajı (None ise feeder kendi başına aktarır)
+        self.arbiter = None
+        # Öngörülü merge (MergeSlotPlanner.register atar): boşluk tahmin edilip
+        # rezerve edilir, paket tam o anda bırakılır (None ise sorgulama)
+        self.slot_planner = None
+        self._arrival: Optional[simpy.Event] = None
+
+        # Gözlemci veri yolu (ProbeBus.attach atar) ve feeder'ın olaylardaki index'i
+        self.probes = NO_PROBES
+        self.probe_index = 0
+
+        # Paket geçmişi örneklemesi (None ise tüm paketler tam geçmiş tutar)
+        self.trace_policy = None
+        self.transfer_interval = 0.5  # Transfer denemesi aralığı (saniye)
 
         # Giriş pozisyonunu belirle
         if connection_point is not None:
@@ -58,11 +91,17 @@ class FeederLine:
         self.queue: List[Packet] = []  # Bekleyen paketler
         self.total_produced = 0
         self.total_transferred = 0
+        self.total_dropped = 0        # Kuyruk dolu olduğu için atılan
         self.total_blocked_time = 0.0
+        self.total_block_events = 0
+        self.total_attempts = 0       # try_transfer çağrıları
+        self.failed_attempts = 0      # Yer bulunamayan denemeler
+        # Öngörülü modda rezerve edilen slotu bekleme süresi (bloke sayılmaz)
+        self.total_slot_wait_time = 0.0
         self.is_blocked = False
         self.last_block_time = 0.0
         
-        # Performans metrikleri
+        # Performans geçmişleri: yalnızca FeederHistoryProbe abone olduğunda dolar
         self.queue_length_history = []
         self.block_events = []
         
@@ -76,19 +115,40 @@ class FeederLine:
         while True:
             # Yeni paket üret
             packet_counter += 1
+            packet_id = f"{self.id}_PKT_{packet_counter:03d}"
             packet = Packet(
-                id=f"{self.id}_PKT_{packet_counter:03d}",
+                id=packet_id,
                 source_feeder=self.id,
-                created_at=self.env.now
+                created_at=self.env.now,
+                traced=(self.trace_policy is None
+                        or self.trace_policy.should_trace(packet_id, self.id, packet_counter))
             )
+            if self.packet_mix:
+                packet_type = self._rng.choices(self.packet_mix, weights=self._mix_weights)[0]
+                packet.packet_type = packet_type['name']
+                packet.length = packet_type.get('length', packet.length)
+                packet.width = packet_type.get('width', packet.width)
+                packet.height = packet_type.get('height', packet.height)
+            if self.destinations:
+                packet.destination = self.destinations[(packet_counter - 1) % len(self.destinations)]
             
             self.total_produced += 1
+            if self.probes.handlers[CREATED]:
+                self.probes.emit(CREATED, packet, self.probe_index)
             
             # Kuyruğa ekle
             if len(self.queue) < self.max_queue_size:
                 self.queue.append(packet)
+                if self.probes.handlers[QUEUED]:
+                    self.probes.emit(QUEUED, packet, self.probe_index)
+                if self._arrival is not None:
+                    self._arrival.succeed()
+                    self._arrival = None
                 print(f"📦 t={self.env.now:.1f}s: {self.id} → {packet.id} üretildi (kuyruk: {len(self.queue)})")
             else:
+                self.total_dropped += 1
+                if self.probes.handlers[DROPPED]:
+                    self.probes.emit(DROPPED, packet, self.probe_index)
                 print(f"⚠️  t={self.env.now:.1f}s: {self.id} → Kuyruk dolu! {packet.id} atıldı")
             
             # Bir sonraki üretim için bekle
@@ -100,47 +160,122 @@ class FeederLine:
         Kuyruktaki paketleri ana konveyöre aktarmayı dener.
         Sürekli kontrol eder ve yer olduğunda transfer eder.
         Paketler feeder'ın bağlantı noktasından konveyöre girer.
+
+        Bir MergeArbiter atanmışsa feeder doğrudan aktarmaz; her denemede
+        arbiter'a talep bırakır ve aktarım sırasına politika karar verir.
+        Bir MergeSlotPlanner atanmışsa öngörülü modda aktarır.
         """
+        if self.slot_planner is not None:
+            yield from self._predictive_transfer()
+            return
+
         while True:
             if self.queue:
-                packet = self.queue[0]  # İlk pakete bak (FIFO)
-
-                # Ana konveyöre aktarmayı dene (feeder'ın giriş pozisyonundan)
-                if self.target_conveyor.accept_packet(packet, self.entry_position):
-                    # Başarılı transfer
-                    self.queue.pop(0)
-                    self.total_transferred += 1
-                    
-                    # Bloke durumundan çık
-                    if self.is_blocked:
-                        block_duration = self.env.now - self.last_block_time
-                        self.total_blocked_time += block_duration
-                        self.is_blocked = False
-                        print(f"✅ t={self.env.now:.1f}s: {self.id} → {packet.id} aktarıldı (bloke süresi: {block_duration:.1f}s)")
-                    else:
-                        print(f"✅ t={self.env.now:.1f}s: {self.id} → {packet.id} aktarıldı")
-                    
-                    # Paket bekleme süresini güncelle
-                    if packet.wait_events:
-                        packet.stop_waiting(self.env.now)
+                if self.arbiter is not None:
+                    self.arbiter.request(self)
                 else:
-                    # Transfer başarısız - bloke durumuna geç
-                    if not self.is_blocked:
-                        self.is_blocked = True
-                        self.last_block_time = self.env.now
-                        packet.start_waiting(self.id, self.env.now)
-                        self.block_events.append({
-                            'time': self.env.now,
-                            'queue_length': len(self.queue)
-                        })
-                        print(f"🚫 t={self.env.now:.1f}s: {self.id} → BLOKE! (kuyruk: {len(self.queue)})")
-            
-            # Kuyruk durumunu kaydet
-            self.record_queue_length()
-            
+                    self.try_transfer()
+
+            # Kuyruk örneği (gözlemci varsa)
+            if self.probes.handlers[QUEUE_SAMPLE]:
+                self.probes.emit(QUEUE_SAMPLE, None, self.probe_index)
+
             # Kısa bir süre bekle (transfer denemesi aralığı)
-            yield self.env.timeout(0.5)
-    
+            yield self.env.timeout(self.transfer_interval)
+
+    def _predictive_transfer(self):
+        """
+        Öngörülü merge: bir sonraki boşluğun pencereden geçeceği an hesaplanır,
+        rezerve edilir ve paket tam o anda bırakılır. Planlanan slotu beklemek
+        bloke sayılmaz (slot bekleme süresi ayrı tutulur); feeder ancak slotta
+        aktaramazsa bloke olur. Kuyruk boşken yeni paket gelene kadar olay beklenir.
+        """
+        planner = self.slot_planner
+        while True:
+            if not self.queue:
+                self._arrival = self.env.event()
+                yield self._arrival
+                continue
+
+            slot = planner.forecast(self)
+            if slot is None:
+                # Analitik tahmin yok (ZPA girişi, duran segment): sorgulamaya dön
+                self.try_transfer()
+                if self.probes.handlers[QUEUE_SAMPLE]:
+                    self.probes.emit(QUEUE_SAMPLE, None, self.probe_index)
+                yield self.env.timeout(self.transfer_interval)
+                continue
+
+            if slot > self.env.now:
+                reservation = planner.reserve(self, slot)
+                if self.probes.handlers[QUEUE_SAMPLE]:
+                    self.probes.emit(QUEUE_SAMPLE, None, self.probe_index)
+                wait_start = self.env.now
+                yield self.env.timeout(slot - self.env.now)
+                if not self.is_blocked:
+                    self.total_slot_wait_time += self.env.now - wait_start
+                planner.release(reservation)
+
+            if not self.try_transfer():
+                # Tahmin tutmadı (adım gecikmesi, hız değişimi): bir adım sonra yeniden hesapla
+                planner.total_misses += 1
+                if self.probes.handlers[QUEUE_SAMPLE]:
+                    self.probes.emit(QUEUE_SAMPLE, None, self.probe_index)
+                yield self.env.timeout(planner.retry_interval)
+
+    def try_transfer(self) -> bool:
+        """
+        Kuyruk başındaki paketi ana konveyöre aktarmayı bir kez dener.
+        Bloke durumu ve istatistikleri günceller.
+
+        Returns:
+            True eğer paket aktarıldıysa
+        """
+        if not self.queue:
+            return False
+
+        packet = self.queue[0]  # İlk pakete bak (FIFO)
+        self.total_attempts += 1
+
+        # Ana konveyöre aktarmayı dene (feeder'ın giriş pozisyonundan)
+        if self.target_conveyor.accept_packet(packet, self.entry_position):
+            # Başarılı transfer
+            self.queue.pop(0)
+            self.total_transferred += 1
+            # Paket bekleme süresini güncelle (gözlemciler kapanmış beklemeyi görür)
+            if packet.wait_started_at is not None:
+                packet.stop_waiting(self.env.now)
+            if self.probes.handlers[MERGED]:
+                self.probes.emit(MERGED, packet, self.probe_index)
+
+            # Bloke durumundan çık
+            if self.is_blocked:
+                block_duration = self.env.now - self.last_block_time
+                self.total_blocked_time += block_duration
+                self.is_blocked = False
+                if self.probes.handlers[UNBLOCKED]:
+                    self.probes.emit(UNBLOCKED, packet, self.probe_index)
+                print(f"✅ t={self.env.now:.1f}s: {self.id} → {packet.id} aktarıldı (bloke süresi: {block_duration:.1f}s)")
+            else:
+                print(f"✅ t={self.env.now:.1f}s: {self.id} → {packet.id} aktarıldı")
+            return True
+
+        # Transfer başarısız - bloke durumuna geç
+        self.failed_attempts += 1
+        self._mark_blocked(packet)
+        return False
+
+    def _mark_blocked(self, packet: Packet):
+        """Kuyruk başı paket girmeyi bekliyor: bloke durumuna geç (zaten bloke ise değişmez)"""
+        if not self.is_blocked:
+            self.is_blocked = True
+            self.last_block_time = self.env.now
+            packet.start_waiting(self.id, self.env.now)
+            if self.probes.handlers[BLOCKED]:
+                self.probes.emit(BLOCKED, packet, self.probe_index)
+            self.total_block_events += 1
+            print(f"🚫 t={self.env.now:.1f}s: {self.id} → BLOKE! (kuyruk: {len(self.queue)})")
+
     def record_queue_length(self):
         """Kuyruk uzunluğunu geçmişe kaydet"""
         self.queue_length_history.append({
@@ -194,12 +329,16 @@ class FeederLine:
             'id': self.id,
             'total_produced': self.total_produced,
             'total_transferred': self.total_transferred,
+            'total_dropped': self.total_dropped,
             'current_queue': len(self.queue),
             'total_blocked_time': self.get_current_blocked_time(),  # Devam eden bloke dahil
             'is_blocked': self.is_blocked,
             'utilization_rate': self.get_utilization_rate(),
             'transfer_rate': self.get_transfer_rate(),
-            'block_events': len(self.block_events)
+            'block_events': self.total_block_events,
+            'transfer_attempts': self.total_attempts,
+            'failed_attempts': self.failed_attempts,
+            'slot_wait_time': self.total_slot_wait_time
         }
     
     def __repr__(self) -> str:
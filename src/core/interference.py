@@ -0,0 +1,198 @@
+"""
+Merge noktalarında bloke kök neden ataması ve feeder-feeder girişim matrisi.
+
+Feeder bloke olduğunda giriş penceresini dolduran ana hat paketleri
+ConveyorLine.blocking_packets ile (bisect komşu sorgusu, hat taraması yok)
+bulunur ve bloke süresi bu paketlerin kaynak feeder'larına paylaştırılır.
+Bloke boyunca feeder'ın her transfer denemesi anında (QUEUE_SAMPLE) pencere
+yeniden örneklenir; iki örnek arasındaki süre önceki örnekteki kaynaklara
+yazılır. Böylece her kurbanın atanmış süresi toplam bloke süresine eşittir.
+
+Paketsiz nedenler ayrı sütunlardır: segment duruşu, hat dışı kaynak
+(source_feeder yok) ve örnek anında penceresi boş bulunan denemeler.
+"""
+
+from typing import Dict, List, Optional
+from .probes import ProbeBus, BLOCKED, UNBLOCKED, QUEUE_SAMPLE
+
+
+SEGMENT_STOP = "segment_stop"      # Giriş segmenti durmuş
+EXTERNAL = "external"              # Kaynak feeder'ı olmayan paket (başka hattan)
+UNATTRIBUTED = "unattributed"      # Pencerede paket yok (örn. bölge rezervasyonu)
+
+
+class _Episode:
+    """Açık bir bloke dönemi"""
+
+    __slots__ = ("start", "last", "weights", "sources")
+
+    def __init__(self, start: float, weights: Dict[str, float]):
+        self.start = start
+        self.last = start
+        self.weights = weights
+        self.sources: Dict[str, float] = {}
+
+
+class BlockAttribution:
+    """
+    Bloke dönemlerini giriş penceresindeki paketlerin kaynaklarına atar.
+
+    Kullanım:
+        attribution = BlockAttribution(probes)
+        ...
+        stats = attribution.get_statistics()
+        stats['matrix']['FEEDER_B']['FEEDER_A']   # A'nın paketleri yüzünden B'nin bloke saniyesi
+        stats['throttle_candidate']               # Diğerlerini en çok bloke eden feeder
+    """
+
+    def __init__(self, probes: ProbeBus, keep_episodes: bool = True):
+        """
+        Args:
+            probes: Hat ve feeder'ların bağlı olduğu veri yolu
+            keep_episodes: Dönem bazında kayıtları da tut (bloke sayısı kadar)
+        """
+        self.probes = probes
+        self.line = probes.line
+        self.feeders = probes.feeders
+        self.keep_episodes = keep_episodes
+        self.feeder_ids = [f.id for f in self.feeders]
+        self.columns = self.feeder_ids + [SEGMENT_STOP, EXTERNAL, UNATTRIBUTED]
+
+        # Kurban feeder -> kaynak -> bloke saniyesi / dönem sayısı
+        self.matrix: Dict[str, Dict[str, float]] = {
+            victim: {source: 0.0 for source in self.columns} for victim in self.feeder_ids}
+        self.episode_counts: Dict[str, Dict[str, int]] = {
+            victim: {source: 0 for source in self.columns} for victim in self.feeder_ids}
+        self.episodes: List[dict] = []
+        self._open: List[Optional[_Episode]] = [None] * len(self.feeders)
+        self.samples = 0
+
+        self._subscriptions = [
+            probes.subscribe(BLOCKED, self._on_blocked),
+            probes.subscribe(UNBLOCKED, self._on_unblocked),
+            probes.subscribe(QUEUE_SAMPLE, self._on_queue_sample),
+        ]
+
+    def sample_window(self, feeder) -> Dict[str, float]:
+        """
+        Feeder'ın giriş penceresini şu an kimin doldurduğunu bulur.
+
+        Returns:
+            Kaynak -> pay (toplamı 1.0)
+        """
+        self.samples += 1
+        line = self.line
+        position = max(0.0, min(feeder.entry_position, line.total_length - 0.1))
+        segment = line.get_segment_at(position)
+        if segment is not None and segment.stopped:
+            return {SEGMENT_STOP: 1.0}
+
+        length = feeder.queue[0].length if feeder.queue else line.default_packet_length
+        blockers = line.blocking_packets(position, length)
+        if not blockers:
+            return {UNATTRIBUTED: 1.0}
+        share = 1.0 / len(blockers)
+        weights: Dict[str, float] = {}
+        for packet in blockers:
+            source = packet.source_feeder if packet.source_feeder in self.matrix else EXTERNAL
+            weights[source] = weights.get(source, 0.0) + share
+        return weights
+
+    def _advance(self, index: int, episode: _Episode, now: float):
+        """Son örnekten bu yana geçen süreyi son örnekteki kaynaklara yazar"""
+        elapsed = now - episode.last
+        if elapsed > 0:
+            row = self.matrix[self.feeder_ids[index]]
+            for source, share in episode.weights.items():
+                row[source] += elapsed * share
+                episode.sources[source] = episode.sources.get(source, 0.0) + elapsed * share
+        episode.last = now
+
+    def _on_blocked(self, event: int, packet, where: int):
+        feeder = self.feeders[where]
+        weights = self.sample_window(feeder)
+        episode = _Episode(self.probes.env.now, weights)
+        episode.sources = {source: 0.0 for source in weights}
+        self._open[where] = episode
+
+    def _on_queue_sample(self, event: int, packet, where: int):
+        episode = self._open[where]
+        if episode is None:
+            return
+        self._advance(where, episode, self.probes.env.now)
+        episode.weights = self.sample_window(self.feeders[where])
+        for source in episode.weights:
+            episode.sources.setdefault(source, 0.0)
+
+    def _on_unblocked(self, event: int, packet, where: int):
+        episode = self._open[where]
+        if episode is None:
+            return
+        now = self.probes.env.now
+        self._advance(where, episode, now)
+        self._open[where] = None
+        victim = self.feeder_ids[where]
+        counts = self.episode_counts[victim]
+        for source in episode.sources:
+            counts[source] += 1
+        if self.keep_episodes:
+            self.episodes.append({
+                'feeder': victim,
+                'start': episode.start,
+                'end': now,
+                'sources': dict(episode.sources),
+            })
+
+    def flush(self):
+        """Açık dönemlerin süresini şimdiye kadar matrise yazar (dönemler açık kalır)"""
+        now = self.probes.env.now
+        for index, episode in enumerate(self._open):
+            if episode is not None:
+                self._advance(index, episode, now)
+
+    def get_statistics(self) -> dict:
+        """
+        Girişim matrisi ve throttle önerisi.
+
+        Returns:
+            {'matrix', 'share', 'episode_counts', 'inflicted', 'self_inflicted',
+             'suffered', 'throttle_candidate', 'episodes', 'samples'}
+        """
+        self.flush()
+        suffered = {victim: sum(row.values()) for victim, row in self.matrix.items()}
+        share = {
+            victim: {source: (seconds / suffered[victim] if suffered[victim] > 0 else 0.0)
+                     for source, seconds in row.items()}
+            for victim, row in self.matrix.items()
+        }
+        inflicted = {source: sum(self.matrix[victim][source] for victim in self.feeder_ids
+                                 if victim != source)
+                     for source in self.feeder_ids}
+        self_inflicted = {source: self.matrix[source][source] for source in self.feeder_ids}
+
+        # Diğer feeder'ları en çok bloke eden; yoksa kendi kendini en çok bloke eden
+        candidate = None
+        if any(v > 0 for v in inflicted.values()):
+            candidate = max(inflicted, key=inflicted.get)
+        elif any(v > 0 for v in self_inflicted.values()):
+            candidate = max(self_inflicted, key=self_inflicted.get)
+
+        return {
+            'matrix': {victim: dict(row) for victim, row in self.matrix.items()},
+            'share': share,
+            'episode_counts': {victim: dict(row) for victim, row in self.episode_counts.items()},
+            'inflicted': inflicted,
+            'self_inflicted': self_inflicted,
+            'suffered': suffered,
+            'throttle_candidate': candidate,
+            'episodes': len(self.episodes),
+            'samples': self.samples,
+        }
+
+    def detach(self):
+        for subscription in self._subscriptions:
+            self.probes.unsubscribe(subscription)
+        self._subscriptions = []
+
+    def __repr__(self) -> str:
+        return f"BlockAttribution({len(self.feeder_ids)} feeders, {self.samples} samples)"
@@ -0,0 +1,250 @@
+"""
+Sabit bellekli gecikme dağılımları: HDR tarzı log-kovalı histogramlar.
+
+Değerler çözünürlük birimine (varsayılan 1 ms) yuvarlanıp üstel kovalara
+ayrılır; her üstel kova sabit sayıda doğrusal alt kovaya bölünür. Göreli
+hata significant_digits ile sınırlıdır (2 basamak = ~%1) ve kova sayısı
+yalnızca değer aralığına bağlıdır: kaç paket geçerse geçsin bellek sabittir.
+
+LatencyProbe probe veri yoluna abone olup paket başına şunları kaydeder:
+    - merge bekleme: üretim -> ana hatta aktarım (feeder bazında)
+    - bloke bekleme: kuyruk başında bloke beklenen süre (Packet.total_wait_time)
+    - kalış süresi: segmente giriş -> çıkış (segment bazında)
+    - gecikme: üretim -> hattan ayrılış (hat sonu veya ayırıcı, feeder bazında)
+"""
+
+import math
+from typing import Dict, List, Sequence
+from .probes import ProbeBus, MERGED, SEGMENT, EXIT, DIVERTED, RECIRCULATED
+
+
+DEFAULT_PERCENTILES = (50.0, 95.0, 99.0)
+
+
+class LogHistogram:
+    """
+    HDR tarzı log-kovalı histogram (sabit bellek, sınırlı göreli hata).
+
+    Kullanım:
+        hist = LogHistogram(resolution=0.001, max_value=86400.0)
+        hist.record(2.35)
+        hist.percentile(99.0)
+    """
+
+    def __init__(self, resolution: float = 0.001, max_value: float = 86400.0,
+                 significant_digits: int = 2):
+        """
+        Args:
+            resolution: En küçük ayırt edilen değer (saniye)
+            max_value: Kaydedilebilen en büyük değer; üstü bu değere kırpılır
+            significant_digits: Korunan anlamlı basamak (1-5)
+        """
+        if resolution <= 0 or max_value <= resolution:
+            raise ValueError(f"Geçersiz histogram aralığı: çözünürlük {resolution}, en fazla {max_value}")
+        if not 1 <= significant_digits <= 5:
+            raise ValueError(f"Anlamlı basamak 1-5 arası olmalı: {significant_digits}")
+        self.resolution = resolution
+        self.max_value = max_value
+        self.significant_digits = significant_digits
+
+        # Alt kova sayısı: 2 * 10^basamak değerini karşılayan 2'nin kuvveti
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.sub_bucket_count = 1 << self.sub_bucket_bits
+        self.sub_bucket_half = self.sub_bucket_count >> 1
+        self.max_units = int(max_value / resolution)
+        self.counts: List[int] = [0] * (self._index(self.max_units) + 1)
+
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.clipped = 0
+
+    def _index(self, units: int) -> int:
+        bucket = units.bit_length() - self.sub_bucket_bits
+        if bucket < 0:
+            bucket = 0
+        return bucket * self.sub_bucket_half + (units >> bucket)
+
+    def _value_at(self, index: int) -> float:
+        """Kovanın orta noktası (saniye); çözünürlük altı kova 0 döner"""
+        if index == 0:
+            return 0.0
+        bucket = index // self.sub_bucket_half - 1
+        if bucket < 0:
+            bucket = 0
+        sub = index - bucket * self.sub_bucket_half
+        return ((sub << bucket) + (1 << bucket) / 2.0) * self.resolution
+
+    def record(self, value: float):
+        """Değeri kaydeder (negatifler 0'a, max_value üstü max_value'ya kırpılır)"""
+        if value < 0.0:
+            value = 0.0
+        units = int(value / self.resolution)
+        if units > self.max_units:
+            units = self.max_units
+            self.clipped += 1
+        self.counts[self._index(units)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LogHistogram"):
+        """Aynı parametreli başka bir histogramı bu histograma ekler"""
+        if (other.resolution, other.max_value, other.significant_digits) != \
+                (self.resolution, self.max_value, self.significant_digits):
+            raise ValueError("Farklı parametreli histogramlar birleştirilemez")
+        counts = self.counts
+        for index, n in enumerate(other.counts):
+            if n:
+                counts[index] += n
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.clipped += other.clipped
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """
+        q. yüzdelik (0-100). Kova orta noktası döner; sonuç gerçek
+        min/max aralığına sıkıştırılır.
+        """
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(self.count * q / 100.0))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(max(self._value_at(index), self.min), self.max)
+        return self.max
+
+    def summary(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+        """{'count', 'mean', 'min', 'max', 'p50', 'p95', 'p99'} özeti"""
+        result = {
+            'count': self.count,
+            'mean': self.mean,
+            'min': self.min if self.count else 0.0,
+            'max': self.max,
+        }
+        for q in percentiles:
+            result[f'p{q:g}'] = self.percentile(q)
+        return result
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __repr__(self) -> str:
+        return (f"LogHistogram(count={self.count}, p50={self.percentile(50):.3f}s, "
+                f"p99={self.percentile(99):.3f}s, {len(self.counts)} kova)")
+
+
+class LatencyProbe:
+    """
+    Merge bekleme, segment kalış ve üretimden ayrılışa gecikme dağılımlarını
+    feeder/segment bazında LogHistogram'larda tutan gözlemci.
+
+    Segment kalışı paket üzerindeki segment_entered_at / dwell_segment
+    alanlarıyla izlenir; bellek paket sayısından bağımsızdır.
+    """
+
+    def __init__(self, probes: ProbeBus, resolution: float = 0.001,
+                 max_value: float = 86400.0, significant_digits: int = 2):
+        """
+        Args:
+            probes: Hat ve feeder'ların bağlı olduğu veri yolu
+            resolution, max_value, significant_digits: LogHistogram parametreleri
+        """
+        self.probes = probes
+        self._params = (resolution, max_value, significant_digits)
+        self.merge_wait: Dict[str, LogHistogram] = {f.id: self._histogram() for f in probes.feeders}
+        self.blocked_wait: Dict[str, LogHistogram] = {f.id: self._histogram() for f in probes.feeders}
+        self.latency: Dict[str, LogHistogram] = {f.id: self._histogram() for f in probes.feeders}
+        self.dwell: Dict[str, LogHistogram] = {s.id: self._histogram() for s in probes.line.segments}
+        self._feeder_ids = [f.id for f in probes.feeders]
+        self._segment_ids = [s.id for s in probes.line.segments]
+        self._subscriptions = [
+            probes.subscribe(MERGED, self._on_merged),
+            probes.subscribe(SEGMENT, self._on_segment),
+            probes.subscribe((EXIT, DIVERTED), self._on_leave),
+            probes.subscribe(RECIRCULATED, self._on_recirculated),
+        ]
+
+    def _histogram(self) -> LogHistogram:
+        return LogHistogram(*self._params)
+
+    def _close_dwell(self, packet, now: float):
+        if packet.dwell_segment >= 0:
+            self.dwell[self._segment_ids[packet.dwell_segment]].record(now - packet.segment_entered_at)
+            packet.dwell_segment = -1
+
+    def _on_merged(self, event: int, packet, where: int):
+        feeder_id = self._feeder_ids[where]
+        self.merge_wait[feeder_id].record(self.probes.env.now - packet.created_at)
+        self.blocked_wait[feeder_id].record(packet.total_wait_time)
+
+    def _on_segment(self, event: int, packet, where: int):
+        now = self.probes.env.now
+        self._close_dwell(packet, now)
+        packet.dwell_segment = where
+        packet.segment_entered_at = now
+
+    def _on_recirculated(self, event: int, packet, where: int):
+        # Devridaime alınan paket hattan ayrılmış sayılmaz; yalnızca kalış kapanır
+        self._close_dwell(packet, self.probes.env.now)
+
+    def _on_leave(self, event: int, packet, where: int):
+        now = self.probes.env.now
+        self._close_dwell(packet, now)
+        histogram = self.latency.get(packet.source_feeder)
+        if histogram is not None:
+            histogram.record(now - packet.created_at)
+
+    def line_latency(self) -> LogHistogram:
+        """Tüm feeder'ların birleşik gecikme dağılımı"""
+        total = self._histogram()
+        for histogram in self.latency.values():
+            total.merge(histogram)
+        return total
+
+    def line_merge_wait(self) -> LogHistogram:
+        """Tüm feeder'ların birleşik merge bekleme dağılımı"""
+        total = self._histogram()
+        for histogram in self.merge_wait.values():
+            total.merge(histogram)
+        return total
+
+    def get_statistics(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> dict:
+        """Hat, feeder ve segment bazında dağılım özetleri"""
+        return {
+            'line': {
+                'latency': self.line_latency().summary(percentiles),
+                'merge_wait': self.line_merge_wait().summary(percentiles),
+            },
+            'feeders': {
+                feeder_id: {
+                    'merge_wait': self.merge_wait[feeder_id].summary(percentiles),
+                    'blocked_wait': self.blocked_wait[feeder_id].summary(percentiles),
+                    'latency': self.latency[feeder_id].summary(percentiles),
+                }
+                for feeder_id in self._feeder_ids
+            },
+            'segments': {segment_id: self.dwell[segment_id].summary(percentiles)
+                         for segment_id in self._segment_ids},
+        }
+
+    def detach(self):
+        for subscription in self._subscriptions:
+            self.probes.unsubscribe(subscription)
+        self._subscriptions = []
+
+    def __repr__(self) -> str:
+        line = self.line_latency()
+        return f"LatencyProbe({line.count} paket, p99={line.percentile(99):.2f}s)"
@@ -0,0 +1,426 @@
+"""
+Canlı yayın: Gerçek zamanlı (RealtimeEnvironment) koşuda hat durumunu yerel
+bir HTTP uç noktasından Server-Sent Events olarak tarayıcıya akıtır.
+
+Kareler tam snapshot yerine farktır (delta): hatta giren, çıkan, segment
+değiştiren paketler ve değişen sayaçlar. Paket pozisyonları tahminle
+(dead reckoning) gönderilir: istemci son pozisyon + hız ile paketi kendisi
+ilerletir, sunucu yalnızca tahmin gerçek pozisyondan tolerans kadar
+saptığında düzeltme yollar. Sabit hızla akan binlerce paket kare başına
+neredeyse hiç bayt üretmez.
+
+Kare hızı sınırlıdır (fps). Kare tek kez kodlanır ve her istemcinin sınırlı
+kuyruğuna bloklamadan bırakılır; yetişemeyen istemcinin kuyruğu boşaltılır
+ve ona bir sonraki karede tam durum (keyframe) gönderilir. Böylece yavaş bir
+tarayıcı simülasyonu yavaşlatmaz.
+"""
+
+import json
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+import simpy
+
+
+class DeltaEncoder:
+    """Hat durumunu kareler arası farka çevirir (simülasyon thread'inde çalışır)"""
+
+    def __init__(self, env: simpy.Environment, line, feeders: List, tolerance: float = 0.25):
+        """
+        Args:
+            env: SimPy environment
+            line: ConveyorLine
+            feeders: FeederLine listesi
+            tolerance: İstemci tahmininden izin verilen en büyük sapma (metre)
+        """
+        self.env = env
+        self.line = line
+        self.feeders = feeders
+        self.tolerance = tolerance
+        self._feeder_index = {f.id: i for i, f in enumerate(feeders)}
+
+        self._next_handle = 0
+        # Paket id -> [handle, segment index, son pozisyon, çapa pozisyonu, çapa zamanı, hız, feeder]
+        self._packets: Dict[str, list] = {}
+        self._counters: Dict[str, float] = {}
+        self._last_time: Optional[float] = None
+
+    def layout(self) -> dict:
+        """Değişmeyen yerleşim bilgisi (istemci bağlanınca bir kez gönderilir)"""
+        return {
+            'type': 'layout',
+            'length': self.line.total_length,
+            'segments': [
+                {'id': s.id, 'start': s.start_offset, 'end': s.end_offset, 'kind': s.kind}
+                for s in self.line.segments
+            ],
+            'feeders': [{'id': f.id, 'entry': f.entry_position} for f in self.feeders],
+        }
+
+    def _segment_speed(self, index: int) -> float:
+        if not 0 <= index < len(self.line.segments):
+            return 0.0
+        segment = self.line.segments[index]
+        return 0.0 if segment.stopped else segment.speed
+
+    def _read_counters(self) -> Dict[str, float]:
+        counters = {'exits': self.line.total_packets_processed}
+        for f in self.feeders:
+            counters[f'{f.id}.produced'] = f.total_produced
+            counters[f'{f.id}.transferred'] = f.total_transferred
+            counters[f'{f.id}.dropped'] = f.total_dropped
+            counters[f'{f.id}.queue'] = len(f.queue)
+            counters[f'{f.id}.blocked'] = int(f.is_blocked)
+        for s in self.line.segments:
+            # Duran segment istemcide 0 hızla çizilir
+            counters[f'{s.id}.speed'] = 0.0 if s.stopped else s.speed
+        return counters
+
+    def frame(self) -> dict:
+        """Son kareden bu yana değişenleri içeren delta karesi"""
+        now = self.env.now
+        dt = now - self._last_time if self._last_time is not None else 0.0
+        self._last_time = now
+
+        entered, updated = [], []
+        alive = set()
+        for packet in self.line.packets_in_transit:
+            alive.add(packet.id)
+            seg = packet.segment_index
+            pos = packet.position
+            state = self._packets.get(packet.id)
+            if state is None:
+                handle = self._next_handle
+                self._next_handle += 1
+                speed = self._segment_speed(seg)
+                feeder = self._feeder_index.get(packet.source_feeder, -1)
+                self._packets[packet.id] = [handle, seg, pos, pos, now, speed, feeder]
+                entered.append([handle, feeder, seg, round(pos, 3), speed])
+                continue
+
+            handle, last_seg, last_pos, anchor_pos, anchor_time, speed, _ = state
+            predicted = anchor_pos + speed * (now - anchor_time)
+            if seg != last_seg or abs(predicted - pos) > self.tolerance:
+                speed = (pos - last_pos) / dt if dt > 0 else 0.0
+                state[3], state[4], state[5] = pos, now, speed
+                updated.append([handle, seg, round(pos, 3), round(speed, 3)])
+            state[1], state[2] = seg, pos
+
+        exited = []
+        if len(alive) != len(self._packets):
+            for packet_id in [pid for pid in self._packets if pid not in alive]:
+                exited.append(self._packets.pop(packet_id)[0])
+
+        counters = self._read_counters()
+        changed = {k: v for k, v in counters.items() if self._counters.get(k) != v}
+        self._counters = counters
+
+        frame = {'type': 'delta', 't': round(now, 3)}
+        if entered:
+            frame['enter'] = entered
+        if exited:
+            frame['exit'] = exited
+        if updated:
+            frame['update'] = updated
+        if changed:
+            frame['counters'] = changed
+        return frame
+
+    def keyframe(self) -> dict:
+        """İstemcinin sıfırdan kurabileceği tam durum (son kare anına göre)"""
+        return {
+            'type': 'key',
+            't': round(self._last_time or 0.0, 3),
+            'packets': [
+                [state[0], state[6], state[1], round(state[3], 3), round(state[4], 3), round(state[5], 3)]
+                for state in self._packets.values()
+            ],
+            'counters': self._counters,
+        }
+
+
+class _Client:
+    def __init__(self, maxsize: int):
+        self.queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=maxsize)
+        self.needs_keyframe = True
+
+
+class LiveStream:
+    """
+    Kare üretim process'i ve SSE sunucusu.
+
+    Kullanım:
+        env = simpy.rt.RealtimeEnvironment(factor=1 / speed, strict=False)
+        stream = LiveStream(env, line, feeders, fps=10, speed=speed, port=8765)
+        stream.start()
+        env.run(until=duration)
+        stream.finish()
+    """
+
+    def __init__(self, env: simpy.Environment, line, feeders: List, fps: float = 10.0,
+                 speed: float = 1.0, host: str = "127.0.0.1", port: int = 8765,
+                 tolerance: float = 0.25, client_buffer: int = 32):
+        """
+        Args:
+            env: SimPy environment (tercihen RealtimeEnvironment)
+            line: ConveyorLine
+            feeders: FeederLine listesi
+            fps: Duvar saatinde saniyedeki en fazla kare
+            speed: Simülasyon hız çarpanı (duvar saniyesi başına simülasyon saniyesi)
+            host: Dinlenecek adres
+            port: Dinlenecek port (0 ise boş bir port seçilir)
+            tolerance: Pozisyon düzeltmesi eşiği (metre)
+            client_buffer: İstemci başına bekleyebilecek en fazla kare
+        """
+        self.env = env
+        self.encoder = DeltaEncoder(env, line, feeders, tolerance)
+        self.frame_interval = speed / fps     # Simülasyon saniyesi cinsinden
+        self.host = host
+        self.port = port
+        self.client_buffer = client_buffer
+
+        self._clients: List[_Client] = []
+        self._clients_lock = threading.Lock()   # Sadece bağlanma/ayrılmada
+        self._layout = json.dumps(self.encoder.layout()).encode("utf-8")
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+        # İstatistikler
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.keyframes_sent = 0
+        self.frames_dropped = 0
+
+    # --- Simülasyon tarafı ---------------------------------------------------
+
+    def frame_process(self):
+        """Sınırlı kare hızıyla delta kareleri üretir"""
+        while True:
+            self.publish(self.encoder.frame())
+            yield self.env.timeout(self.frame_interval)
+
+    def publish(self, frame: dict):
+        """Kareyi tek kez kodlayıp tüm istemcilere bloklamadan dağıtır"""
+        clients = self._clients
+        if not clients:
+            return
+        delta = _sse(frame)
+        key = None
+        for client in clients:
+            if client.needs_keyframe:
+                if key is None:
+                    key = _sse(self.encoder.keyframe())
+                    self.keyframes_sent += 1
+                payload = key
+            else:
+                payload = delta
+            try:
+                client.queue.put_nowait(payload)
+                client.needs_keyframe = False
+                self.bytes_sent += len(payload)
+            except queue.Full:
+                # Yetişemeyen istemci: birikmişi at, sonraki karede tam durum gönder
+                self.frames_dropped += 1
+                _drain(client.queue)
+                client.needs_keyframe = True
+        self.frames_sent += 1
+
+    # --- Sunucu tarafı -------------------------------------------------------
+
+    def _handler_class(self):
+        stream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/":
+                    body = DASHBOARD_HTML.encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                elif path == "/stream":
+                    self._stream()
+                else:
+                    self.send_error(404)
+
+            def _stream(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                client = _Client(stream.client_buffer)
+                with stream._clients_lock:
+                    stream._clients = stream._clients + [client]
+                try:
+                    self.wfile.write(b"data: " + stream._layout + b"\n\n")
+                    self.wfile.flush()
+                    while True:
+                        payload = client.queue.get()
+                        if payload is None:
+                            break
+                        self.wfile.write(payload)
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with stream._clients_lock:
+                        stream._clients = [c for c in stream._clients if c is not client]
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "LiveStream":
+        """Sunucuyu daemon thread'de ve kare process'ini simülasyonda başlatır"""
+        if self._httpd is None:
+            self._httpd = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+            self._httpd.daemon_threads = True
+            self.port = self._httpd.server_address[1]
+            self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                            name="live-stream", daemon=True)
+            self._thread.start()
+        self.env.process(self.frame_process())
+        return self
+
+    def finish(self):
+        """Son kareyi ve koşu bitti işaretini gönderir (bağlantılar açık kalır)"""
+        frame = self.encoder.frame()
+        frame['end'] = True
+        self.publish(frame)
+
+    def stop(self):
+        """İstemci bağlantılarını kapatır ve sunucuyu durdurur"""
+        for client in self._clients:
+            _drain(client.queue)
+            client.queue.put_nowait(None)
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
+            self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/"
+
+    def get_statistics(self) -> dict:
+        return {
+            'clients': len(self._clients),
+            'frames_sent': self.frames_sent,
+            'keyframes_sent': self.keyframes_sent,
+            'frames_dropped': self.frames_dropped,
+            'bytes_sent': self.bytes_sent,
+        }
+
+    def __repr__(self) -> str:
+        return f"LiveStream({self.url}, clients={len(self._clients)}, frames={self.frames_sent})"
+
+
+def _sse(frame: dict) -> bytes:
+    return b"data: " + json.dumps(frame, separators=(",", ":")).encode("utf-8") + b"\n\n"
+
+
+def _drain(q: queue.Queue):
+    try:
+        while True:
+            q.get_nowait()
+    except queue.Empty:
+        pass
+
+
+DASHBOARD_HTML = """<!DOCTYPE html>
+<html lang="tr">
+<head>
+<meta charset="utf-8">
+<title>Konveyör Hattı - Canlı</title>
+<style>
+  body { background: #1e1e1e; color: #ddd; font-family: monospace; margin: 16px; }
+  canvas { background: #111; width: 100%; height: 160px; }
+  #counters { display: grid; grid-template-columns: repeat(auto-fill, minmax(220px, 1fr)); gap: 4px; }
+  .blocked { color: #e74c3c; }
+</style>
+</head>
+<body>
+<h3>Konveyör Hattı <span id="clock">t=0.0s</span> <span id="status"></span></h3>
+<canvas id="line" width="1600" height="160"></canvas>
+<div id="counters"></div>
+<script>
+const COLORS = ["#E74C3C", "#3498DB", "#2ECC71", "#F39C12", "#9B59B6", "#1ABC9C"];
+const canvas = document.getElementById("line"), ctx = canvas.getContext("2d");
+let layout = null, packets = new Map(), counters = {}, simT = 0, wallT = 0, rate = 1;
+
+function segSpeed(s) { return counters[s.id + ".speed"] || 0; }
+
+function apply(msg) {
+  if (msg.type === "layout") { layout = msg; return; }
+  if (msg.type === "key") {
+    packets.clear();
+    for (const [h, f, seg, pos, t0, v] of msg.packets) packets.set(h, {f, seg, pos, t0, v});
+    counters = Object.assign({}, msg.counters);
+  } else {
+    for (const [h, f, seg, pos, v] of msg.enter || []) packets.set(h, {f, seg, pos, t0: msg.t, v});
+    for (const h of msg.exit || []) packets.delete(h);
+    for (const [h, seg, pos, v] of msg.update || []) {
+      const p = packets.get(h);
+      if (p) Object.assign(p, {seg, pos, t0: msg.t, v});
+    }
+    Object.assign(counters, msg.counters || {});
+  }
+  const now = performance.now() / 1000;
+  if (wallT && msg.t > simT) rate = 0.8 * rate + 0.2 * (msg.t - simT) / Math.max(now - wallT, 1e-3);
+  simT = msg.t; wallT = now;
+  if (msg.end) document.getElementById("status").textContent = "(bitti)";
+  renderCounters();
+}
+
+function renderCounters() {
+  const el = document.getElementById("counters");
+  const rows = [`<div>çıkış: ${counters.exits || 0}</div>`, `<div>paket: ${packets.size}</div>`];
+  for (const f of (layout ? layout.feeders : [])) {
+    const b = counters[f.id + ".blocked"] ? " class=blocked" : "";
+    rows.push(`<div${b}>${f.id}: kuyruk ${counters[f.id + ".queue"] || 0}, ` +
+              `aktarım ${counters[f.id + ".transferred"] || 0}, atılan ${counters[f.id + ".dropped"] || 0}</div>`);
+  }
+  el.innerHTML = rows.join("");
+}
+
+function draw() {
+  requestAnimationFrame(draw);
+  if (!layout) return;
+  const W = canvas.width, H = canvas.height, scale = (W - 20) / layout.length;
+  const t = simT + (performance.now() / 1000 - wallT) * rate;
+  document.getElementById("clock").textContent = `t=${t.toFixed(1)}s`;
+  ctx.clearRect(0, 0, W, H);
+  for (const s of layout.segments) {
+    const v = segSpeed(s);
+    ctx.fillStyle = v === 0 ? "#555" : v <= 0.4 ? "#E74C3C" : v <= 0.7 ? "#3498DB" : "#2ECC71";
+    ctx.globalAlpha = 0.35;
+    ctx.fillRect(10 + s.start * scale, 60, (s.end - s.start) * scale - 2, 40);
+  }
+  ctx.globalAlpha = 1;
+  for (const f of layout.feeders) {
+    ctx.fillStyle = "#aaa";
+    ctx.fillRect(10 + f.entry * scale - 1, 100, 2, 20);
+  }
+  for (const p of packets.values()) {
+    const seg = layout.segments[p.seg];
+    let x = p.pos + p.v * (t - p.t0);
+    if (seg) x = Math.min(x, seg.end);
+    ctx.fillStyle = COLORS[p.f] || "#fff";
+    ctx.fillRect(10 + x * scale - 3, 72, 6, 16);
+  }
+}
+
+const source = new EventSource("/stream");
+source.onmessage = (e) => apply(JSON.parse(e.data));
+source.onerror = () => { document.getElementById("status").textContent = "(bağlantı yok)"; };
+requestAnimationFrame(draw);
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,240 @@
+"""
+Bellek raporu: Uzun koşulardaki bellek büyümesini alt sistemlere
+(paketler, snapshot'lar, feeder geçmişleri, SimPy olay kuyruğu) dağıtır.
+
+Varsayılan ölçüm sayaç tabanlıdır: izlenen yapıların canlı nesne sayısı
+ve sys.getsizeof ile tahmini bayt boyutu simülasyon zamanında periyodik
+örneklenir. Sadece eklenen (append-only) geçmiş listeleri artımlı ölçülür,
+örnekleme maliyeti toplam geçmiş boyuna değil son örnekten beri eklenene
+bağlıdır. İsteğe bağlı tracemalloc modu, Python ayırıcısının gerçek izlenen
+belleğini ve dosya bazındaki dağılımını da ekler.
+"""
+
+import sys
+import tracemalloc
+import simpy
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+from .packet import Packet
+
+
+SUBSYSTEMS = ("packets", "snapshots", "queue_length_history", "block_events",
+              "event_heap")
+
+# tracemalloc dosya -> alt sistem eşlemesi (dosya adı ile)
+TRACEMALLOC_FILES = {
+    "packet.py": "packets",
+    "feeder.py": "feeders",
+    "conveyor_line.py": "line",
+    "main_multiline.py": "snapshots",
+}
+
+
+def deep_size(obj, seen: set = None) -> int:
+    """
+    Düz veri yapılarının (dict/list/tuple/str/sayı) tahmini toplam boyutu.
+    Paylaşılan nesneler seen kümesiyle bir kez sayılır.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_size(item, seen) for item in obj)
+    return size
+
+
+def packet_size(packet: Packet, seen: set = None) -> int:
+    """Paketin kendi ve geçmiş listelerinin boyutu (lider/takipçi paketler hariç)"""
+    if seen is None:
+        seen = set()
+    seen.add(id(packet))
+    size = sys.getsizeof(packet) + sys.getsizeof(packet.__dict__)
+    for name, value in packet.__dict__.items():
+        if name not in ("leader", "follower"):
+            size += deep_size(value, seen)
+    return size
+
+
+class _AppendOnlySource:
+    """Sadece sona eklenen bir listenin artımlı boyut ölçümü"""
+
+    def __init__(self, items: list):
+        self.items = items
+        self.counted = 0
+        self.bytes = 0
+
+    def measure(self) -> int:
+        items = self.items
+        if len(items) < self.counted:       # Liste sıfırlanmış
+            self.counted = 0
+            self.bytes = 0
+        for item in items[self.counted:]:
+            self.bytes += deep_size(item)
+        self.counted = len(items)
+        return self.bytes + sys.getsizeof(items)
+
+
+class MemoryReporter:
+    """
+    Alt sistem bazında canlı bayt ve nesne sayısını simülasyon zamanında örnekler.
+
+    Kullanım:
+        reporter = MemoryReporter(env, interval=10.0)
+        reporter.track_packets(lambda: line.packets_in_transit)
+        reporter.track_history("snapshots", sim.snapshots)
+        reporter.start()
+        ...
+        reporter.sample()
+        stats = reporter.get_statistics()
+    """
+
+    def __init__(self, env: simpy.Environment, interval: float = 10.0,
+                 use_tracemalloc: bool = False):
+        """
+        Args:
+            env: SimPy environment (olay kuyruğu da ölçülür)
+            interval: Örnekleme aralığı (simülasyon saniyesi)
+            use_tracemalloc: Gerçek ayırıcı belleğini de tracemalloc ile izle
+        """
+        self.env = env
+        self.interval = interval
+        self.use_tracemalloc = use_tracemalloc
+        self._started_tracemalloc = False
+
+        self._packet_sources: List[Callable[[], Iterable[Packet]]] = []
+        self._histories: Dict[str, List[_AppendOnlySource]] = {name: [] for name in SUBSYSTEMS}
+        self.samples: List[dict] = []
+
+    def track_packets(self, source: Callable[[], Iterable[Packet]]):
+        """Canlı paket kaynağı ekler (hat, feeder kuyruğu, yan hat...)"""
+        self._packet_sources.append(source)
+
+    def track_history(self, subsystem: str, items: list):
+        """Sadece sona eklenen bir geçmiş listesini alt sisteme bağlar"""
+        if subsystem not in self._histories:
+            raise ValueError(f"Bilinmeyen bellek alt sistemi: {subsystem} "
+                             f"(geçerli: {', '.join(SUBSYSTEMS)})")
+        self._histories[subsystem].append(_AppendOnlySource(items))
+
+    def start(self):
+        """Örnekleme process'ini (ve istenmişse tracemalloc'u) başlatır"""
+        if self.use_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.env.process(self._sample_loop())
+
+    def stop(self):
+        """Bu raporlayıcının başlattığı tracemalloc izlemesini durdurur"""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _sample_loop(self):
+        while True:
+            self.sample()
+            yield self.env.timeout(self.interval)
+
+    def _measure_event_heap(self) -> dict:
+        """
+        SimPy'nin özel olay yığını (env._queue) ölçülür; genel bir API yoktur.
+        Alan bulunamazsa (farklı SimPy sürümü) olay kuyruğu 0 olarak raporlanır.
+        """
+        queue = getattr(self.env, "_queue", None)
+        if not isinstance(queue, list):
+            return {'bytes': 0, 'count': 0}
+        size = sys.getsizeof(queue)
+        for entry in queue:
+            event = entry[3]
+            size += sys.getsizeof(entry) + sys.getsizeof(event)
+            if hasattr(event, "__dict__"):
+                size += sys.getsizeof(event.__dict__)
+            callbacks = getattr(event, "callbacks", None)
+            if callbacks is not None:
+                size += sys.getsizeof(callbacks)
+        return {'bytes': size, 'count': len(queue)}
+
+    def sample(self) -> dict:
+        """Şu anki simülasyon zamanında bir örnek alır (aynı anda tekrar alınmaz)"""
+        if self.samples and self.samples[-1]['time'] == self.env.now:
+            return self.samples[-1]
+
+        subsystems = {}
+        seen = set()
+        packet_bytes = 0
+        packet_count = 0
+        for source in self._packet_sources:
+            for packet in source():
+                if id(packet) in seen:
+                    continue
+                packet_bytes += packet_size(packet, seen)
+                packet_count += 1
+        subsystems['packets'] = {'bytes': packet_bytes, 'count': packet_count}
+
+        for name, sources in self._histories.items():
+            if name == 'packets':
+                continue
+            subsystems[name] = {
+                'bytes': sum(s.measure() for s in sources),
+                'count': sum(len(s.items) for s in sources),
+            }
+        subsystems['event_heap'] = self._measure_event_heap()
+
+        sample = {
+            'time': self.env.now,
+            'subsystems': subsystems,
+            'total_bytes': sum(s['bytes'] for s in subsystems.values()),
+        }
+        if self.use_tracemalloc and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            sample['traced'] = {'current': current, 'peak': peak, 'files': self._traced_by_file()}
+        self.samples.append(sample)
+        return sample
+
+    def _traced_by_file(self) -> Dict[str, int]:
+        """tracemalloc ile izlenen belleğin alt sistem dosyalarına dağılımı"""
+        by_file: Dict[str, int] = {}
+        for stat in tracemalloc.take_snapshot().statistics('filename'):
+            filename = Path(stat.traceback[0].filename).name
+            key = TRACEMALLOC_FILES.get(filename)
+            if key is None:
+                key = "simpy" if "simpy" in stat.traceback[0].filename else "other"
+            by_file[key] = by_file.get(key, 0) + stat.size
+        return by_file
+
+    def get_statistics(self) -> Optional[dict]:
+        """
+        Son örnek, alt sistem bazında tepe değerler ve büyüme hızı
+        (ilk ve son örnek arasındaki bayt/simülasyon saniyesi).
+        """
+        if not self.samples:
+            return None
+        first, last = self.samples[0], self.samples[-1]
+        elapsed = last['time'] - first['time']
+        subsystems = {}
+        for name in SUBSYSTEMS:
+            series = [s['subsystems'][name]['bytes'] for s in self.samples]
+            subsystems[name] = {
+                'bytes': last['subsystems'][name]['bytes'],
+                'count': last['subsystems'][name]['count'],
+                'peak_bytes': max(series),
+                'growth_rate': (series[-1] - series[0]) / elapsed if elapsed > 0 else 0.0,
+            }
+        stats = {
+            'sample_count': len(self.samples),
+            'total_bytes': last['total_bytes'],
+            'peak_total_bytes': max(s['total_bytes'] for s in self.samples),
+            'growth_rate': (last['total_bytes'] - first['total_bytes']) / elapsed if elapsed > 0 else 0.0,
+            'subsystems': subsystems,
+            'samples': self.samples,
+        }
+        if 'traced' in last:
+            stats['traced'] = last['traced']
+        return stats
+
+    def __repr__(self) -> str:
+        return f"MemoryReporter(interval={self.interval}s, samples={len(self.samples)})"
@@ -0,0 +1,279 @@
+"""
+Öngörülü merge: giriş penceresinden bir sonraki yeterli boşluğun geçeceği
+zaman, paket pozisyonları ve segment hızlarından analitik olarak hesaplanır.
+
+Sorgulama (polling) modunda feeder her transfer aralığında pencereye bakar;
+boşluk iki deneme arasında açılırsa en fazla bir aralık kaçırılır, dolu
+pencereye yapılan denemeler boşa gider. Öngörülü modda feeder bir sonraki
+boşluğu hesaplar, o zamanı rezerve eder ve paketini tam o anda bırakır.
+
+Model (serbest akış + lider zinciri):
+    - Paket hızı bulunduğu segmentin hızıdır; duran segmentte süre sonsuzdur.
+    - Önündeki paketin arka kenarı pencereden ancak lider zinciri izin
+      verdiğinde çıkar (birikmiş paket liderinden önce ilerleyemez).
+    - Arkadan gelen paketin pencereye varışı da lider zinciriyle hesaplanır.
+    - Diğer feeder'ların rezervasyonları sanal paket olarak hesaba katılır;
+      çekişmeli boşluk ilk rezerve edene kalır.
+
+Hareket adımlı olduğundan paket analitik andan en geç bir adım (step_time)
+sonra yer değiştirir; pencere sınırlarına bir adım pay eklenir. Başka
+kötümser pay yoktur: tahmin tutmazsa (birikmiş zincirin kaybettiği adımlar,
+hız değişimi, tahminden sonra önüne giren paket) feeder bir adım sonra
+yeniden hesaplar. ZPA segmentine giren feeder'lar sorgulamaya döner.
+"""
+
+import math
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+import simpy
+from .conveyor_line import ConveyorLine
+
+
+def _position(packet) -> float:
+    return packet.position
+
+
+class MergeReservation:
+    """Bir feeder'ın giriş penceresinde rezerve ettiği aktarım anı"""
+
+    __slots__ = ("feeder_id", "position", "length", "time")
+
+    def __init__(self, feeder_id: str, position: float, length: float, time: float):
+        self.feeder_id = feeder_id
+        self.position = position
+        self.length = length
+        self.time = time
+
+    def __repr__(self) -> str:
+        return f"MergeReservation({self.feeder_id} @ {self.position}m, t={self.time:.2f}s)"
+
+
+class MergeSlotPlanner:
+    """
+    Hat üzerindeki feeder'lar için boşluk tahmini ve slot rezervasyonu.
+
+    Kullanım:
+        planner = MergeSlotPlanner(env, line)
+        for feeder in feeders:
+            planner.register(feeder)      # feeder öngörülü modda aktarır
+    """
+
+    def __init__(self, env: simpy.Environment, line: ConveyorLine):
+        """
+        Args:
+            env: SimPy environment
+            line: Feeder'ların beslediği konveyör hattı
+        """
+        self.env = env
+        self.line = line
+        self.reservations: List[MergeReservation] = []
+        self.feeders: List = []
+        # Tahmin tutmazsa yeniden deneme aralığı (hareket adımı)
+        self.retry_interval = line.step_time
+        # Pencere payı: paket analitik andan en geç bir adım sonra yer
+        # değiştirir; küçük ek pay tahmin edilen anı adım olayının ardına alır
+        self.margin = line.step_time + 1e-6
+
+        # İstatistikler
+        self.total_forecasts = 0
+        self.total_fallbacks = 0      # ZPA / duran segment: sorgulamaya dönüldü
+        self.total_misses = 0         # Rezerve edilen anda aktarım başarısız
+
+    def register(self, feeder):
+        """Feeder'ı öngörülü merge moduna alır"""
+        feeder.slot_planner = self
+        self.feeders.append(feeder)
+
+    # ------------------------------------------------------------------
+    # Analitik seyahat süreleri
+    # ------------------------------------------------------------------
+
+    def _segment_speed(self, index: int) -> float:
+        segment = self.line.segments[index]
+        return 0.0 if segment.stopped else segment.speed
+
+    def travel_time(self, start: float, end: float) -> float:
+        """
+        Serbest akışta start'tan end'e (end > start) seyahat süresi.
+        Yol üzerinde duran (veya hızı 0) segment varsa sonsuz.
+        """
+        if end <= start:
+            return 0.0
+        line = self.line
+        end = min(end, line.total_length)
+        i = max(0, line.get_segment_index_at(max(start, 0.0)))
+        last = line.get_segment_index_at(end) if end < line.total_length else len(line.segments) - 1
+        total = 0.0
+        position = start
+        while True:
+            speed = self._segment_speed(i)
+            segment_end = min(line.segments[i].end_offset, end) if i < last else end
+            if segment_end > position:
+                if speed <= 0:
+                    return math.inf
+                total += (segment_end - position) / speed
+            if i >= last:
+                return total
+            position = segment_end
+            i += 1
+
+    def clear_time(self, packet, target: float) -> float:
+        """
+        Paket merkezinin target'a ulaşma süresi; lider zinciri engellediği
+        sürece (liderin de target + aralık noktasına ulaşması gerekir) uzar.
+        Hattan çıkış (total_length) sınırdır.
+        """
+        line = self.line
+        target = min(target, line.total_length)
+        time = self.travel_time(packet.position, target)
+        current = packet
+        need = target
+        while current.leader is not None:
+            leader = current.leader
+            need = min(need + line.required_spacing(leader, current), line.total_length)
+            if leader.position >= need:
+                break
+            time = max(time, self.travel_time(leader.position, need))
+            current = leader
+        return time
+
+    # ------------------------------------------------------------------
+    # Boşluk tahmini
+    # ------------------------------------------------------------------
+
+    def _window(self, position: float, length: float) -> Tuple[float, float]:
+        half = length / 2 + self.line.min_gap
+        return position - half, position + half
+
+    def follow_time(self, position: float, length: float, target: float, start: float = 0.0) -> float:
+        """
+        start (göreli) anında position'a giren length boyundaki paketin
+        merkezinin target'a ulaşma süresi (göreli). Serbest akıştan erken
+        olamaz; şu an önünde olan paketler (lider zinciri) de sınırlar.
+        """
+        time = start + self.travel_time(position, target)
+        packets = self.line.packets_in_transit
+        j = bisect_right(packets, position, key=_position)
+        if j < len(packets):
+            leader = packets[j]
+            need = target + (leader.length + length) / 2 + self.line.min_gap
+            time = max(time, self.clear_time(leader, need))
+        return time
+
+    def _reservation_intervals(self, feeder, position: float, length: float) -> List[Tuple[float, float]]:
+        """Diğer feeder'ların rezervasyonlarının bu pencerede yasakladığı zaman aralıkları (göreli)"""
+        now = self.env.now
+        margin = self.margin
+        window_start, window_end = self._window(position, length)
+        intervals = []
+        for r in self.reservations:
+            if r.feeder_id == feeder.id:
+                continue
+            t_r = r.time - now
+            if r.position < position:
+                # Yukarı akış: sanal paket t_r'de x_r'de belirir ve pencereden geçer
+                start = t_r + self.travel_time(r.position + r.length / 2, window_start) - margin
+                end = self.follow_time(r.position, r.length, window_end + r.length / 2, t_r) + margin
+            else:
+                # Aşağı akış: bizim paket t_r anında onun penceresinde olmamalı.
+                # Önünden geçmek için lider zinciri t_r'den önce izin vermeli;
+                # vermiyorsa yalnızca arkasından girilebilir
+                r_start, r_end = self._window(r.position, r.length)
+                if self.follow_time(position, length, r_end + length / 2) + margin > t_r:
+                    start = -math.inf
+                else:
+                    start = t_r - self.travel_time(position, r_end + length / 2) - margin
+                end = t_r - self.travel_time(position, max(position, r_start - length / 2)) + margin
+                if r.position - r.length / 2 < window_end:
+                    end = max(end, self.follow_time(r.position, r.length, window_end + r.length / 2, t_r) + margin)
+            if end > 0:
+                intervals.append((start, end))
+        return intervals
+
+    def forecast(self, feeder, length: float = None) -> Optional[float]:
+        """
+        Feeder'ın kuyruk başı paketinin girebileceği en erken zaman.
+
+        Args:
+            feeder: FeederLine
+            length: Paket boyu (None ise kuyruk başı paketin boyu)
+
+        Returns:
+            Mutlak simülasyon zamanı; analitik tahmin yapılamıyorsa
+            (ZPA girişi, duran segment, sonsuz bekleme) None
+        """
+        line = self.line
+        if length is None:
+            length = feeder.queue[0].length if feeder.queue else line.default_packet_length
+        position = max(0.0, min(feeder.entry_position, line.total_length - 0.1))
+        segment = line.get_segment_at(position)
+        if segment is None or segment.kind == "zpa" or segment.stopped:
+            self.total_fallbacks += 1
+            return None
+        self.total_forecasts += 1
+
+        margin = self.margin
+        window_start, window_end = self._window(position, length)
+        packets = line.packets_in_transit
+        i = bisect_left(packets, position, key=_position)
+
+        # Önde (veya pencerede) kalan paketlerin pencereden çıkışı
+        t = 0.0
+        j = i
+        while j < len(packets) and packets[j].position - packets[j].length / 2 < window_end:
+            p = packets[j]
+            t = max(t, self.clear_time(p, window_end + p.length / 2) + margin)
+            j += 1
+
+        # Arkadan gelen paketler ve rezervasyonlar: t'yi kapsayan her aralık t'yi ileri iter
+        intervals = self._reservation_intervals(feeder, position, length)
+        k = i - 1
+        while t < math.inf:
+            while k >= 0:
+                p = packets[k]
+                arrival = self.clear_time(p, window_start - p.length / 2)
+                if arrival > t + margin:
+                    break
+                t = max(t, self.clear_time(p, window_end + p.length / 2) + margin)
+                k -= 1
+            moved = False
+            for start, end in intervals:
+                if start <= t < end:
+                    t = end
+                    moved = True
+            if not moved:
+                break
+
+        if t == math.inf:
+            self.total_fallbacks += 1
+            return None
+        return self.env.now + t
+
+    def reserve(self, feeder, time: float) -> MergeReservation:
+        """Feeder'ın giriş penceresinde time anını rezerve eder"""
+        length = feeder.queue[0].length if feeder.queue else self.line.default_packet_length
+        position = max(0.0, min(feeder.entry_position, self.line.total_length - 0.1))
+        reservation = MergeReservation(feeder.id, position, length, time)
+        self.reservations.append(reservation)
+        return reservation
+
+    def release(self, reservation: MergeReservation):
+        if reservation in self.reservations:
+            self.reservations.remove(reservation)
+
+    def get_statistics(self) -> dict:
+        attempts = sum(f.total_attempts for f in self.feeders)
+        failed = sum(f.failed_attempts for f in self.feeders)
+        return {
+            'forecasts': self.total_forecasts,
+            'fallbacks': self.total_fallbacks,
+            'misses': self.total_misses,
+            'attempts': attempts,
+            'failed_attempts': failed,
+            'slot_wait_time': sum(f.total_slot_wait_time for f in self.feeders),
+            'active_reservations': len(self.reservations),
+        }
+
+    def __repr__(self) -> str:
+        return (f"MergeSlotPlanner({len(self.feeders)} feeders, "
+                f"{len(self.reservations)} reservations)")
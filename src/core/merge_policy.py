@@ -0,0 +1,281 @@
+"""
+Merge arbitrajı: Aynı anda ana hatta girmek isteyen feeder'lar arasında
+aktarım sırasını belirleyen politikalar.
+
+Feeder'lar transfer denemesinde arbiter'a talep bırakır; aynı simülasyon
+anındaki tüm talepler bir heap'te toplanır ve politika anahtarına göre
+sırayla denenir. Talep ekleme ve seçim O(log n) maliyetlidir. Aktarımı
+başarısız olan feeder giriş penceresi açıldığında (pencereyi tutan paket
+pencereyi boşalttığında) yeniden tura alınır; sorgulama aralığı beklenmez.
+"""
+
+import heapq
+import itertools
+import simpy
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+
+class MergePolicy(ABC):
+    """
+    Merge politikası temel sınıfı.
+    key() küçük olan feeder önce aktarılır.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def key(self, feeder, arbiter: "MergeArbiter") -> Tuple:
+        """Feeder'ın bu turdaki sıralama anahtarı"""
+
+    def on_grant(self, feeder, arbiter: "MergeArbiter"):
+        """Feeder'a aktarım izni verildiğinde çağrılır"""
+        pass
+
+
+class FifoPolicy(MergePolicy):
+    """En uzun süredir bekleyen paket önce (kuyruk başı paketin üretim zamanı)"""
+
+    name = "fifo"
+
+    def key(self, feeder, arbiter):
+        return (feeder.queue[0].created_at,)
+
+
+class RoundRobinPolicy(MergePolicy):
+    """En uzun süredir aktarım yapmamış feeder önce"""
+
+    name = "round_robin"
+
+    def __init__(self):
+        self.last_grant: Dict[str, int] = {}
+        self._grant_counter = itertools.count()
+
+    def key(self, feeder, arbiter):
+        return (self.last_grant.get(feeder.id, -1),)
+
+    def on_grant(self, feeder, arbiter):
+        self.last_grant[feeder.id] = next(self._grant_counter)
+
+
+class WeightedPriorityPolicy(MergePolicy):
+    """
+    Ağırlıklı öncelik (stride scheduling): aktarım_sayısı / ağırlık en küçük
+    olan önce. Ağırlığı 2 olan feeder çekişmede diğerinin iki katı izin alır,
+    düşük ağırlıklı feeder'lar aç kalmaz.
+    """
+
+    name = "weighted"
+
+    def __init__(self):
+        self.pass_value: Dict[str, float] = {}
+
+    def key(self, feeder, arbiter):
+        return (self.pass_value.get(feeder.id, 0.0), -feeder.priority_weight)
+
+    def on_grant(self, feeder, arbiter):
+        weight = max(feeder.priority_weight, 1e-9)
+        self.pass_value[feeder.id] = self.pass_value.get(feeder.id, 0.0) + 1.0 / weight
+
+
+class LongestQueuePolicy(MergePolicy):
+    """Kuyruğu en uzun feeder önce"""
+
+    name = "longest_queue"
+
+    def key(self, feeder, arbiter):
+        return (-len(feeder.queue),)
+
+
+MERGE_POLICIES = {
+    FifoPolicy.name: FifoPolicy,
+    RoundRobinPolicy.name: RoundRobinPolicy,
+    WeightedPriorityPolicy.name: WeightedPriorityPolicy,
+    LongestQueuePolicy.name: LongestQueuePolicy,
+}
+
+
+def create_merge_policy(name: str) -> MergePolicy:
+    """Politika adından politika nesnesi oluşturur"""
+    if name not in MERGE_POLICIES:
+        raise ValueError(f"Bilinmeyen merge politikası: {name} "
+                         f"(geçerli: {', '.join(MERGE_POLICIES)})")
+    return MERGE_POLICIES[name]()
+
+
+def entry_window(feeder) -> Tuple[float, float]:
+    """
+    Feeder'ın kuyruk başı paketinin giriş penceresi (global metre): paket
+    gövdesi ± min_gap/2. İki pencere örtüşüyorsa iki paket aynı anda girebilecek
+    kadar aralıklı değildir.
+    """
+    half = feeder.queue[0].length / 2 + feeder.target_conveyor.min_gap / 2
+    return feeder.entry_position - half, feeder.entry_position + half
+
+
+def is_contested(feeder_id: str, windows: List[tuple]) -> bool:
+    """Feeder'ın penceresi aynı turdaki başka bir talebin penceresiyle örtüşüyor mu?"""
+    own = next((w for w in windows if w[0] == feeder_id), None)
+    if own is None:
+        return False
+    return any(other[0] != feeder_id and other[1] < own[2] and own[1] < other[2]
+               for other in windows)
+
+
+class MergeArbiter:
+    """
+    Feeder aktarım taleplerini politikaya göre sıralayan hakem.
+
+    Aynı simülasyon anındaki talepler toplandıktan sonra (sıfır gecikmeli
+    tek bir arbitraj turu) heap'ten sırayla çekilir ve denenir. Bir feeder'ın
+    aktarımı giriş penceresini doldurduğunda çakışan feeder'lar kendi
+    denemelerinde yer bulamaz; böylece çekişmeli boşluğu politika kazandırır.
+
+    İzin yalnızca aynı turdaki başka bir talebin giriş penceresi (paket
+    gövdesi ± min_gap/2) kazananınkiyle örtüşüyorsa çekişmeli sayılır;
+    pencereleri ayrık talepler aynı boşluk için yarışmaz.
+    """
+
+    def __init__(self, env: simpy.Environment, policy: MergePolicy):
+        self.env = env
+        self.policy = policy
+
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._queued: Dict[str, bool] = {}
+        self._watching: Dict[str, bool] = {}
+        self._round_scheduled = False
+
+        # İstatistikler (feeder id -> değer)
+        self.grants: Dict[str, int] = {}
+        self.contested_grants: Dict[str, int] = {}
+        self.total_merge_wait: Dict[str, float] = {}
+        self.feeders: Dict[str, object] = {}
+        self.total_rounds = 0
+        self.total_requests = 0
+        self.total_gap_wakeups = 0
+        # Liste atanırsa her tur (zaman, [(feeder, pencere başı, pencere sonu)],
+        # izin alan feeder'lar) olarak kaydedilir; bölümlenmiş koşularda
+        # çekişme buradan birleştirilir
+        self.round_log: Optional[List[tuple]] = None
+
+    def register(self, feeder):
+        """Feeder'ı bu hakeme bağlar"""
+        feeder.arbiter = self
+        self.feeders[feeder.id] = feeder
+        self.grants.setdefault(feeder.id, 0)
+        self.contested_grants.setdefault(feeder.id, 0)
+        self.total_merge_wait.setdefault(feeder.id, 0.0)
+
+    def request(self, feeder):
+        """
+        Feeder'ın kuyruk başı paketi için aktarım talebi (O(log n)).
+        Aynı anda birden fazla talep bırakan feeder tek sayılır.
+        """
+        if not feeder.queue or self._queued.get(feeder.id):
+            return
+
+        self._queued[feeder.id] = True
+        heapq.heappush(self._heap, (self.policy.key(feeder, self), next(self._seq), feeder))
+        self.total_requests += 1
+
+        if not self._round_scheduled:
+            self._round_scheduled = True
+            self.env.process(self._arbitrate())
+
+    def _arbitrate(self):
+        """Bu andaki tüm talepler toplandıktan sonra politika sırasıyla aktarır"""
+        yield self.env.timeout(0)
+        self._round_scheduled = False
+        self.total_rounds += 1
+
+        windows = [(feeder.id,) + entry_window(feeder)
+                   for _, _, feeder in self._heap if feeder.queue]
+        granted = []
+        if self.round_log is not None:
+            self.round_log.append((self.env.now, windows, granted))
+        while self._heap:
+            _, _, feeder = heapq.heappop(self._heap)
+            self._queued[feeder.id] = False
+
+            if not feeder.queue:
+                continue
+
+            head = feeder.queue[0]
+            if feeder.try_transfer():
+                self.grants[feeder.id] += 1
+                self.total_merge_wait[feeder.id] += self.env.now - head.created_at
+                if is_contested(feeder.id, windows):
+                    self.contested_grants[feeder.id] += 1
+                granted.append(feeder.id)
+                self.policy.on_grant(feeder, self)
+            elif not self._watching.get(feeder.id):
+                self._watch_window(feeder)
+
+    def _watch_window(self, feeder):
+        """Aktaramayan feeder'ın giriş penceresi değiştiğinde yeni tur açar"""
+        event = feeder.target_conveyor.wait_window_change(
+            feeder.entry_position, feeder.queue[0].length)
+        if event is None:
+            return
+        self._watching[feeder.id] = True
+        self.env.process(self._wake_on_gap(feeder, event))
+
+    def _wake_on_gap(self, feeder, event: simpy.Event):
+        """
+        Pencere gerçekten açılana kadar pencere olaylarını bekler ve feeder
+        adına tek talep bırakır. Pencereyi tutan paketin her adımı tur açmaz;
+        böylece deneme sayısı tur başına bir kazanılan/kaybedilen deneme kalır.
+        """
+        while event is not None:
+            yield event
+            if not feeder.queue:
+                break
+            event = feeder.target_conveyor.wait_window_change(
+                feeder.entry_position, feeder.queue[0].length)
+        self._watching[feeder.id] = False
+        if feeder.queue:
+            self.total_gap_wakeups += 1
+            self.request(feeder)
+
+    def get_fairness_index(self) -> float:
+        """
+        Jain adalet indeksi: feeder'ların aktarım/üretim oranları üzerinden.
+        1.0 tam adil, 1/n tek feeder'ın tüm kapasiteyi aldığı durum.
+        """
+        ratios = [
+            f.total_transferred / f.total_produced
+            for f in self.feeders.values() if f.total_produced > 0
+        ]
+        if not ratios:
+            return 1.0
+        square_sum = sum(r * r for r in ratios)
+        if square_sum == 0:
+            return 1.0
+        return sum(ratios) ** 2 / (len(ratios) * square_sum)
+
+    def get_statistics(self) -> dict:
+        """Politika bazında adalet ve throughput istatistikleri"""
+        now = self.env.now
+        total_grants = sum(self.grants.values())
+        return {
+            'policy': self.policy.name,
+            'total_grants': total_grants,
+            'throughput': total_grants / now if now > 0 else 0.0,
+            'fairness_index': self.get_fairness_index(),
+            'total_rounds': self.total_rounds,
+            'total_requests': self.total_requests,
+            'total_gap_wakeups': self.total_gap_wakeups,
+            'feeders': {
+                feeder_id: {
+                    'grants': self.grants[feeder_id],
+                    'contested_grants': self.contested_grants[feeder_id],
+                    'avg_merge_wait': (self.total_merge_wait[feeder_id] / self.grants[feeder_id]
+                                       if self.grants[feeder_id] else 0.0),
+                }
+                for feeder_id in self.feeders
+            }
+        }
+
+    def __repr__(self) -> str:
+        return f"MergeArbiter(policy={self.policy.name}, grants={sum(self.grants.values())})"
@@ -0,0 +1,300 @@
+"""
+Metrik kaydı ve OpenMetrics dışa aktarımı: Simülasyon gerçek hattın yanında
+dijital ikiz olarak koşarken KPI'ların diğer servisler gibi toplanması (scrape).
+
+Sıcak yoldaki güncellemeler kilitsizdir: sayaç/gösterge değeri düz bir
+Python özelliğidir ve inc()/set() tek bir atama yapar. Simülasyonun zaten
+tuttuğu sayaçlar (feeder üretim/aktarım, hat çıkışı) fonksiyon bağlanarak
+okunur, sıcak yola hiç ek iş eklenmez. Metin yalnızca uç nokta scrape
+edildiğinde, HTTP thread'inde üretilir.
+"""
+
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class MetricChild:
+    """Tek bir etiket kombinasyonunun değeri"""
+
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0
+        self.function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1):
+        """Kilitsiz artırım (GIL altında tek atama)"""
+        self.value += amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Değeri scrape anında fonksiyondan okur (sıcak yolda maliyet yok)"""
+        self.function = function
+
+    def get(self) -> float:
+        if self.function is not None:
+            return self.function()
+        return self.value
+
+
+class Metric:
+    """Etiketli metrik ailesi (counter veya gauge)"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 unit: str = ""):
+        """
+        Args:
+            name: Aile adı (counter için '_total' son eki olmadan)
+            documentation: HELP metni
+            labelnames: Etiket adları (örn: ("feeder",))
+            unit: OpenMetrics birimi (örn: "seconds"), adın sonunda da yer almalı
+        """
+        if unit and not name.endswith("_" + unit):
+            raise ValueError(f"Metrik adı birimle bitmeli: {name} ({unit})")
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.unit = unit
+        self._children: Dict[Tuple[str, ...], MetricChild] = {}
+        if not self.labelnames:
+            self._children[()] = MetricChild()
+
+    def labels(self, *values: str) -> MetricChild:
+        """Etiket değerlerine ait çocuğu döndürür (yoksa oluşturur)"""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name}: {len(self.labelnames)} etiket bekleniyordu, "
+                             f"{len(values)} verildi")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children.setdefault(key, MetricChild())
+        return child
+
+    def _unlabeled(self) -> MetricChild:
+        if self.labelnames:
+            raise ValueError(f"{self.name} etiketli: önce labels(...) çağrılmalı")
+        return self._children[()]
+
+    def inc(self, amount: float = 1):
+        self._unlabeled().inc(amount)
+
+    def set(self, value: float):
+        self._unlabeled().set(value)
+
+    def set_function(self, function: Callable[[], float]):
+        self._unlabeled().set_function(function)
+
+    def _sample_name(self) -> str:
+        return self.name
+
+    def render(self, lines: List[str]):
+        """Aileyi OpenMetrics satırları olarak ekler"""
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        if self.unit:
+            lines.append(f"# UNIT {self.name} {self.unit}")
+        lines.append(f"# HELP {self.name} {self.documentation}")
+        sample_name = self._sample_name()
+        for key, child in list(self._children.items()):
+            if key:
+                labels = ",".join(f'{n}="{_escape_label(v)}"' for n, v in zip(self.labelnames, key))
+                lines.append(f"{sample_name}{{{labels}}} {_format_value(child.get())}")
+            else:
+                lines.append(f"{sample_name} {_format_value(child.get())}")
+
+
+class Counter(Metric):
+    """Sadece artan sayaç; örnek adı '_total' son eki alır"""
+
+    kind = "counter"
+
+    def _sample_name(self) -> str:
+        return self.name + "_total"
+
+
+class Gauge(Metric):
+    """Artıp azalabilen anlık değer"""
+
+    kind = "gauge"
+
+
+class MetricsRegistry:
+    """
+    Metrik aileleri kaydı; render() ile OpenMetrics metni üretir.
+
+    Kullanım:
+        registry = MetricsRegistry()
+        produced = registry.counter("conveyor_feeder_produced", "Üretilen paket", ("feeder",))
+        produced.labels("FEEDER_A").inc()
+        server = MetricsServer(registry, port=9108).start()
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metrik zaten kayıtlı: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                unit: str = "") -> Counter:
+        return self.register(Counter(name, documentation, labelnames, unit))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+              unit: str = "") -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, unit))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Tüm aileleri OpenMetrics metin formatında döndürür ('# EOF' ile biter)"""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            metric.render(lines)
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def __repr__(self) -> str:
+        return f"MetricsRegistry({len(self._metrics)} metrics)"
+
+
+class MetricsServer:
+    """Kaydı yerel bir HTTP portunda /metrics olarak sunan arka plan thread'i"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9108):
+        """
+        Args:
+            registry: Sunulacak metrik kaydı
+            host: Dinlenecek adres
+            port: Dinlenecek port (0 ise boş bir port seçilir)
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.scrapes = 0
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = server.registry.render().encode("utf-8")
+                server.scrapes += 1
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass    # Simülasyon çıktısını istek loglarıyla kirletme
+
+        return Handler
+
+    def start(self) -> "MetricsServer":
+        """Sunucuyu daemon thread'de başlatır"""
+        if self._httpd is not None:
+            return self
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        name="metrics-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Sunucuyu durdurur, soketi kapatır ve thread'i bekler (tekrar çağrılabilir)"""
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def __repr__(self) -> str:
+        return f"MetricsServer({self.url}, scrapes={self.scrapes})"
+
+
+def register_line_metrics(registry: MetricsRegistry, env, line, feeders: List) -> MetricsRegistry:
+    """
+    Hat ve feeder'ların sayaç/göstergelerini kayda bağlar.
+
+    Tüm değerler simülasyonun kendi sayaçlarından scrape anında okunur;
+    simülasyon döngüsüne ek güncelleme eklenmez.
+
+    Args:
+        registry: Metriklerin ekleneceği kayıt
+        env: SimPy environment (simülasyon saati)
+        line: ConveyorLine
+        feeders: FeederLine listesi
+    """
+    registry.gauge("conveyor_sim_time_seconds", "Simülasyon saati",
+                   unit="seconds").set_function(lambda: env.now)
+
+    produced = registry.counter("conveyor_feeder_produced", "Feeder'da üretilen paket", ("feeder",))
+    transferred = registry.counter("conveyor_feeder_transferred", "Ana hatta aktarılan paket", ("feeder",))
+    dropped = registry.counter("conveyor_feeder_dropped", "Kuyruk dolu olduğu için atılan paket", ("feeder",))
+    blocked_time = registry.counter("conveyor_feeder_blocked_seconds", "Toplam bloke süresi (devam eden dahil)",
+                                    ("feeder",), unit="seconds")
+    queue_length = registry.gauge("conveyor_feeder_queue_length", "Feeder kuyruğundaki paket", ("feeder",))
+    blocked = registry.gauge("conveyor_feeder_blocked", "Feeder şu an bloke mu (0/1)", ("feeder",))
+    for feeder in feeders:
+        produced.labels(feeder.id).set_function(lambda f=feeder: f.total_produced)
+        transferred.labels(feeder.id).set_function(lambda f=feeder: f.total_transferred)
+        dropped.labels(feeder.id).set_function(lambda f=feeder: f.total_dropped)
+        blocked_time.labels(feeder.id).set_function(lambda f=feeder: f.get_current_blocked_time())
+        queue_length.labels(feeder.id).set_function(lambda f=feeder: len(f.queue))
+        blocked.labels(feeder.id).set_function(lambda f=feeder: f.is_blocked)
+
+    packets = registry.gauge("conveyor_segment_packets", "Segmentteki paket", ("segment",))
+    occupancy = registry.gauge("conveyor_segment_occupancy_ratio",
+                               "Segment doluluğu (kaplanan bant / segment uzunluğu)", ("segment",), unit="ratio")
+    exits = registry.counter("conveyor_segment_exits", "Segmentten çıkan paket", ("segment",))
+    for segment in line.segments:
+        packets.labels(segment.id).set_function(lambda s=segment: len(s.packets))
+        occupancy.labels(segment.id).set_function(lambda s=segment: s.get_utilization())
+        exits.labels(segment.id).set_function(lambda s=segment: s.total_exits)
+
+    registry.counter("conveyor_line_exits", "Hattan ayrılan paket (hat sonu + ayırıcı, devridaim hariç)", ("line",)).labels(
+        line.id).set_function(lambda: line.total_packets_processed)
+    registry.gauge("conveyor_line_exit_throughput", "Ortalama hat çıkış hızı (paket/saniye)", ("line",)).labels(
+        line.id).set_function(lambda: line.total_packets_processed / env.now if env.now > 0 else 0.0)
+    return registry
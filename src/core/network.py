@@ -0,0 +1,215 @@
+"""
+ConveyorNetwork: Birden fazla ConveyorLine'ı merge/divert noktalarıyla
+birbirine bağlayan konveyör ağı.
+
+Her hattın sonu bir düğümdür. Birden fazla çıkış bağlantısı olan düğümler
+divert (ayırma), birden fazla hattın beslediği giriş noktaları merge
+(birleştirme) noktasıdır. Yönlendirme, ağ kurulurken bir kez hesaplanan
+next-hop tablolarıyla yapılır; paket başına karar O(1) sözlük erişimidir.
+"""
+
+import heapq
+import simpy
+from typing import Dict, List, Optional
+from .packet import Packet
+from .conveyor_line import ConveyorLine
+
+
+class LineLink:
+    """Bir hattın sonundan başka bir hattın giriş noktasına bağlantı"""
+
+    def __init__(self, source: ConveyorLine, target: ConveyorLine, entry_position: float = 0.0):
+        self.source = source
+        self.target = target
+        self.entry_position = entry_position  # Hedef hattaki global giriş pozisyonu
+
+        # İstatistikler
+        self.total_transferred = 0
+        self.total_blocked_attempts = 0
+
+    @property
+    def id(self) -> str:
+        return f"{self.source.id}->{self.target.id}"
+
+    def __repr__(self) -> str:
+        return f"LineLink({self.id} @ {self.entry_position}m, transferred={self.total_transferred})"
+
+
+class ConveyorNetwork:
+    """
+    Konveyör hatlarından oluşan yönlü graf.
+
+    Kullanım:
+        network = ConveyorNetwork(env)
+        network.add_line(line_a); network.add_line(line_b); network.add_line(trunk)
+        network.connect("LINE_A", "TRUNK", entry_position=0.0)   # merge
+        network.connect("LINE_B", "TRUNK", entry_position=2.0)   # merge
+        network.add_destination("DOCK_1", "TRUNK")
+        network.build_routing_tables()
+    """
+
+    def __init__(self, env: simpy.Environment, id: str = "NETWORK"):
+        self.env = env
+        self.id = id
+
+        self.lines: Dict[str, ConveyorLine] = {}
+        self.links: Dict[str, List[LineLink]] = {}          # kaynak hat id -> çıkış bağlantıları
+        self.destinations: Dict[str, str] = {}              # hedef adı -> hat id
+
+        # next_hop[hat_id][hedef] -> LineLink (hedef hattın kendisinde ise None)
+        self.next_hop: Dict[str, Dict[str, Optional[LineLink]]] = {}
+        self.routing_ready = False
+
+        # İstatistikler
+        self.delivered: Dict[str, int] = {}                 # hedef -> teslim edilen paket
+        self.total_delivered = 0
+        self.total_unrouted = 0                             # hedefsiz/ulaşılamaz, ağdan çıkan
+        self.total_transit_time = 0.0
+
+    def add_line(self, line: ConveyorLine) -> ConveyorLine:
+        """Ağa hat ekler ve hat sonu çıkışını ağ yönlendirmesine bağlar"""
+        if line.id in self.lines:
+            raise ValueError(f"Hat zaten ağda: {line.id}")
+
+        self.lines[line.id] = line
+        self.links[line.id] = []
+        line.exit_handler = lambda packet, line_id=line.id: self._on_line_exit(line_id, packet)
+        self.routing_ready = False
+        return line
+
+    def connect(self, source_id: str, target_id: str, entry_position: float = 0.0) -> LineLink:
+        """
+        source hattının sonunu target hattına bağlar.
+
+        Args:
+            source_id: Kaynak hat (paketler bu hattın sonundan çıkar)
+            target_id: Hedef hat
+            entry_position: Hedef hattaki global giriş pozisyonu (metre)
+        """
+        link = LineLink(self.lines[source_id], self.lines[target_id], entry_position)
+        self.links[source_id].append(link)
+        self.routing_ready = False
+        return link
+
+    def add_destination(self, name: str, line_id: str):
+        """Bir hedefi (dock, istasyon) bir hattın sonuna atar"""
+        if line_id not in self.lines:
+            raise ValueError(f"Bilinmeyen hat: {line_id}")
+        self.destinations[name] = line_id
+        self.delivered.setdefault(name, 0)
+        self.routing_ready = False
+
+    def build_routing_tables(self):
+        """
+        Her hedef için ters graf üzerinde Dijkstra çalıştırarak next-hop
+        tablolarını hesaplar. Kenar ağırlığı hedef hatta giriş noktasından
+        hat sonuna kadar kalan mesafedir.
+
+        Maliyet: O(D * (E log V)) - sadece kurulumda bir kez.
+        """
+        incoming: Dict[str, List[LineLink]] = {line_id: [] for line_id in self.lines}
+        for links in self.links.values():
+            for link in links:
+                incoming[link.target.id].append(link)
+
+        self.next_hop = {line_id: {} for line_id in self.lines}
+
+        for dest, dest_line_id in self.destinations.items():
+            dist = {dest_line_id: 0.0}
+            self.next_hop[dest_line_id][dest] = None
+            heap = [(0.0, dest_line_id)]
+
+            while heap:
+                d, line_id = heapq.heappop(heap)
+                if d > dist.get(line_id, float('inf')):
+                    continue
+                for link in incoming[line_id]:
+                    # source'tan çıkıp target'ta entry_position'dan sona kadar git
+                    cost = d + (link.target.total_length - link.entry_position)
+                    source_id = link.source.id
+                    if cost < dist.get(source_id, float('inf')):
+                        dist[source_id] = cost
+                        self.next_hop[source_id][dest] = link
+                        heapq.heappush(heap, (cost, source_id))
+
+        self.routing_ready = True
+
+    def route(self, packet: Packet, line_id: str) -> Optional[LineLink]:
+        """
+        Paketin line_id hattının sonunda gideceği bağlantıyı döndürür (O(1)).
+        Hedefsiz paketler hattın ilk çıkış bağlantısını kullanır.
+
+        Returns:
+            LineLink veya None (paket bu hattın sonunda ağdan çıkar)
+        """
+        if packet.destination is not None:
+            table = self.next_hop[line_id]
+            if packet.destination in table:
+                return table[packet.destination]
+            return None
+
+        links = self.links[line_id]
+        return links[0] if links else None
+
+    def _on_line_exit(self, line_id: str, packet: Packet) -> bool:
+        """
+        Hat sonuna ulaşan paketi bir sonraki hatta aktarır ya da ağdan çıkarır.
+
+        Returns:
+            False eğer sonraki hatta yer yoksa (paket hat sonunda bekler)
+        """
+        if not self.routing_ready:
+            self.build_routing_tables()
+
+        link = self.route(packet, line_id)
+
+        if link is None:
+            # Hedefe ulaştı veya gidebileceği yer yok -> ağdan çık
+            if packet.destination is not None and self.destinations.get(packet.destination) == line_id:
+                self.delivered[packet.destination] += 1
+                self.total_delivered += 1
+                self.total_transit_time += packet.get_total_travel_time(self.env.now)
+            else:
+                self.total_unrouted += 1
+            return True
+
+        if not link.target.has_space_at(link.entry_position, packet.length):
+            link.total_blocked_attempts += 1
+            return False
+
+        link.target.accept_packet(packet, link.entry_position)
+        link.total_transferred += 1
+        return True
+
+    @property
+    def packets_in_transit(self) -> int:
+        """Ağdaki tüm hatlardaki paket sayısı"""
+        return sum(len(line.packets_in_transit) for line in self.lines.values())
+
+    def get_statistics(self) -> dict:
+        """Ağ istatistikleri"""
+        return {
+            'id': self.id,
+            'line_count': len(self.lines),
+            'link_count': sum(len(links) for links in self.links.values()),
+            'packets_in_transit': self.packets_in_transit,
+            'total_delivered': self.total_delivered,
+            'total_unrouted': self.total_unrouted,
+            'avg_transit_time': (self.total_transit_time / self.total_delivered
+                                 if self.total_delivered else 0.0),
+            'delivered': dict(self.delivered),
+            'links': [
+                {
+                    'id': link.id,
+                    'entry_position': link.entry_position,
+                    'transferred': link.total_transferred,
+                    'blocked_attempts': link.total_blocked_attempts,
+                }
+                for links in self.links.values() for link in links
+            ],
+            'lines': [line.get_statistics() for line in self.lines.values()],
+        }
+
+    def __repr__(self) -> str:
+        return (f"ConveyorNetwork({self.id}, {len(self.lines)} lines, "
+                f"delivered={self.total_delivered})")
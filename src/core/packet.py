@@ -1,4 +1,5 @@
-from typing import Optional
+import zlib
+from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 @dataclass
 class Packet:
@@ -11,55 +12,87 @@ class Packet:
     created_at: float = 0.0
     entered_conveyor_at:float = 0.0
     current_conveyor: Optional[str] = None 
+    segment_index: int = -1  # Mevcut hattaki segment sırası (ConveyorLine önbelleği)
+    divert_index: int = 0    # Sıradaki ayırıcı noktası (ConveyorLine önbelleği)
     source_feeder: Optional[str] = None
     destination: Optional[str] = None
+    packet_type: Optional[str] = None  # Paket tipi (örn: "tote", "polybag", "carton")
 
     total_wait_time: float = 0.0
-    wait_events:list = field(default_factory=list)
-    path_history: list = field(default_factory=list)
+    wait_count: int = 0
+    wait_started_at: Optional[float] = None  # Açık beklemenin başlangıcı
+    path_count: int = 0                      # Girilen konveyör sayısı
+
+    # Tam geçmiş yalnızca izlenen (traced) paketlerde tutulur; diğerlerinde
+    # None kalır ve sadece yukarıdaki skaler toplamlar güncellenir
+    traced: bool = True
+    wait_events: Optional[list] = None
+    exited_at: Optional[float] = None  # Hattan ayrılış zamanı (hat sonu veya ayırıcı)
+    segment_entered_at: float = 0.0    # Mevcut segmente giriş zamanı (LatencyProbe)
+    dwell_segment: int = -1            # Kalışı ölçülen segment index'i (-1 = yok)
+    path_history: Optional[list] = None
+
+    # Hat üzerinde hemen önündeki (lider) ve arkasındaki (takipçi) paket.
+    # Paketler birbirini geçemez; her paket sadece liderine bakarak aralık korur.
+    leader: Optional["Packet"] = field(default=None, repr=False, compare=False)
+    follower: Optional["Packet"] = field(default=None, repr=False, compare=False)
 
 
     def __post_init__(self):
         if not self.id:
             raise ValueError("Packet ID can't be empty")
+        if self.traced:
+            if self.wait_events is None:
+                self.wait_events = []
+            if self.path_history is None:
+                self.path_history = []
         
     def enter_conveyor(self, conveyor_id:str, time: float, entry_position: float = 0.0):
         self.current_conveyor = conveyor_id
         self.entered_conveyor_at = time
+        self.exited_at = None
         self.position = entry_position
-        self.path_history.append(
-            {
-                "conveyor":conveyor_id,
-                "entered_at":time,
-                "entry_position": entry_position
-            }
-        )
+        self.path_count += 1
+        if self.path_history is not None:
+            self.path_history.append(
+                {
+                    "conveyor":conveyor_id,
+                    "entered_at":time,
+                    "entry_position": entry_position
+                }
+            )
 
     def start_waiting(self, location:str, time:float):
-        self.wait_events.append(
-            {
-                "location":location,
-                "start_time": time,
-                "end_time": None
-            }
-        )
+        self.wait_started_at = time
+        self.wait_count += 1
+        if self.wait_events is not None:
+            self.wait_events.append(
+                {
+                    "location":location,
+                    "start_time": time,
+                    "end_time": None
+                }
+            )
 
     
     def stop_waiting(self, time:float):
-        if self.wait_events and self.wait_events[-1]["end_time"]:
+        if self.wait_started_at is None:
+            return
+        self.total_wait_time += time - self.wait_started_at
+        self.wait_started_at = None
+        if self.wait_events:
             self.wait_events[-1]["end_time"] = time
-            wait_duration = time - self.wait_events[-1]["start_time"]
-            self.total_wait_time += wait_duration
 
     
     def get_total_travel_time(self, current_time:float):
         """
-            Toplam seyahat süresini döndürür
+            Toplam seyahat süresini döndürür (hattan ayrılmışsa ayrılışa kadar)
 
             Returns:
                 Toplam süre (saniye)
         """
-
+        if self.exited_at is not None:
+            current_time = self.exited_at
         return current_time - self.created_at
 
     def get_utilization_rate(self, current_time:float):
@@ -83,9 +116,106 @@ class Packet:
         return{
             "id": self.id,
             "position": self.position,
+            "length": self.length,
+            "packet_type": self.packet_type,
             "current_conveyor": self.current_conveyor,
             "created_at": self.created_at,
             "total_wait_time": self.total_wait_time,
+            "wait_count": self.wait_count,
+            "traced": self.traced,
+            "exited_at": self.exited_at,
             "source_feeder": self.source_feeder
 
-        }
\ No newline at end of file
+        }
+
+
+def resolve_packet_mix(packet_types: Dict[str, dict], names: Optional[List[str]]) -> List[dict]:
+    """
+    Config'deki [packet.types] tanımlarından feeder'ın paket karışımını kurar.
+
+    Args:
+        packet_types: Tip adı -> {length, width, height, weight}
+        names: Feeder'ın ürettiği tip adları (None/boş ise karışım yok)
+
+    Returns:
+        [{name, length, width, height, weight}, ...]
+    """
+    mix = []
+    for name in names or []:
+        if name not in packet_types:
+            raise ValueError(f"Bilinmeyen paket tipi: {name} "
+                             f"(geçerli: {', '.join(packet_types)})")
+        mix.append({'name': name, **packet_types[name]})
+    return mix
+
+
+class PacketTracePolicy:
+    """
+    Hangi paketlerin tam geçmiş (path_history, wait_events) tutacağını seçer.
+    Seçilmeyen paketler yalnızca skaler toplamları (total_wait_time,
+    wait_count, path_count) taşır.
+
+    Seçim tekrarlanabilirdir: sayaç yöntemi feeder'ın üretim sırasına,
+    hash yöntemi paket id'sinin crc32'sine bakar (Python hash() gibi
+    process'e göre değişmez).
+
+    Kullanım:
+        policy = PacketTracePolicy(every=100, method="hash")
+        packet = Packet(id=..., traced=policy.should_trace(packet_id, feeder_id, counter))
+    """
+
+    METHODS = ("counter", "hash")
+
+    def __init__(self, every: int = 1, method: str = "counter",
+                 feeders: Optional[List[str]] = None, seed: int = 0):
+        """
+        Args:
+            every: Her N paketten biri izlenir (1 = hepsi, 0 = hiçbiri)
+            method: "counter" (feeder'ın N'inci paketleri) veya "hash" (id hash'i)
+            feeders: Yalnızca bu feeder'ların paketleri izlenir (None ise hepsi)
+            seed: Hash yönteminde örneklem tohumu
+        """
+        if every < 0:
+            raise ValueError(f"İz örnekleme aralığı negatif olamaz: {every}")
+        if method not in self.METHODS:
+            raise ValueError(f"Bilinmeyen iz örnekleme yöntemi: {method} "
+                             f"(geçerli: {', '.join(self.METHODS)})")
+        self.every = every
+        self.method = method
+        self.feeders = set(feeders) if feeders else None
+        self.seed = seed
+        self._salt = f"{seed}:".encode()
+
+    @classmethod
+    def from_config(cls, cfg: Optional[dict], seed: int = 0) -> Optional["PacketTracePolicy"]:
+        """[packet_trace] bölümünden politika (bölüm yoksa None: tüm paketler izlenir)"""
+        if not cfg:
+            return None
+        return cls(every=cfg.get('every', 1), method=cfg.get('method', 'counter'),
+                   feeders=cfg.get('feeders'), seed=cfg.get('seed', seed))
+
+    def should_trace(self, packet_id: str, feeder_id: Optional[str], counter: int) -> bool:
+        """
+        Args:
+            packet_id: Paket id'si
+            feeder_id: Üreten feeder
+            counter: Feeder'daki üretim sırası (1'den başlar)
+
+        Returns:
+            True ise paket tam geçmiş tutar
+        """
+        if self.every == 0:
+            return False
+        if self.feeders is not None and feeder_id not in self.feeders:
+            return False
+        if self.every == 1:
+            return True
+        if self.method == "hash":
+            return zlib.crc32(self._salt + packet_id.encode()) % self.every == 0
+        return (counter - 1) % self.every == 0
+
+    def __repr__(self) -> str:
+        feeders = f", feeders={sorted(self.feeders)}" if self.feeders is not None else ""
+        if self.every == 0:
+            return f"PacketTracePolicy(none{feeders})"
+        return f"PacketTracePolicy(1/{self.every}, {self.method}{feeders})"
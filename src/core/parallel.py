@@ -0,0 +1,639 @@
+"""
+Bölümlenmiş paralel motor: Uzun bir hattı ardışık segment domain'lerine
+ayırıp her domain'i kendi SimPy ortamında (ayrı process'te) koşturur.
+
+Domain'ler arasındaki tek bağ, sınırdan geçen paketlerdir. Senkronizasyon
+muhafazakârdır: zaman, sınır segmentinin geçiş süresi (lookahead)
+uzunluğunda pencerelere bölünür; bir domain bir pencereyi ancak yukarı
+akış domain'i aynı pencereyi bitirip sınır geçişlerini gönderdikten sonra
+koşar. Domain'ler farklı pencerelerde eşzamanlı çalışır (boru hattı).
+
+Sonuçlar sıralı koşuyla birebir aynı olmalıdır. Bunun için:
+    - Sınırlar feeder giriş pencerelerinden ve ZPA segmentlerinden uzağa,
+      en büyük paket aralığından uzun sürekli segmentlerin arasına konur.
+    - Aşağı akış domain'i, yukarı akıştaki en öndeki paketin her adımını
+      kendi en arkadaki paketine göre doğrular: sıralı koşuda bu paket
+      aşağı akıştaki bir lidere takılacak (geri basınç) kadar yaklaştıysa
+      bölümleme geçersizdir ve run() None döner; çağıran sıralı motora döner.
+Hız programı, arıza ve ayırıcı içeren config'ler desteklenmez (sıralı koşulur).
+"""
+
+import math
+import os
+import traceback
+import multiprocessing
+import simpy
+from bisect import bisect_left
+from contextlib import redirect_stdout
+from dataclasses import fields
+from typing import Dict, List, Optional, Tuple
+from .conveyor_line import ConveyorLine
+from .feeder import FeederLine
+from .packet import Packet, PacketTracePolicy, resolve_packet_mix
+from .merge_policy import MergeArbiter, create_merge_policy, is_contested
+
+
+# Sınır doğrulamasında kayan nokta payı (metre): aralık bu kadar bile
+# daralıyorsa sıralı koşuda paket liderine takılmış olabilir
+BOUNDARY_MARGIN = 1e-6
+
+UNSUPPORTED_SECTIONS = ("speed_schedule", "faults", "diverters")
+
+_PACKET_STATE_FIELDS = [f.name for f in fields(Packet) if f.name not in ("leader", "follower")]
+
+
+def _packet_state(packet: Packet) -> dict:
+    """Paketin domain'ler arası taşınabilir kopyası (lider/takipçi hariç)"""
+    return {name: getattr(packet, name) for name in _PACKET_STATE_FIELDS}
+
+
+class DomainLine(ConveyorLine):
+    """
+    Hattın bir domain'i: global pozisyonları koruyan, origin'den başlayan
+    alt hat. Yukarı akışa sınır kayıtlarını, aşağı akışa devirleri üretir.
+    """
+
+    def __init__(self, env: simpy.Environment, origin: float,
+                 track_front: bool, track_rear: bool, **kwargs):
+        """
+        Args:
+            origin: Domain'in ilk segmentinin global başlangıç pozisyonu
+            track_front: En öndeki paketin adımlarını kaydet (aşağı akış domain'i var)
+            track_rear: En arkadaki paketin kenarını kaydet (yukarı akış domain'i var)
+        """
+        super().__init__(env, **kwargs)
+        self.origin = origin
+        self.total_length = origin
+        self.track_front = track_front
+        self.track_rear = track_rear
+
+        # Aşağı akışa gidecekler: (zaman, paket durumu) ve en öndeki paketin
+        # sorgu anlarındaki (zaman, pozisyon, boy, paket id) kayıtları
+        self.handoffs: List[Tuple[float, dict]] = []
+        self.front_records: List[Tuple[float, float, float, str]] = []
+        # En arkadaki paketin arka kenar geçmişi: (zaman, kenar, paket id)
+        self.rear_history: List[Tuple[float, float, Optional[str]]] = [(-math.inf, math.inf, None)]
+
+    def _record_rear(self):
+        rear = self.packets_in_transit[0] if self.packets_in_transit else None
+        if rear is None:
+            self.rear_history.append((self.env.now, math.inf, None))
+        else:
+            self.rear_history.append((self.env.now, rear.position - rear.length / 2, rear.id))
+
+    def _leader_clearance(self, packet: Packet) -> float:
+        if self.track_front and packet.leader is None:
+            self.front_records.append((self.env.now, packet.position, packet.length, packet.id))
+        if self.track_rear and self.packets_in_transit[0] is packet:
+            self._record_rear()
+        return super()._leader_clearance(packet)
+
+    def _admit(self, packet: Packet, entry_position: float):
+        super()._admit(packet, entry_position)
+        if self.track_rear and self.packets_in_transit[0] is packet:
+            self._record_rear()
+
+    def _packet_reached_end(self, packet: Packet) -> bool:
+        if self.track_front:
+            self.front_records.append((self.env.now, packet.position, packet.length, packet.id))
+            self.handoffs.append((self.env.now, _packet_state(packet)))
+        if not super()._packet_reached_end(packet):
+            return False
+        if self.track_rear and not self.packets_in_transit:
+            self._record_rear()
+        return True
+
+    def rear_edge_at(self, time: float, exclude_id: str) -> float:
+        """
+        time anındaki en arkadaki paketin arka kenarı için alt sınır: time'dan
+        önceki son kayıt ile tam time anındaki kayıtların en küçüğü. Aynı
+        andaki olayların sırası sıralı koşudan farklı olabileceği için
+        ikisinin de en kötüsü alınır.
+        """
+        history = self.rear_history
+        i = bisect_left(history, time, key=lambda h: h[0])
+        edge = history[i - 1][1] if i > 0 else math.inf
+        while i < len(history) and history[i][0] == time:
+            if history[i][2] != exclude_id:
+                edge = min(edge, history[i][1])
+            i += 1
+        return edge
+
+    def prune_rear_history(self, before: float):
+        """before'dan önceki kayıtlardan sadece sonuncusunu tutar"""
+        i = bisect_left(self.rear_history, before, key=lambda h: h[0])
+        if i > 1:
+            del self.rear_history[:i - 1]
+
+
+class _DomainRunner:
+    """Tek bir domain'in ortamı, hattı ve feeder'ları; pencere pencere koşar"""
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self.env = simpy.Environment()
+        self.violation: Optional[str] = None
+        self.line = DomainLine(
+            self.env, origin=spec['origin'],
+            track_front=not spec['last'], track_rear=not spec['first'],
+            id="MAIN_LINE", min_gap=spec['min_gap'],
+            default_packet_length=spec['default_length']
+        )
+        for seg_cfg in spec['segments']:
+            self.line.add_segment(
+                id=seg_cfg['id'],
+                length=seg_cfg['length'],
+                speed=seg_cfg['speed'],
+                description=seg_cfg.get('description', ''),
+                direction=seg_cfg.get('direction', 'horizontal'),
+                segment_type=seg_cfg.get('type', 'continuous'),
+                zone_length=seg_cfg.get('zone_length')
+            )
+
+        self.feeders: List[FeederLine] = []
+        for feeder_cfg, entry_position in spec['feeders']:
+            self.feeders.append(FeederLine(
+                env=self.env,
+                id=feeder_cfg['id'],
+                target_conveyor=self.line,
+                production_rate=feeder_cfg['production_rate'],
+                entry_position=entry_position,
+                max_queue_size=feeder_cfg.get('max_queue_size', 100),
+                priority_weight=feeder_cfg.get('priority_weight', 1.0),
+                destinations=feeder_cfg.get('destinations'),
+                packet_mix=resolve_packet_mix(spec['packet_types'], feeder_cfg.get('packet_mix')),
+                seed=spec['seed']
+            ))
+
+        self.arbiter: Optional[MergeArbiter] = None
+        if spec['merge_policy'] != 'none':
+            self.arbiter = MergeArbiter(self.env, create_merge_policy(spec['merge_policy']))
+            self.arbiter.round_log = []
+            for feeder in self.feeders:
+                self.arbiter.register(feeder)
+
+        trace_policy = PacketTracePolicy.from_config(spec['packet_trace'], seed=spec['seed'])
+        for feeder in self.feeders:
+            feeder.trace_policy = trace_policy
+            self.env.process(feeder.start_production())
+            self.env.process(feeder.transfer_process())
+
+    def advance(self, until: float, message: Optional[tuple]) -> Optional[tuple]:
+        """
+        Yukarı akışın bu penceredeki devirlerini planlar, pencereyi koşar ve
+        yukarı akışın sınır kayıtlarını doğrular.
+
+        Returns:
+            Aşağı akışa gönderilecek (devirler, sınır kayıtları) veya son domain ise None
+        """
+        window_start = self.env.now
+        if message is not None:
+            handoffs, records = message
+            for at, state in handoffs:
+                self.env.process(self._inject(at, state))
+
+        self.env.run(until=until)
+
+        if message is not None:
+            self._verify_boundary(records)
+            self.line.prune_rear_history(until)
+
+        if self.spec['last']:
+            return None
+        out = (self.line.handoffs, self.line.front_records)
+        self.line.handoffs = []
+        self.line.front_records = []
+        return out
+
+    def _inject(self, at: float, state: dict):
+        """
+        Yukarı akıştan gelen paketi sınırdan hatta sokar. Paket o andaki
+        olaylardan sonra eklenir: sıralı koşuda sınırı geçen paketin adımı,
+        aynı fazdaki liderinin adımından önce işlenmez (eşit zamanlı
+        lider/takipçi adımlarının sırası iki motorda aynı kalır).
+        """
+        yield self.env.timeout(at - self.env.now)
+        yield self.env.timeout(0)
+        packet = Packet(**state)
+        if not self.line.has_space_at(packet.position, packet.length) and self.violation is None:
+            self.violation = f"{packet.id} t={at:.3f}s sınırda yer bulamadı"
+        self.line._admit(packet, packet.position)
+
+    def _verify_boundary(self, records: List[tuple]):
+        """Yukarı akışın en öndeki paketi bu domain'in arkasına takılacak kadar yaklaştı mı?"""
+        if self.violation is not None:
+            return
+        min_gap = self.line.min_gap
+        for time, position, length, packet_id in records:
+            edge = self.line.rear_edge_at(time, packet_id)
+            if position + length / 2 + min_gap + BOUNDARY_MARGIN >= edge:
+                self.violation = (f"{packet_id} t={time:.3f}s sınırda geri basınç "
+                                  f"({self.spec['segments'][0]['id']} önünde)")
+                return
+
+    def finish(self) -> dict:
+        """Domain'in KPI birleştirmesi için ham sonuçları"""
+        line = self.line
+        result = {
+            'index': self.spec['index'],
+            'violation': self.violation,
+            'now': self.env.now,
+            'packets_in_transit': len(line.packets_in_transit),
+            'total_processed': line.total_packets_processed,
+            'segments': [
+                {
+                    'id': s.id,
+                    'length': s.length,
+                    'utilization': s.get_utilization(),
+                    'occupied_length': s.occupied_length,
+                    'regimes': s.get_regime_statistics(),
+                }
+                for s in line.segments
+            ],
+            'feeders': {f.id: f.get_statistics() for f in self.feeders},
+            'merge': None,
+        }
+        if self.arbiter is not None:
+            result['merge'] = {
+                'grants': dict(self.arbiter.grants),
+                'total_merge_wait': dict(self.arbiter.total_merge_wait),
+                'round_log': self.arbiter.round_log,
+            }
+        return result
+
+
+def _domain_worker(spec: dict, windows: List[float], in_conn, out_conn, result_conn, abort):
+    """Tek domain'i ayrı process'te pencere pencere koşturur"""
+    finished = False
+    try:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            runner = _DomainRunner(spec)
+            for until in windows:
+                if abort.is_set():
+                    break
+                message = None
+                if in_conn is not None:
+                    message = in_conn.recv()
+                    if message is None:     # Yukarı akış durdu
+                        break
+                out = runner.advance(until, message)
+                if runner.violation is not None:
+                    abort.set()
+                if out_conn is not None:
+                    out_conn.send(out)
+            else:
+                finished = True
+        result_conn.send(runner.finish())
+    except (EOFError, BrokenPipeError):
+        result_conn.send({'index': spec['index'], 'violation': "domain bağlantısı koptu"})
+    except Exception:
+        abort.set()
+        result_conn.send({'index': spec['index'], 'error': traceback.format_exc()})
+    finally:
+        if out_conn is not None and not finished:
+            try:
+                out_conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+
+
+class ParallelLineEngine:
+    """
+    Config'deki hattı domain'lere bölüp paralel koşturan motor.
+
+    Kullanım:
+        engine = ParallelLineEngine(config, domains=4)
+        kpis = engine.run()
+        if kpis is None:           # Bölümleme sıralı koşuyla aynı sonucu vermez
+            print(engine.fallback_reason)
+    """
+
+    def __init__(self, config: dict, domains: int = None, use_processes: bool = None):
+        """
+        Args:
+            config: Simülasyon config'i (MultiSegmentSimulation ile aynı)
+            domains: İstenen domain sayısı (varsayılan: CPU sayısı)
+            use_processes: Domain'leri ayrı process'lerde koş (varsayılan: CPU > 1 ise)
+        """
+        cpus = os.cpu_count() or 1
+        self.config = config
+        self.requested_domains = domains if domains is not None else cpus
+        self.use_processes = use_processes if use_processes is not None else cpus > 1
+
+        pkt_cfg = config.get('packet', {})
+        self.min_gap = pkt_cfg.get('min_gap', 0.5)
+        self.default_length = pkt_cfg.get('default_length', 0.3)
+        self.packet_types = pkt_cfg.get('types', {})
+        self.segments_cfg = config.get('conveyor_segments', [])
+        self.feeders_cfg = config.get('feeders', [])
+        self.seed = config.get('simulation', {}).get('seed', 0)
+
+        # Segment başlangıçları, ConveyorLine.add_segment ile aynı toplama sırasıyla
+        self.offsets: List[float] = []
+        self.total_length = 0.0
+        for seg_cfg in self.segments_cfg:
+            self.offsets.append(self.total_length)
+            self.total_length += seg_cfg['length']
+
+        self.entry_positions: List[float] = []
+        for feeder_cfg in self.feeders_cfg:
+            segment_idx = feeder_cfg.get('connection_segment', 0)
+            offset = feeder_cfg.get('connection_offset', 0.0)
+            entry = self.offsets[segment_idx] + offset if 0 <= segment_idx < len(self.offsets) else 0.0
+            self.entry_positions.append(max(0.0, min(entry, self.total_length - 0.1)))
+
+        self.domain_starts: List[int] = []
+        self.lookahead = 0.0
+        self.window_count = 0
+        self.fallback_reason: Optional[str] = None
+
+    @property
+    def max_spacing(self) -> float:
+        """Ardışık iki paketin merkezleri arasındaki en büyük gerekli mesafe"""
+        longest = max([self.default_length] + [t.get('length', self.default_length)
+                                               for t in self.packet_types.values()])
+        return longest + self.min_gap
+
+    def cut_candidates(self) -> List[int]:
+        """
+        Domain sınırı olabilecek segment index'leri (sınır segment i'nin
+        başında): iki yanı da sürekli ve en büyük aralıktan uzun olmalı,
+        aşağı akış yavaşlamamalı ve hiçbir feeder giriş penceresi sınıra
+        taşmamalı.
+        """
+        spacing = self.max_spacing
+        candidates = []
+        for i in range(1, len(self.segments_cfg)):
+            before, after = self.segments_cfg[i - 1], self.segments_cfg[i]
+            if before.get('type', 'continuous') != 'continuous' or after.get('type', 'continuous') != 'continuous':
+                continue
+            if before['length'] <= spacing or after['length'] <= spacing:
+                continue
+            # Yavaşlayan geçişte akış sıkışır ve sınırda birikme başlar
+            if after['speed'] < before['speed']:
+                continue
+            boundary = self.offsets[i]
+            if any(abs(entry - boundary) < spacing for entry in self.entry_positions):
+                continue
+            candidates.append(i)
+        return candidates
+
+    def segment_work(self) -> List[float]:
+        """
+        Segment başına tahmini olay yükü: segmentten geçen akış (yukarı
+        akış feeder'larının üretim toplamı) x segment geçiş süresi, artı
+        segmente bağlı feeder'ların yoklama olayları.
+        """
+        work = []
+        for i, seg_cfg in enumerate(self.segments_cfg):
+            end = self.offsets[i] + seg_cfg['length']
+            flow = sum(f['production_rate'] for f, entry in zip(self.feeders_cfg, self.entry_positions)
+                       if entry < end)
+            local_feeders = [f for f, entry in zip(self.feeders_cfg, self.entry_positions)
+                             if self.offsets[i] <= entry < end]
+            work.append(flow * seg_cfg['length'] / seg_cfg['speed'] + 0.1 * seg_cfg['length'] +
+                        sum(2.0 + f['production_rate'] for f in local_feeders))
+        return work
+
+    def partition(self, domains: int) -> List[int]:
+        """
+        Tahmini yükü domain'lere dengeli dağıtan sınırları seçer.
+
+        Returns:
+            Domain başlangıç segment index'leri (ilki her zaman 0)
+        """
+        candidates = self.cut_candidates()
+        work = self.segment_work()
+        total = sum(work)
+        cumulative = []
+        running = 0.0
+        for w in work:
+            cumulative.append(running)
+            running += w
+
+        starts = [0]
+        for k in range(1, domains):
+            target = total * k / domains
+            usable = [c for c in candidates if c > starts[-1]]
+            if not usable:
+                break
+            best = min(usable, key=lambda c: abs(cumulative[c] - target))
+            if best not in starts:
+                starts.append(best)
+        return starts
+
+    def _domain_specs(self) -> List[dict]:
+        starts = self.domain_starts
+        bounds = starts[1:] + [len(self.segments_cfg)]
+        policy = self.config.get('merge', {}).get('policy', 'none')
+        specs = []
+        for d, (first, end) in enumerate(zip(starts, bounds)):
+            upper = self.offsets[end] if end < len(self.offsets) else math.inf
+            specs.append({
+                'index': d,
+                'first': d == 0,
+                'last': d == len(starts) - 1,
+                'origin': self.offsets[first],
+                'segments': self.segments_cfg[first:end],
+                'feeders': [(f, entry) for f, entry in zip(self.feeders_cfg, self.entry_positions)
+                            if self.offsets[first] <= entry < upper],
+                'min_gap': self.min_gap,
+                'default_length': self.default_length,
+                'packet_types': self.packet_types,
+                'merge_policy': policy,
+                'seed': self.seed,
+                'packet_trace': self.config.get('packet_trace'),
+            })
+        return specs
+
+    def _windows(self, duration: float) -> List[float]:
+        """Lookahead uzunluğunda pencere bitişleri (sonuncusu tam olarak duration)"""
+        boundary_transits = [self.segments_cfg[i - 1]['length'] / self.segments_cfg[i - 1]['speed']
+                             for i in self.domain_starts[1:]]
+        self.lookahead = min(boundary_transits)
+        count = max(1, math.ceil(duration / self.lookahead))
+        return [duration * (k + 1) / count for k in range(count - 1)] + [duration]
+
+    def run(self, duration: float = None) -> Optional[dict]:
+        """
+        Domain'leri koşturur ve sıralı koşuyla aynı KPI sözlüğünü döndürür.
+
+        Returns:
+            KPI sözlüğü, bölümleme sonucu değiştirecekse None (bkz. fallback_reason)
+        """
+        if duration is None:
+            duration = self.config['simulation']['duration']
+
+        unsupported = [name for name in UNSUPPORTED_SECTIONS if self.config.get(name)]
+        # Domain başına ayrı raporlanan gözlemciler (bellek, olay izi) sıralı
+        # koşunun KPI'larını ve iz dosyasını üretmez
+        for name in ('latency', 'interference', 'memory', 'trace'):
+            if self.config.get(name, {}).get('enabled', False):
+                unsupported.append(name)
+        if self.config.get('merge', {}).get('mode', 'poll') != 'poll':
+            unsupported.append('merge.mode')
+        if unsupported:
+            self.fallback_reason = f"desteklenmeyen bölümler: {', '.join(unsupported)}"
+            return None
+        self.domain_starts = self.partition(self.requested_domains)
+        if len(self.domain_starts) < 2:
+            self.fallback_reason = "uygun domain sınırı yok"
+            return None
+
+        specs = self._domain_specs()
+        windows = self._windows(duration)
+        self.window_count = len(windows)
+        if self.use_processes:
+            results = self._run_processes(specs, windows)
+        else:
+            results = self._run_inline(specs, windows)
+
+        for result in results:
+            if 'error' in result:
+                raise RuntimeError(f"Domain {result['index']} hata verdi:\n{result['error']}")
+        violations = [r['violation'] for r in results if r.get('violation')]
+        if violations:
+            self.fallback_reason = violations[0]
+            return None
+        return self._merge_kpis(results, duration)
+
+    def _run_inline(self, specs: List[dict], windows: List[float]) -> List[dict]:
+        """Domain'leri aynı process'te sırayla koşar (tek çekirdek / test)"""
+        results = []
+        messages = [None] * len(windows)
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            for spec in specs:
+                runner = _DomainRunner(spec)
+                outgoing = []
+                for until, message in zip(windows, messages):
+                    outgoing.append(runner.advance(until, message))
+                    if runner.violation is not None:
+                        break
+                results.append(runner.finish())
+                if runner.violation is not None:
+                    break
+                messages = outgoing
+        return results
+
+    def _run_processes(self, specs: List[dict], windows: List[float]) -> List[dict]:
+        """Her domain ayrı process; ardışık domain'ler pipe ile bağlı"""
+        ctx = multiprocessing.get_context()
+        abort = ctx.Event()
+        links = [ctx.Pipe(duplex=False) for _ in specs[1:]]     # (alıcı, gönderici)
+        result_pipes = [ctx.Pipe(duplex=False) for _ in specs]
+        workers = []
+        for d, spec in enumerate(specs):
+            in_conn = links[d - 1][0] if d > 0 else None
+            out_conn = links[d][1] if d < len(links) else None
+            worker = ctx.Process(target=_domain_worker,
+                                 args=(spec, windows, in_conn, out_conn, result_pipes[d][1], abort),
+                                 daemon=True)
+            worker.start()
+            workers.append(worker)
+        # Bağlantıların ebeveyndeki kopyaları kapanmalı ki kopan domain fark edilsin
+        for receiver, sender in links:
+            receiver.close()
+            sender.close()
+        for _, sender in result_pipes:
+            sender.close()
+
+        results = []
+        for d, (receiver, _) in enumerate(result_pipes):
+            try:
+                results.append(receiver.recv())
+            except EOFError:
+                results.append({'index': d, 'error': "domain process'i sonuç göndermeden çıktı"})
+        for worker in workers:
+            worker.join()
+        return results
+
+    def _merge_kpis(self, results: List[dict], now: float) -> dict:
+        """Domain sonuçlarından MultiSegmentSimulation.collect_kpis ile aynı sözlüğü kurar"""
+        results = sorted(results, key=lambda r: r['index'])
+        segments = [s for r in results for s in r['segments']]
+        feeder_stats: Dict[str, dict] = {}
+        for r in results:
+            feeder_stats.update(r['feeders'])
+
+        processed = results[-1]['total_processed']
+        occupied = sum(s['occupied_length'] for s in segments)
+        kpis = {
+            'line.total_processed': processed,
+            'line.throughput': processed / now if now > 0 else 0.0,
+            'line.packets_in_transit': sum(r['packets_in_transit'] for r in results),
+            'line.utilization': min(1.0, occupied / self.total_length) if self.total_length else 0.0,
+            'line.occupied_length': occupied,
+        }
+
+        for s in segments:
+            kpis[f"segment.{s['id']}.utilization"] = s['utilization']
+
+        for s in segments:
+            for regime, rstats in s['regimes'].items():
+                prefix = f"segment.{s['id']}.regime.{regime}"
+                kpis[f'{prefix}.duration'] = rstats['duration']
+                kpis[f'{prefix}.throughput'] = rstats['throughput']
+                kpis[f'{prefix}.belt_distance'] = rstats['belt_distance']
+
+        for feeder_cfg in self.feeders_cfg:
+            fstats = feeder_stats[feeder_cfg['id']]
+            prefix = f"feeder.{feeder_cfg['id']}"
+            kpis[f'{prefix}.total_produced'] = fstats['total_produced']
+            kpis[f'{prefix}.total_transferred'] = fstats['total_transferred']
+            kpis[f'{prefix}.current_queue'] = fstats['current_queue']
+            kpis[f'{prefix}.total_blocked_time'] = fstats['total_blocked_time']
+            kpis[f'{prefix}.blocked_ratio'] = fstats['total_blocked_time'] / now if now > 0 else 0.0
+            kpis[f'{prefix}.utilization_rate'] = fstats['utilization_rate']
+            kpis[f'{prefix}.transfer_rate'] = fstats['transfer_rate']
+            kpis[f'{prefix}.block_events'] = fstats['block_events']
+
+        if results[0]['merge'] is not None:
+            kpis.update(self._merge_arbiter_kpis(results, feeder_stats, now))
+        return kpis
+
+    def _merge_arbiter_kpis(self, results: List[dict], feeder_stats: Dict[str, dict],
+                            now: float) -> dict:
+        """
+        Merge KPI'ları. Sıralı koşuda aynı andaki tüm talepler tek turda
+        toplanır; çekişme bu yüzden domain turları zamana göre birleştirilerek
+        yeniden hesaplanır.
+        """
+        grants: Dict[str, int] = {}
+        waits: Dict[str, float] = {}
+        round_windows: Dict[float, list] = {}
+        for r in results:
+            grants.update(r['merge']['grants'])
+            waits.update(r['merge']['total_merge_wait'])
+            for time, windows, _ in r['merge']['round_log']:
+                round_windows.setdefault(time, []).extend(windows)
+
+        contested = {f['id']: 0 for f in self.feeders_cfg}
+        for r in results:
+            for time, _, granted in r['merge']['round_log']:
+                for feeder_id in granted:
+                    if is_contested(feeder_id, round_windows[time]):
+                        contested[feeder_id] += 1
+
+        # MergeArbiter.get_fairness_index ile aynı sıra ve formül
+        ratios = [
+            feeder_stats[f['id']]['total_transferred'] / feeder_stats[f['id']]['total_produced']
+            for f in self.feeders_cfg if feeder_stats[f['id']]['total_produced'] > 0
+        ]
+        square_sum = sum(r * r for r in ratios)
+        fairness = sum(ratios) ** 2 / (len(ratios) * square_sum) if ratios and square_sum else 1.0
+
+        total_grants = sum(grants[f['id']] for f in self.feeders_cfg)
+        kpis = {
+            'merge.throughput': total_grants / now if now > 0 else 0.0,
+            'merge.fairness_index': fairness,
+        }
+        for f in self.feeders_cfg:
+            feeder_id = f['id']
+            kpis[f'merge.{feeder_id}.contested_grants'] = contested[feeder_id]
+            kpis[f'merge.{feeder_id}.avg_merge_wait'] = (waits[feeder_id] / grants[feeder_id]
+                                                         if grants[feeder_id] else 0.0)
+        return kpis
+
+    def __repr__(self) -> str:
+        return (f"ParallelLineEngine(domains={len(self.domain_starts) or self.requested_domains}, "
+                f"lookahead={self.lookahead:.2f}s)")
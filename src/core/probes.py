@@ -0,0 +1,239 @@
+"""
+Probe (gözlemci) çerçevesi: KPI toplayıcıları, iz yazıcıları, görselleştirme
+ve dışa aktarıcılar çekirdeğe doğrudan kod eklemek yerine belirli olay
+türlerine abone olur.
+
+Çekirdek her olay noktasında yalnızca o türün işleyici demetine bakar:
+
+    if self.probes.handlers[EXIT]:
+        self.probes.emit(EXIT, packet, where)
+
+Abonesi olmayan olay türü tek bir liste index'i ve doğruluk kontrolüne
+mal olur; hiç gözlemcisi olmayan koşuda toplama maliyeti yoktur. Abonelik
+isteğe bağlı örnekleme (her N olaydan biri) alabilir. Periyodik örnekleyiciler
+(snapshot gibi) periodic() ile yalnızca abone olunduğunda SimPy process'i açar;
+örnek, o andaki tüm olaylar işlendikten sonra alınır.
+"""
+
+from typing import Callable, List, Tuple
+import simpy
+
+
+# Olay türleri (EventTracer kayıt türleriyle aynı numaralar)
+CREATED = 0       # where: feeder index'i (paket üretildi)
+QUEUED = 1        # where: feeder (kuyruğa girdi)
+MERGED = 2        # where: feeder (ana hatta aktarıldı)
+SEGMENT = 3       # where: girilen segment index'i (segment geçişi)
+EXIT = 4          # where: segment sayısı (hat sonundan çıkış)
+DIVERTED = 5      # where: ayırıcı index'i
+DROPPED = 6       # where: feeder (kuyruk dolu, atıldı)
+BLOCKED = 7       # where: feeder (bloke başladı)
+UNBLOCKED = 8     # where: feeder (bloke bitti)
+QUEUE_SAMPLE = 9  # where: feeder (transfer denemesi anında kuyruk örneği, packet None)
+RECIRCULATED = 10 # where: segment sayısı (hat sonunda devridaime alındı, çıkış sayılmaz)
+
+EVENT_NAMES = ("created", "queued", "merged", "segment", "exit", "diverted", "dropped",
+               "blocked", "unblocked", "queue_sample", "recirculated")
+EVENT_COUNT = len(EVENT_NAMES)
+
+# İşleyici imzası: handler(event, packet, where)
+Handler = Callable[[int, object, int], None]
+
+# Periyodik örnek önceliği: SimPy'nin URGENT (0) ve NORMAL (1) olaylarından
+# sonra işlenir, aynı anda o an planlanan olaylar dahil
+LATE = 2
+
+
+class _LateTimeout(simpy.Event):
+    """Gecikme sonunda, o andaki tüm olaylardan sonra tetiklenen zaman aşımı"""
+
+    def __init__(self, env: simpy.Environment, delay: float):
+        super().__init__(env)
+        self._ok = True
+        self._value = None
+        env.schedule(self, LATE, delay)
+
+
+class Subscription:
+    """Bir gözlemcinin olay aboneliği (every > 1 ise her N olaydan biri iletilir)"""
+
+    __slots__ = ("events", "callback", "every", "seen", "delivered")
+
+    def __init__(self, events: Tuple[int, ...], callback: Handler, every: int = 1):
+        self.events = events
+        self.callback = callback
+        self.every = every
+        self.seen = 0
+        self.delivered = 0
+
+    def __call__(self, event: int, packet, where: int):
+        self.seen += 1
+        if self.seen % self.every == 0:
+            self.delivered += 1
+            self.callback(event, packet, where)
+
+    def __repr__(self) -> str:
+        names = ",".join(EVENT_NAMES[e] for e in self.events)
+        return f"Subscription({names}, every={self.every}, delivered={self.delivered})"
+
+
+class ProbeBus:
+    """
+    Olay türü bazında gözlemci dağıtımı.
+
+    Kullanım:
+        probes = ProbeBus(env)
+        probes.attach(line, feeders, sorter)
+        probes.subscribe(EXIT, lambda event, packet, where: exits.append(packet))
+        probes.subscribe((BLOCKED, UNBLOCKED), on_block, every=10)
+        probes.periodic(1.0, lambda now: samples.append(now))
+    """
+
+    def __init__(self, env: simpy.Environment = None):
+        """
+        Args:
+            env: SimPy environment (periodic örnekleyiciler için)
+        """
+        self.env = env
+        # Olay türü -> işleyici demeti; boş demet = abone yok (sıcak yol kontrolü)
+        self.handlers: List[Tuple[Handler, ...]] = [()] * EVENT_COUNT
+        self.subscriptions: List[Subscription] = []
+        self.emitted = [0] * EVENT_COUNT
+        self.periodic_count = 0
+        self.line = None
+        self.feeders: List = []
+        self.sorter = None
+
+    def attach(self, line, feeders: List, sorter=None):
+        """Hat, segment ve feeder'ları bu veri yoluna bağlar (feeder index'leri atanır)"""
+        self.line = line
+        line.probes = self
+        for segment in line.segments:
+            segment.probes = self
+        self.feeders = list(feeders)
+        for index, feeder in enumerate(self.feeders):
+            feeder.probes = self
+            feeder.probe_index = index
+        self.sorter = sorter
+
+    def subscribe(self, events, callback: Handler, every: int = 1) -> Subscription:
+        """
+        Olay türlerine abone olur.
+
+        Args:
+            events: Tek olay türü veya olay türleri dizisi
+            callback: handler(event, packet, where)
+            every: Örnekleme; her N olaydan biri iletilir (1 = hepsi)
+
+        Returns:
+            unsubscribe() için abonelik
+        """
+        events = (events,) if isinstance(events, int) else tuple(events)
+        for event in events:
+            if not 0 <= event < EVENT_COUNT:
+                raise ValueError(f"Bilinmeyen probe olayı: {event}")
+        if every < 1:
+            raise ValueError(f"Probe örnekleme aralığı en az 1 olmalı: {every}")
+        subscription = Subscription(events, callback, every)
+        self.subscriptions.append(subscription)
+        self._rebuild()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.remove(subscription)
+        self._rebuild()
+
+    def _rebuild(self):
+        handlers = [[] for _ in range(EVENT_COUNT)]
+        for subscription in self.subscriptions:
+            # Örneklemesiz abonelikte sarmalayıcı atlanır (ek çağrı yok)
+            handler = subscription.callback if subscription.every == 1 else subscription
+            for event in subscription.events:
+                handlers[event].append(handler)
+        self.handlers = [tuple(h) for h in handlers]
+
+    def is_active(self, event: int) -> bool:
+        return bool(self.handlers[event])
+
+    def emit(self, event: int, packet, where: int):
+        """Olayı abonelere iletir (çağıran önce handlers[event] kontrolü yapar)"""
+        self.emitted[event] += 1
+        for handler in self.handlers[event]:
+            handler(event, packet, where)
+
+    def periodic(self, interval: float, callback: Callable[[float], None]) -> simpy.Process:
+        """
+        Periyodik örnekleyici: callback(now) her interval saniyede çağrılır.
+        Process yalnızca abone olunduğunda açılır. Callback o anın tüm
+        olaylarından sonra koşar: t anındaki örnek, zamanı t olan olayları
+        (üretim, aktarım, çıkış) aynı olayların sırasından bağımsız olarak içerir.
+        """
+        if self.env is None:
+            raise ValueError("Periyodik probe için ProbeBus(env) gerekli")
+        if interval <= 0:
+            raise ValueError(f"Periyodik probe aralığı pozitif olmalı: {interval}")
+        self.periodic_count += 1
+        return self.env.process(self._periodic_loop(interval, callback))
+
+    def _periodic_loop(self, interval: float, callback: Callable[[float], None]):
+        yield _LateTimeout(self.env, 0)
+        while True:
+            callback(self.env.now)
+            yield _LateTimeout(self.env, interval)
+
+    def get_statistics(self) -> dict:
+        return {
+            'subscriptions': len(self.subscriptions),
+            'periodic': self.periodic_count,
+            'active_events': [EVENT_NAMES[e] for e in range(EVENT_COUNT) if self.handlers[e]],
+            'emitted': {EVENT_NAMES[e]: n for e, n in enumerate(self.emitted) if n},
+        }
+
+    def __repr__(self) -> str:
+        return (f"ProbeBus({len(self.subscriptions)} subscriptions, "
+                f"active={self.get_statistics()['active_events']})")
+
+
+class _NullProbeBus(ProbeBus):
+    """Bağlanmamış nesnelerin varsayılan veri yolu: hiç aboneliği olmaz"""
+
+    def subscribe(self, events, callback: Handler, every: int = 1) -> Subscription:
+        raise ValueError("Nesne bir ProbeBus'a bağlı değil: önce ProbeBus.attach(...) çağrılmalı")
+
+    def periodic(self, interval: float, callback: Callable[[float], None]):
+        raise ValueError("Nesne bir ProbeBus'a bağlı değil: önce ProbeBus.attach(...) çağrılmalı")
+
+
+# Paylaşılan boş veri yolu: abonelik kabul etmez, handlers hep boş demettir
+NO_PROBES = _NullProbeBus()
+
+
+class FeederHistoryProbe:
+    """
+    Feeder kuyruk uzunluğu ve blokaj geçmişlerini (queue_length_history,
+    block_events) dolduran gözlemci. Abone olunmazsa listeler boş kalır.
+    """
+
+    def __init__(self, probes: ProbeBus, every: int = 1):
+        """
+        Args:
+            probes: Feeder'ların bağlı olduğu veri yolu
+            every: Kuyruk örneklerinden her N'de birini kaydet
+        """
+        self.probes = probes
+        self._queue = probes.subscribe(QUEUE_SAMPLE, self._on_queue_sample, every=every)
+        self._block = probes.subscribe(BLOCKED, self._on_block)
+
+    def _on_queue_sample(self, event: int, packet, where: int):
+        self.probes.feeders[where].record_queue_length()
+
+    def _on_block(self, event: int, packet, where: int):
+        feeder = self.probes.feeders[where]
+        feeder.block_events.append({
+            'time': feeder.env.now,
+            'queue_length': len(feeder.queue)
+        })
+
+    def detach(self):
+        self.probes.unsubscribe(self._queue)
+        self.probes.unsubscribe(self._block)
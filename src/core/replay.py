@@ -0,0 +1,289 @@
+"""
+Replay: Kaydedilmiş bir koşunun (olay izi) herhangi bir t anındaki durumunu
+yeniden simülasyon yapmadan sorgular.
+
+İz yüklenirken her paketin hattaki yolculuğu parçalara (piece) ayrılır:
+segmente giriş olayından bir sonraki hat olayına (sonraki segment, çıkış,
+ayrılma) kadar. Parçalar başlangıç zamanına göre sıralıdır; t anında hatta
+olan paketler, en uzun parça süresi kadar geriye bisection ile bulunur.
+Pozisyon parça içinde analitik hesaplanır (giriş pozisyonu + segment hızı x
+geçen süre, parçanın bitiş pozisyonuyla sınırlı). Paketler segment sonuna
+varış sırasıyla dizilir (birbirini geçemezler) ve hattın lider kuralı
+(aralık korunur) tek kümülatif minimumla uygulanır. Feeder sayaçları olay
+zamanlarının sıralı dizilerinde bisection ile okunur.
+
+Canlı snapshot t anının tüm olaylarından sonra alınır (ProbeBus.periodic);
+replay de zamanı t olan olayları dahil eder (bisection side='right'), böylece
+aynı andaki olayların sırası sonucu değiştirmez.
+
+Snapshot'lar simülasyon içinde sabit aralıkla alınırken replay istenen her
+kare hızında snapshot üretir; görselleştirmeler SimPy'ye dokunmadan yeniden
+çizilebilir. Hız programı ve ZPA bölge adımları izde olmadığından segment
+içindeki pozisyonlar nominal hızla yaklaşıktır; segment giriş/çıkış anları
+ve tüm sayaçlar birebirdir.
+"""
+
+from typing import Dict, List
+import numpy as np
+from .trace import (TraceReader, CREATED, QUEUED, MERGED, SEGMENT, EXIT, DIVERTED,
+                    DROPPED, BLOCKED, UNBLOCKED, RECIRCULATED)
+
+
+class _FeederTimeline:
+    """Bir feeder'ın olay zamanları (sıralı) ve blokaj aralıkları"""
+
+    def __init__(self, times: Dict[int, np.ndarray], end_time: float):
+        self.created = times.get(CREATED, np.zeros(0))
+        self.queued = times.get(QUEUED, np.zeros(0))
+        self.merged = times.get(MERGED, np.zeros(0))
+        self.dropped = times.get(DROPPED, np.zeros(0))
+
+        starts = times.get(BLOCKED, np.zeros(0))
+        ends = times.get(UNBLOCKED, np.zeros(0))
+        # Koşu sonunda devam eden blokaj açık kalır
+        if ends.size < starts.size:
+            ends = np.append(ends, np.inf)
+        self.block_starts = starts
+        self.block_ends = ends
+        durations = np.minimum(ends, end_time) - starts
+        self.block_cumulative = np.concatenate(([0.0], np.cumsum(durations)))
+
+    @staticmethod
+    def _count(times: np.ndarray, t: float) -> int:
+        # t anındaki olaylar dahil: canlı snapshot o anın olaylarından sonra alınır
+        return int(np.searchsorted(times, t, side='right'))
+
+    def state_at(self, t: float) -> dict:
+        n_block = self._count(self.block_starts, t)
+        is_blocked = n_block > 0 and self.block_ends[n_block - 1] > t
+        blocked_time = self.block_cumulative[n_block - 1] if n_block else 0.0
+        if n_block:
+            blocked_time += min(self.block_ends[n_block - 1], t) - self.block_starts[n_block - 1]
+        merged = self._count(self.merged, t)
+        return {
+            'queue_length': self._count(self.queued, t) - merged,
+            'is_blocked': bool(is_blocked),
+            'total_produced': self._count(self.created, t),
+            'total_transferred': merged,
+            'total_dropped': self._count(self.dropped, t),
+            'blocked_time': float(blocked_time),
+        }
+
+
+class RunReplay:
+    """
+    Olay izinden zaman indeksli durum sorgusu.
+
+    Kullanım:
+        replay = RunReplay("output/trace/events.bin")
+        snapshot = replay.snapshot_at(42.5)           # Snapshot ile aynı yapı
+        frames = replay.snapshots(interval=0.5)      # İstenen kare hızında
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: EventTracer'ın yazdığı iz dosyası (.json meta dosyası yanında)
+        """
+        reader = TraceReader(path)
+        meta = reader.meta
+        if not meta.get('layout'):
+            raise ValueError(f"İz dosyasında hat geometrisi yok: {path}")
+        self.path = reader.path
+        self.end_time = meta['end_time']
+        self.feeder_ids: List[str] = meta['feeders']
+        self.packet_names: List[str] = meta['packets']
+        self.lengths = np.asarray(meta['lengths'], dtype=float)
+
+        layout = meta['layout']
+        self.total_length = layout['total_length']
+        self.min_gap = layout['min_gap']
+        self.segments = layout['segments']
+        self._seg_start = np.array([s['start'] for s in self.segments])
+        self._seg_end = np.array([s['end'] for s in self.segments])
+        self._seg_speed = np.array([s['speed'] for s in self.segments])
+        self._seg_length = self._seg_end - self._seg_start
+
+        records = np.asarray(reader.records)
+        t = records['t']
+        packet = records['packet'].astype(np.int64)
+        kind = records['kind']
+        where = records['where'].astype(np.int64)
+
+        # Paket kaynağı: üretim olayındaki feeder
+        self.sources: List[str] = [None] * len(self.packet_names)
+        created = kind == CREATED
+        for p, w in zip(packet[created], where[created]):
+            self.sources[p] = self.feeder_ids[w]
+
+        # Hattan ayrılan her paket: hat sonu çıkışı ve ayırıcı (ConveyorLine ile aynı)
+        self._exit_times = t[(kind == EXIT) | (kind == DIVERTED)]
+
+        self._feeders: List[_FeederTimeline] = []
+        feeder_kinds = (CREATED, QUEUED, MERGED, DROPPED, BLOCKED, UNBLOCKED)
+        feeder_mask = np.isin(kind, feeder_kinds)
+        for index in range(len(self.feeder_ids)):
+            mask = feeder_mask & (where == index)
+            times = {k: t[mask & (kind == k)] for k in feeder_kinds}
+            self._feeders.append(_FeederTimeline(times, self.end_time))
+
+        self._build_pieces(t, packet, kind, where, records['pos'].astype(float))
+
+    def _build_pieces(self, t, packet, kind, where, pos):
+        """Segment girişinden bir sonraki hat olayına kadar olan yolculuk parçaları"""
+        mask = (kind == SEGMENT) | (kind == EXIT) | (kind == DIVERTED) | (kind == RECIRCULATED)
+        t, packet, kind, where, pos = t[mask], packet[mask], kind[mask], where[mask], pos[mask]
+        order = np.argsort(packet, kind='stable')
+        t, packet, kind, where, pos = t[order], packet[order], kind[order], where[order], pos[order]
+
+        is_piece = kind == SEGMENT
+        has_next = np.zeros(t.size, dtype=bool)
+        has_next[:-1] = packet[1:] == packet[:-1]
+        next_t = np.where(has_next, np.roll(t, -1), np.inf)
+        next_pos = np.where(has_next, np.roll(pos, -1), np.nan)
+
+        seg = where[is_piece]
+        start = t[is_piece]
+        end = next_t[is_piece]
+        end_pos = next_pos[is_piece]
+        # Koşu sonunda hâlâ hatta olan paket: parça segment sonunda biter
+        open_piece = np.isnan(end_pos)
+        end_pos[open_piece] = self._seg_end[seg[open_piece]]
+
+        by_start = np.argsort(start, kind='stable')
+        self._p_packet = packet[is_piece][by_start]
+        self._p_seg = seg[by_start]
+        self._p_start = start[by_start]
+        self._p_end = end[by_start]
+        self._p_pos = pos[is_piece][by_start]
+        self._p_end_pos = end_pos[by_start]
+        closed = np.isfinite(self._p_end)
+        # Segment sonuna varış zamanı: hat olayıyla biten parçada olay anı,
+        # ayrılan ya da koşu sonunda açık kalan parçada nominal hızla tahmin.
+        # Açık parçalar koşu sonuna kadar varmadığı için kapalılardan sonra gelir.
+        self._p_closed = closed
+        speed = self._seg_speed[self._p_seg]
+        seg_end = self._seg_end[self._p_seg]
+        self._p_arrival = np.where(
+            closed,
+            self._p_end + (seg_end - self._p_end_pos) / speed,
+            self._p_start + (seg_end - self._p_pos) / speed)
+        self._max_piece = float((self._p_end[closed] - self._p_start[closed]).max()) if closed.any() else 0.0
+        self._open = np.flatnonzero(~closed)
+
+    def _active_pieces(self, t: float) -> np.ndarray:
+        """t anında hatta olan paketlerin parça index'leri"""
+        lo = int(np.searchsorted(self._p_start, t - self._max_piece, side='left'))
+        hi = int(np.searchsorted(self._p_start, t, side='right'))
+        candidates = np.arange(lo, hi)
+        candidates = candidates[self._p_end[candidates] > t]
+        open_pieces = self._open[(self._p_start[self._open] <= t) & (self._open < lo)]
+        return np.concatenate((open_pieces, candidates))
+
+    def packets_at(self, t: float):
+        """
+        t anında hattaki paketler (pozisyona göre artan).
+
+        Returns:
+            (paket index'leri, segment index'leri, pozisyonlar)
+        """
+        idx = self._active_pieces(t)
+        seg = self._p_seg[idx]
+        travelled = self._p_pos[idx] + self._seg_speed[seg] * (t - self._p_start[idx])
+        position = np.minimum(travelled, self._p_end_pos[idx])
+        packet = self._p_packet[idx]
+
+        # Paketler birbirini geçemez: segment içinde sıra, segment sonuna
+        # varış sırasıdır (önden arkaya); ardından lider kuralıyla aralık korunur
+        order = np.lexsort((self._p_arrival[idx], ~self._p_closed[idx], -seg))
+        packet, seg, position = packet[order], seg[order], position[order]
+        if position.size > 1:
+            lengths = self.lengths[packet]
+            spacing = np.zeros(position.size)
+            spacing[1:] = (lengths[1:] + lengths[:-1]) / 2 + self.min_gap
+            offset = np.cumsum(spacing)
+            position = np.minimum.accumulate(position + offset) - offset
+            position = np.maximum(position, self._seg_start[seg])
+        return packet[::-1], seg[::-1], position[::-1]
+
+    def snapshot_at(self, t: float) -> dict:
+        """MultiSegmentSimulation snapshot'ı ile aynı yapıda t anındaki durum"""
+        packet, seg, position = self.packets_at(t)
+        occupied = self.lengths[packet] + self.min_gap
+        seg_occupied = np.bincount(seg, weights=occupied, minlength=len(self.segments))
+        seg_packets = np.bincount(seg, minlength=len(self.segments))
+        total_occupied = float(occupied.sum())
+
+        return {
+            'time': t,
+            'conveyor_line': {
+                'packets': [
+                    {
+                        'id': self.packet_names[p],
+                        'position': float(x),
+                        'length': float(self.lengths[p]),
+                        'source': self.sources[p]
+                    }
+                    for p, x in zip(packet, position)
+                ],
+                'utilization': min(1.0, total_occupied / self.total_length) if self.total_length else 0.0,
+                'occupied_length': total_occupied,
+                'total_processed': int(np.searchsorted(self._exit_times, t, side='right')),
+                'segments': [
+                    {
+                        'id': s['id'],
+                        'packets': int(seg_packets[i]),
+                        'occupied_length': float(seg_occupied[i]),
+                        'utilization': min(1.0, seg_occupied[i] / self._seg_length[i])
+                        if self._seg_length[i] else 0.0
+                    }
+                    for i, s in enumerate(self.segments)
+                ]
+            },
+            'feeders': [
+                dict(id=feeder_id, **timeline.state_at(t))
+                for feeder_id, timeline in zip(self.feeder_ids, self._feeders)
+            ]
+        }
+
+    def mismatches(self, snapshots: List[dict]) -> Dict[str, List[float]]:
+        """
+        Canlı snapshot'ları aynı anlardaki replay durumuyla karşılaştırır:
+        hattaki paket kümesi, çıkış sayacı, feeder sayaçları ve blokaj durumu
+        birebir olmalıdır. Segment içi pozisyonlar yaklaşık olduğu için
+        karşılaştırılmaz.
+
+        Returns:
+            {alan: farkın görüldüğü zamanlar}; boşsa replay canlı koşuyla aynı
+        """
+        differences: Dict[str, List[float]] = {}
+        for live in snapshots:
+            t = live['time']
+            replayed = self.snapshot_at(t)
+            fields = []
+            live_line, replay_line = live['conveyor_line'], replayed['conveyor_line']
+            if {p['id'] for p in live_line['packets']} != {p['id'] for p in replay_line['packets']}:
+                fields.append('packets')
+            if live_line['total_processed'] != replay_line['total_processed']:
+                fields.append('total_processed')
+            for live_feeder, replay_feeder in zip(live['feeders'], replayed['feeders']):
+                for key in ('queue_length', 'is_blocked', 'total_produced', 'total_transferred'):
+                    if live_feeder[key] != replay_feeder[key]:
+                        fields.append(f"{live_feeder['id']}.{key}")
+                if abs(live_feeder['blocked_time'] - replay_feeder['blocked_time']) > 1e-6:
+                    fields.append(f"{live_feeder['id']}.blocked_time")
+            for field in fields:
+                differences.setdefault(field, []).append(t)
+        return differences
+
+    def snapshots(self, interval: float, start: float = 0.0, end: float = None) -> List[dict]:
+        """[start, end] aralığında sabit aralıklı snapshot listesi (kare hızı = 1/interval)"""
+        if interval <= 0:
+            raise ValueError(f"Replay aralığı pozitif olmalı: {interval}")
+        end = self.end_time if end is None else end
+        count = int(np.floor((end - start) / interval + 1e-9)) + 1
+        return [self.snapshot_at(start + i * interval) for i in range(count)]
+
+    def __repr__(self) -> str:
+        return (f"RunReplay({self.path}, {len(self.packet_names)} packets, "
+                f"{self.end_time}s, {self._p_start.size} pieces)")
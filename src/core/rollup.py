@@ -0,0 +1,303 @@
+"""
+Çok çözünürlüklü zaman serisi özetleri (rollup) ve şekil koruyan seyreltme.
+
+Uzun koşularda (örn. 24 saat) her snapshot noktasını çizmek hem yavaş hem
+okunaksızdır. RollupRecorder doluluk, kuyruk uzunluğu ve throughput'u koşu
+sırasında sabit aralıkla örnekler ve her seriyi birkaç kova çözünürlüğünde
+(varsayılan 1 sn, 10 sn, 60 sn, 10 dk) min/ortalama/max olarak tutar.
+Kovalar basamaklı dolar: örnek yalnızca en ince seviyeye eklenir, kapanan
+kova bir üst seviyeye aktarılır; örnek başına maliyet sabittir.
+
+Grafikler şekil genişliğine sığan en ince çözünürlüğü seçer (select) ve
+gerekirse LTTB (Largest-Triangle-Three-Buckets) ile piksel sayısına
+seyreltir; çizim maliyeti koşu süresinden bağımsızdır.
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import simpy
+
+
+DEFAULT_RESOLUTIONS = (1.0, 10.0, 60.0, 600.0)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets seyreltmesi.
+
+    İlk ve son nokta korunur; aradaki her kovadan, önceki seçilen nokta ve
+    sonraki kovanın ortalamasıyla en büyük üçgeni oluşturan nokta seçilir.
+    Tepe ve çukurlar (şekil) korunur.
+
+    Args:
+        x, y: Aynı uzunlukta seri (x artan)
+        threshold: Hedef nokta sayısı
+
+    Returns:
+        Seçilen noktaların index dizisi (artan)
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    every = (n - 2) / (threshold - 2)
+
+    a = 0
+    for i in range(threshold - 2):
+        start = int(math.floor(i * every)) + 1
+        end = int(math.floor((i + 1) * every)) + 1
+        next_end = min(int(math.floor((i + 2) * every)) + 1, n)
+        if next_end <= end:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        else:
+            avg_x = x[end:next_end].mean()
+            avg_y = y[end:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+class _Level:
+    """Tek çözünürlükteki kapanmış kovalar ve açık kova"""
+
+    __slots__ = ("resolution", "times", "mins", "maxs", "sums", "counts",
+                 "_bucket", "_min", "_max", "_sum", "_count")
+
+    def __init__(self, resolution: float):
+        self.resolution = resolution
+        self.times: List[float] = []
+        self.mins: List[float] = []
+        self.maxs: List[float] = []
+        self.sums: List[float] = []
+        self.counts: List[int] = []
+        self._bucket: Optional[int] = None
+        self._min = self._max = self._sum = 0.0
+        self._count = 0
+
+    def add(self, t: float, vmin: float, vmax: float, vsum: float, count: int):
+        """
+        Örneği (veya alt seviyenin kovasını) ekler.
+
+        Returns:
+            Kova kapandıysa kapanan kova (t, min, max, sum, count), yoksa None
+        """
+        bucket = int(t // self.resolution)
+        closed = None
+        if bucket != self._bucket:
+            if self._bucket is not None:
+                closed = self._close()
+            self._bucket = bucket
+            self._min, self._max, self._sum, self._count = vmin, vmax, vsum, count
+        else:
+            if vmin < self._min:
+                self._min = vmin
+            if vmax > self._max:
+                self._max = vmax
+            self._sum += vsum
+            self._count += count
+        return closed
+
+    def _close(self):
+        t = self._bucket * self.resolution
+        self.times.append(t)
+        self.mins.append(self._min)
+        self.maxs.append(self._max)
+        self.sums.append(self._sum)
+        self.counts.append(self._count)
+        return t, self._min, self._max, self._sum, self._count
+
+    def __len__(self) -> int:
+        return len(self.times) + (1 if self._bucket is not None else 0)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Kapanmış kovalar + açık kova (kova başlangıç zamanıyla)"""
+        times, mins, maxs = list(self.times), list(self.mins), list(self.maxs)
+        sums, counts = list(self.sums), list(self.counts)
+        if self._bucket is not None:
+            times.append(self._bucket * self.resolution)
+            mins.append(self._min)
+            maxs.append(self._max)
+            sums.append(self._sum)
+            counts.append(self._count)
+        counts = np.asarray(counts, dtype=float)
+        return {
+            'time': np.asarray(times, dtype=float),
+            'min': np.asarray(mins, dtype=float),
+            'mean': np.asarray(sums, dtype=float) / np.maximum(counts, 1.0),
+            'max': np.asarray(maxs, dtype=float),
+        }
+
+
+class Rollup:
+    """Tek bir serinin basamaklı çok çözünürlüklü özeti"""
+
+    def __init__(self, resolutions: Sequence[float] = DEFAULT_RESOLUTIONS):
+        resolutions = sorted(float(r) for r in resolutions)
+        if not resolutions or resolutions[0] <= 0:
+            raise ValueError(f"Rollup çözünürlükleri pozitif olmalı: {resolutions}")
+        for fine, coarse in zip(resolutions, resolutions[1:]):
+            ratio = coarse / fine
+            if abs(ratio - round(ratio)) > 1e-9:
+                raise ValueError(f"Rollup çözünürlüğü bir öncekinin katı olmalı: {coarse} / {fine}")
+        self.levels = [_Level(r) for r in resolutions]
+        self.total_sum = 0.0
+        self.total_count = 0
+
+    def add(self, t: float, value: float):
+        """Örnek ekler; kapanan kovalar üst seviyelere aktarılır"""
+        self.total_sum += value
+        self.total_count += 1
+        item = (t, value, value, value, 1)
+        for level in self.levels:
+            item = level.add(*item)
+            if item is None:
+                break
+
+    @property
+    def mean(self) -> float:
+        """Tüm koşunun örnek ortalaması"""
+        return self.total_sum / self.total_count if self.total_count else 0.0
+
+    def select(self, max_points: int) -> Dict[str, np.ndarray]:
+        """
+        max_points'e sığan en ince çözünürlüğü seçer; yine de fazlaysa
+        ortalama üzerinden LTTB ile seyreltir.
+
+        Returns:
+            {'time', 'min', 'mean', 'max', 'resolution'}
+        """
+        max_points = max(3, int(max_points))
+        level = next((lv for lv in self.levels if len(lv) <= max_points), self.levels[-1])
+        data = level.arrays()
+        if data['time'].size > max_points:
+            keep = lttb(data['time'], data['mean'], max_points)
+            data = {k: v[keep] for k, v in data.items()}
+        data['resolution'] = level.resolution
+        return data
+
+
+class RollupRecorder:
+    """
+    Hat ve feeder serilerini koşu sırasında örnekleyip rollup'larda tutar.
+
+    Seriler:
+        line.utilization, line.packets, line.processed, line.throughput (paket/s),
+        segment.<id>.utilization, feeder.<id>.queue
+
+    Kullanım:
+        recorder = RollupRecorder(env, line, feeders, interval=1.0)
+        recorder.start()
+        ...
+        data = recorder.select("line.utilization", max_points=800)
+    """
+
+    def __init__(self, env: simpy.Environment = None, line=None, feeders: List = None,
+                 interval: float = 1.0, resolutions: Sequence[float] = DEFAULT_RESOLUTIONS):
+        """
+        Args:
+            env: SimPy environment (snapshot'lardan doldurulacaksa None)
+            line: ConveyorLine
+            feeders: FeederLine listesi
+            interval: Örnekleme aralığı (simülasyon saniyesi)
+            resolutions: Kova çözünürlükleri (artan, her biri öncekinin katı)
+        """
+        self.env = env
+        self.line = line
+        self.feeders = feeders or []
+        self.interval = interval
+        self.resolutions = tuple(sorted(resolutions))
+        self.series: Dict[str, Rollup] = {}
+        self._last_time: Optional[float] = None
+        self._last_processed = 0
+
+    def _rollup(self, name: str) -> Rollup:
+        rollup = self.series.get(name)
+        if rollup is None:
+            rollup = self.series[name] = Rollup(self.resolutions)
+        return rollup
+
+    def ingest(self, t: float, values: Dict[str, float]):
+        """
+        Bir örnek anındaki değerleri ekler. line.processed verilmişse
+        throughput önceki örnekten bu yana çıkan paket / geçen süredir.
+        """
+        processed = values.get('line.processed')
+        if processed is not None and self._last_time is not None and t > self._last_time:
+            values = dict(values)
+            values['line.throughput'] = (processed - self._last_processed) / (t - self._last_time)
+        for name, value in values.items():
+            self._rollup(name).add(t, value)
+        if processed is not None:
+            self._last_time = t
+            self._last_processed = processed
+
+    def sample(self):
+        """Canlı nesnelerden anlık değerleri okur"""
+        line = self.line
+        values = {
+            'line.utilization': line.get_utilization(),
+            'line.packets': len(line.packets_in_transit),
+            'line.processed': line.total_packets_processed,
+        }
+        for segment in line.segments:
+            values[f'segment.{segment.id}.utilization'] = segment.get_utilization()
+        for feeder in self.feeders:
+            values[f'feeder.{feeder.id}.queue'] = len(feeder.queue)
+        self.ingest(self.env.now, values)
+
+    def ingest_snapshot(self, snapshot: dict):
+        """Snapshot (canlı veya replay) değerlerini ekler"""
+        line = snapshot['conveyor_line']
+        values = {
+            'line.utilization': line['utilization'],
+            'line.packets': len(line['packets']),
+            'line.processed': line['total_processed'],
+        }
+        for segment in line['segments']:
+            values[f"segment.{segment['id']}.utilization"] = segment['utilization']
+        for feeder in snapshot['feeders']:
+            values[f"feeder.{feeder['id']}.queue"] = feeder['queue_length']
+        self.ingest(snapshot['time'], values)
+
+    @classmethod
+    def from_snapshots(cls, snapshots: List[dict],
+                       resolutions: Sequence[float] = DEFAULT_RESOLUTIONS) -> "RollupRecorder":
+        """Hazır snapshot listesinden (örn. replay) rollup'ları kurar"""
+        recorder = cls(resolutions=resolutions)
+        if len(snapshots) >= 2:
+            recorder.interval = snapshots[1]['time'] - snapshots[0]['time']
+        for snapshot in snapshots:
+            recorder.ingest_snapshot(snapshot)
+        return recorder
+
+    def start(self):
+        """Örnekleme process'ini başlatır"""
+        self.env.process(self._sample_loop())
+
+    def _sample_loop(self):
+        while True:
+            self.sample()
+            yield self.env.timeout(self.interval)
+
+    def select(self, name: str, max_points: int) -> Dict[str, np.ndarray]:
+        """Serinin max_points'e sığan özeti (bkz. Rollup.select)"""
+        if name not in self.series:
+            raise KeyError(f"Rollup serisi yok: {name}")
+        return self.series[name].select(max_points)
+
+    def mean(self, name: str) -> float:
+        """Serinin tüm koşu ortalaması"""
+        return self.series[name].mean if name in self.series else 0.0
+
+    def __repr__(self) -> str:
+        return (f"RollupRecorder({len(self.series)} series, interval={self.interval}s, "
+                f"resolutions={self.resolutions})")
@@ -0,0 +1,231 @@
+"""
+RunStore: Tamamlanan simülasyon koşularının kalıcı, indeksli SQLite deposu.
+Aynı config + motor sürümü + seed ile tekrar koşulan senaryolar için
+sonuç önbelleği olarak da kullanılır.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+# Hash hesabına dahil edilmeyen (sonuçları etkilemeyen) config bölümleri
+NON_SEMANTIC_SECTIONS = ('visualization', 'run_store')
+
+
+def canonicalize_config(config: dict) -> str:
+    """
+    Config'i anahtar sırasından bağımsız, kanonik JSON metnine çevirir.
+    Görselleştirme gibi KPI'ları etkilemeyen bölümler çıkarılır.
+    """
+    semantic = {k: v for k, v in config.items() if k not in NON_SEMANTIC_SECTIONS}
+    return json.dumps(semantic, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def config_hash(config: dict) -> str:
+    """Kanonik config metninin SHA-256 özetini döndürür"""
+    return hashlib.sha256(canonicalize_config(config).encode('utf-8')).hexdigest()
+
+
+class RunStore:
+    """
+    Koşu sonuçlarını SQLite'a yazan ve sorgulayan depo.
+
+    Tablolar:
+    - runs: Her koşu için bir satır (config hash, motor sürümü, seed, KPI JSON)
+    - kpis: Koşu başına KPI'lar (run_id, name, value) - (name, value) indeksli
+
+    Yazmalar tamponlanır ve batch_size dolduğunda tek transaction içinde
+    executemany ile yazılır. Önbellek sorguları önce tampona bakar.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            config_hash TEXT NOT NULL,
+            engine_version TEXT NOT NULL,
+            seed INTEGER NOT NULL,
+            duration REAL NOT NULL,
+            created_at REAL NOT NULL,
+            config_json TEXT NOT NULL,
+            kpis_json TEXT NOT NULL,
+            UNIQUE (config_hash, engine_version, seed)
+        );
+        CREATE TABLE IF NOT EXISTS kpis (
+            run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (run_id, name)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_kpis_name_value ON kpis (name, value);
+        CREATE INDEX IF NOT EXISTS idx_runs_engine ON runs (engine_version);
+    """
+
+    def __init__(self, path: Union[str, Path] = "output/runs.sqlite", batch_size: int = 50):
+        """
+        Args:
+            path: SQLite dosya yolu (":memory:" da kullanılabilir)
+            batch_size: Kaç koşu biriktiğinde diske yazılacağı
+        """
+        self.path = str(path)
+        self.batch_size = batch_size
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(self.SCHEMA)
+
+        # Henüz yazılmamış koşular: (config_hash, engine_version, seed) -> satır
+        self._pending: Dict[Tuple[str, str, int], tuple] = {}
+
+    def record(self, config: dict, kpis: Dict[str, float], engine_version: str,
+               seed: int = 0, duration: float = 0.0) -> str:
+        """
+        Tamamlanan bir koşuyu kayda ekler (tamponlu).
+
+        Args:
+            config: Koşunun config'i
+            kpis: Düz {isim: sayı} KPI sözlüğü
+            engine_version: Simülasyon motoru sürümü
+            seed: Rastgelelik tohumu
+            duration: Simülasyon süresi (saniye)
+
+        Returns:
+            Config hash
+        """
+        digest = config_hash(config)
+        key = (digest, engine_version, int(seed))
+        self._pending[key] = (
+            digest, engine_version, int(seed), float(duration), time.time(),
+            canonicalize_config(config), json.dumps(kpis, sort_keys=True), kpis
+        )
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        return digest
+
+    def flush(self):
+        """Tampondaki koşuları tek transaction ile diske yazar"""
+        if not self._pending:
+            return
+
+        rows = list(self._pending.values())
+        self._pending.clear()
+
+        with self.conn:
+            for row in rows:
+                # Aynı anahtar tekrar kaydedilirse eski satır (ve KPI'ları) değişir
+                self.conn.execute(
+                    "DELETE FROM runs WHERE config_hash = ? AND engine_version = ? AND seed = ?",
+                    row[:3]
+                )
+            self.conn.executemany(
+                "INSERT INTO runs (config_hash, engine_version, seed, duration, created_at, "
+                "config_json, kpis_json) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [row[:7] for row in rows]
+            )
+
+            kpi_rows = []
+            for row in rows:
+                run_id = self.conn.execute(
+                    "SELECT id FROM runs WHERE config_hash = ? AND engine_version = ? AND seed = ?",
+                    row[:3]
+                ).fetchone()[0]
+                kpi_rows.extend(
+                    (run_id, name, float(value))
+                    for name, value in row[7].items()
+                    if isinstance(value, (int, float))
+                )
+            self.conn.executemany(
+                "INSERT INTO kpis (run_id, name, value) VALUES (?, ?, ?)", kpi_rows
+            )
+
+    def lookup(self, config: dict, engine_version: str, seed: int = 0) -> Optional[Dict[str, float]]:
+        """
+        Önbellek sorgusu: aynı config/sürüm/seed ile koşu varsa KPI'larını döndürür.
+
+        Returns:
+            KPI sözlüğü veya None (önbellekte yoksa)
+        """
+        digest = config_hash(config)
+        key = (digest, engine_version, int(seed))
+
+        if key in self._pending:
+            return dict(self._pending[key][7])
+
+        row = self.conn.execute(
+            "SELECT kpis_json FROM runs WHERE config_hash = ? AND engine_version = ? AND seed = ?",
+            key
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def query(self, kpi: str, op: str = ">", value: float = 0.0,
+              engine_version: Optional[str] = None) -> List[dict]:
+        """
+        KPI eşiğine göre koşuları sorgular.
+
+        Örnek: FEEDER_B'nin %10'dan fazla bloke kaldığı tüm düzenler
+            store.query("feeder.FEEDER_B.blocked_ratio", ">", 0.10)
+
+        Args:
+            kpi: KPI adı
+            op: Karşılaştırma operatörü (<, <=, =, >=, >)
+            value: Eşik değeri
+            engine_version: Verilirse sadece bu sürümün koşuları
+
+        Returns:
+            [{run_id, config_hash, engine_version, seed, value, config, kpis}, ...]
+        """
+        if op not in ('<', '<=', '=', '>=', '>'):
+            raise ValueError(f"Geçersiz operatör: {op}")
+
+        self.flush()
+
+        sql = (
+            "SELECT r.id, r.config_hash, r.engine_version, r.seed, k.value, "
+            "r.config_json, r.kpis_json "
+            "FROM kpis k JOIN runs r ON r.id = k.run_id "
+            f"WHERE k.name = ? AND k.value {op} ?"
+        )
+        params: list = [kpi, value]
+        if engine_version is not None:
+            sql += " AND r.engine_version = ?"
+            params.append(engine_version)
+        sql += " ORDER BY k.value DESC"
+
+        return [
+            {
+                'run_id': run_id,
+                'config_hash': digest,
+                'engine_version': version,
+                'seed': seed,
+                'value': kpi_value,
+                'config': json.loads(config_json),
+                'kpis': json.loads(kpis_json),
+            }
+            for run_id, digest, version, seed, kpi_value, config_json, kpis_json
+            in self.conn.execute(sql, params)
+        ]
+
+    def count(self) -> int:
+        """Depodaki toplam koşu sayısı (tampon dahil)"""
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def close(self):
+        """Tamponu yazar ve bağlantıyı kapatır"""
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"RunStore(path={self.path}, pending={len(self._pending)})"
@@ -0,0 +1,404 @@
+"""
+Ayrı process'te canlı görüntüleyici: Simülasyon paket pozisyonlarını kompakt
+kareler halinde paylaşımlı bellekteki (shared memory) bir halka tampona
+yazar, görüntüleyici process kendi kare hızında en son kareyi okuyup çizer.
+
+Yazıcı hiç beklemez: halka doluysa en eski slotun üzerine yazılır. Her slot
+bir sıra sayacıyla (seqlock) korunur; yazıcı yazmaya başlarken sayacı tek,
+bitirince çift yapar. Okuyucu kopyalamadan önce ve sonra sayacı okur; sayaç
+değiştiyse (slot okunurken üzerine yazıldıysa) kare atlanır. Böylece
+matplotlib yeniden çizimleri simülasyonu yavaşlatmaz, yük altında
+görüntüleyici kare düşürür.
+
+Slot yapısı (NumPy structured dtype):
+    seq u8 | time f8 | processed u4 | count u4 |
+    position f4[max_packets] | length f4[max_packets] | source u1[max_packets] |
+    queue u4[max_feeders] | blocked u1[max_feeders]
+"""
+
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+import numpy as np
+import simpy
+
+
+HEADER_FIELDS = 4               # published, finished, slots, max_packets
+HEADER_SIZE = HEADER_FIELDS * 8
+UNKNOWN_SOURCE = 255
+
+
+def slot_dtype(max_packets: int, max_feeders: int) -> np.dtype:
+    """Tek bir kare slotunun yapısı"""
+    return np.dtype([
+        ('seq', '<u8'),
+        ('time', '<f8'),
+        ('processed', '<u4'),
+        ('count', '<u4'),
+        ('position', '<f4', (max_packets,)),
+        ('length', '<f4', (max_packets,)),
+        ('source', 'u1', (max_packets,)),
+        ('queue', '<u4', (max_feeders,)),
+        ('blocked', 'u1', (max_feeders,)),
+    ])
+
+
+class FrameRing:
+    """
+    Paylaşımlı bellekte sabit boyutlu kare halkası (tek yazıcı, çok okuyucu).
+
+    Kullanım:
+        ring = FrameRing(slots=8, max_packets=2048, max_feeders=4)   # Yazıcı
+        ring.publish(t, processed, positions, lengths, sources, queues, blocked)
+
+        reader = FrameRing.attach(ring.name, max_feeders=4)          # Okuyucu
+        frame = reader.read_latest()
+    """
+
+    def __init__(self, slots: int = 8, max_packets: int = 2048, max_feeders: int = 8,
+                 shm: shared_memory.SharedMemory = None):
+        """
+        Args:
+            slots: Halkadaki kare sayısı
+            max_packets: Kare başına en fazla paket (fazlası kesilir)
+            max_feeders: Kare başına en fazla feeder
+            shm: Var olan blok (attach); None ise yeni blok oluşturulur
+        """
+        self.slots = slots
+        self.max_packets = max_packets
+        self.max_feeders = max_feeders
+        self.dtype = slot_dtype(max_packets, max_feeders)
+        size = HEADER_SIZE + slots * self.dtype.itemsize
+
+        create = shm is None
+        self._owner = create
+        self.shm = shared_memory.SharedMemory(create=True, size=size) if create else shm
+
+        self.header = np.ndarray(HEADER_FIELDS, dtype='<i8', buffer=self.shm.buf)
+        self.frames = np.ndarray(slots, dtype=self.dtype, buffer=self.shm.buf, offset=HEADER_SIZE)
+        if create:
+            self.header[:] = (0, 0, slots, max_packets)
+            self.frames['seq'] = 0
+
+        self.last_read = 0
+        self.dropped = 0
+        self.torn = 0
+
+    @classmethod
+    def attach(cls, name: str, max_feeders: int) -> "FrameRing":
+        """Var olan halkaya okuyucu olarak bağlanır (boyutlar başlıktan okunur)"""
+        # Görüntüleyici yazıcının alt process'idir ve aynı resource tracker'ı
+        # paylaşır; blok yalnızca yazıcının close() çağrısıyla silinir
+        shm = shared_memory.SharedMemory(name=name)
+        header = np.ndarray(HEADER_FIELDS, dtype='<i8', buffer=shm.buf)
+        slots, max_packets = int(header[2]), int(header[3])
+        del header
+        return cls(slots, max_packets, max_feeders, shm=shm)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def published(self) -> int:
+        return int(self.header[0])
+
+    @property
+    def finished(self) -> bool:
+        return bool(self.header[1])
+
+    def publish(self, t: float, processed: int, positions: np.ndarray, lengths: np.ndarray,
+                sources: np.ndarray, queues: np.ndarray, blocked: np.ndarray) -> int:
+        """
+        Kareyi bir sonraki slota yazar; hiç beklemez.
+
+        Returns:
+            Karenin sıra numarası
+        """
+        n = int(self.header[0]) + 1
+        slot = self.frames[n % self.slots]
+        count = min(len(positions), self.max_packets)
+        feeders = min(len(queues), self.max_feeders)
+
+        slot['seq'] = 2 * n - 1                 # Tek: yazılıyor
+        slot['time'] = t
+        slot['processed'] = processed
+        slot['count'] = count
+        slot['position'][:count] = positions[:count]
+        slot['length'][:count] = lengths[:count]
+        slot['source'][:count] = sources[:count]
+        slot['queue'][:feeders] = queues[:feeders]
+        slot['blocked'][:feeders] = blocked[:feeders]
+        slot['seq'] = 2 * n                     # Çift: tamam
+        self.header[0] = n
+        return n
+
+    def mark_finished(self):
+        self.header[1] = 1
+
+    def read_latest(self) -> Optional[dict]:
+        """
+        En son tamamlanmış kareyi kopyalar. Yeni kare yoksa ya da okunurken
+        üzerine yazıldıysa None döner (kare atlanır, yazıcı beklemez).
+        """
+        n = int(self.header[0])
+        if n == 0 or n == self.last_read:
+            return None
+        slot = self.frames[n % self.slots]
+        seq = int(slot['seq'])
+        if seq != 2 * n:
+            self.torn += 1
+            return None
+        count = int(slot['count'])
+        frame = {
+            'frame': n,
+            'time': float(slot['time']),
+            'processed': int(slot['processed']),
+            'position': slot['position'][:count].copy(),
+            'length': slot['length'][:count].copy(),
+            'source': slot['source'][:count].copy(),
+            'queue': slot['queue'].copy(),
+            'blocked': slot['blocked'].copy(),
+        }
+        if int(slot['seq']) != seq:
+            self.torn += 1
+            return None
+        self.dropped += max(0, n - self.last_read - 1)
+        self.last_read = n
+        return frame
+
+    def close(self):
+        """Görünümleri bırakır; yazıcı ise bloğu siler"""
+        self.header = None
+        self.frames = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+            self._owner = False
+
+    def __repr__(self) -> str:
+        return (f"FrameRing({self.name}, {self.slots} slots x {self.max_packets} packets, "
+                f"published={self.published})")
+
+
+def run_viewer(ring_name: str, layout: dict, render_fps: float):
+    """
+    Görüntüleyici process'in giriş noktası: halkadaki en son kareyi kendi
+    kare hızında çizer. Paketler tek bir scatter ile çizilir.
+
+    Args:
+        ring_name: FrameRing paylaşımlı bellek adı
+        layout: LiveViewer.build_layout çıktısı (segmentler, feeder'lar, renkler)
+        render_fps: Saniyedeki çizim sayısı
+    """
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as patches
+    import matplotlib.animation as animation
+    import matplotlib.colors as mcolors
+
+    feeders = layout['feeders']
+    ring = FrameRing.attach(ring_name, max_feeders=max(1, len(feeders)))
+    segments = layout['segments']
+    seg_start = np.array([s['start_offset'] for s in segments])
+    seg_length = np.array([s['length'] for s in segments])
+    seg_x0 = np.array([s['start_x'] for s in segments])
+    seg_y0 = np.array([s['start_y'] for s in segments])
+    seg_dx = np.array([s['end_x'] - s['start_x'] for s in segments])
+    seg_dy = np.array([s['end_y'] - s['start_y'] for s in segments])
+    source_colors = np.array([mcolors.to_rgba(f['color']) for f in feeders]
+                             + [mcolors.to_rgba('#FFFFFF')])
+
+    plt.style.use('dark_background')
+    fig, ax = plt.subplots(figsize=(12, 10))
+    fig.patch.set_facecolor('#1a1a1a')
+    ax.set_facecolor('#1a1a1a')
+    belt_width = 1.2
+    for s in segments:
+        if s['direction'] == 'horizontal':
+            rect = patches.Rectangle((s['start_x'], s['start_y'] - belt_width / 2), s['length'], belt_width,
+                                     linewidth=2, edgecolor='#555555', facecolor=s['color'], alpha=0.5)
+        else:
+            rect = patches.Rectangle((s['start_x'] - belt_width / 2, s['start_y']), belt_width, s['length'],
+                                     linewidth=2, edgecolor='#555555', facecolor=s['color'], alpha=0.5)
+        ax.add_patch(rect)
+    feeder_marks = ax.scatter([f['x'] for f in feeders], [f['y'] for f in feeders], marker='s', s=220,
+                              c=[f['color'] for f in feeders], edgecolors=[f['color'] for f in feeders],
+                              linewidths=3, zorder=2)
+    packets = ax.scatter([], [], marker='s', s=60, zorder=3)
+    info = ax.text(0.02, 0.98, "Bekleniyor...", transform=ax.transAxes, va='top',
+                   fontsize=10, fontfamily='monospace', color='white')
+    ax.set_xlim(*layout['xlim'])
+    ax.set_ylim(*layout['ylim'])
+    ax.set_aspect('equal')
+    ax.axis('off')
+    ax.set_title('Canlı Görüntüleyici (ayrı process)', fontsize=14, fontweight='bold', color='white')
+
+    stats = {'rendered': 0, 'started': time.perf_counter()}
+
+    def update(_):
+        frame = ring.read_latest()
+        if frame is None:
+            if ring.finished and not stats.get('done'):
+                stats['done'] = True
+                info.set_text(info.get_text() + "\nkoşu bitti - pencereyi kapatın")
+            return packets, info
+        position = frame['position'].astype(float)
+        index = np.clip(np.searchsorted(seg_start, position, side='right') - 1, 0, len(segments) - 1)
+        ratio = np.clip((position - seg_start[index]) / seg_length[index], 0.0, 1.0)
+        packets.set_offsets(np.column_stack((seg_x0[index] + ratio * seg_dx[index],
+                                             seg_y0[index] + ratio * seg_dy[index])))
+        source = np.minimum(frame['source'], len(feeders))
+        packets.set_facecolors(source_colors[source])
+        blocked = frame['blocked'][:len(feeders)].astype(bool)
+        feeder_marks.set_edgecolors([('#FFD700' if b else f['color']) for b, f in zip(blocked, feeders)])
+
+        stats['rendered'] += 1
+        elapsed = time.perf_counter() - stats['started']
+        queues = "  ".join(f"{f['id'][-1]}:{q}" for f, q in zip(feeders, frame['queue']))
+        info.set_text(f"t={frame['time']:8.1f}s  kare #{frame['frame']}\n"
+                      f"hatta {position.size} pkt  işlenen {frame['processed']}\n"
+                      f"kuyruk {queues}\n"
+                      f"çizilen {stats['rendered']} ({stats['rendered'] / max(elapsed, 1e-9):.1f} fps)  "
+                      f"düşen {ring.dropped}")
+        return packets, info
+
+    anim = animation.FuncAnimation(fig, update, interval=1000.0 / render_fps, blit=False,
+                                   cache_frame_data=False)
+    plt.show()
+    del anim
+    ring.close()
+
+
+class LiveViewer:
+    """
+    Simülasyon tarafı: kareleri halkaya yazan SimPy process'i ve
+    görüntüleyici process'in yaşam döngüsü.
+
+    Kullanım:
+        viewer = LiveViewer(env, line, feeders, layout, interval=0.1)
+        viewer.start()      # Görüntüleyici process + yayın process'i
+        env.run(...)
+        viewer.finish()     # Son kare, pencere kapanana kadar bekler
+    """
+
+    def __init__(self, env: simpy.Environment, line, feeders: List, layout: dict,
+                 interval: float = 0.1, render_fps: float = 20.0, slots: int = 8,
+                 max_packets: int = 2048, spawn_viewer: bool = True):
+        """
+        Args:
+            env: SimPy environment
+            line: ConveyorLine
+            feeders: FeederLine listesi
+            layout: build_layout() çıktısı
+            interval: Kare yayın aralığı (simülasyon saniyesi)
+            render_fps: Görüntüleyicinin saniyedeki çizim sayısı
+            slots: Halka boyu
+            max_packets: Kare başına en fazla paket
+            spawn_viewer: False ise sadece halkaya yazılır (harici okuyucu için)
+        """
+        self.env = env
+        self.line = line
+        self.feeders = feeders
+        self.layout = layout
+        self.interval = interval
+        self.render_fps = render_fps
+        self.spawn_viewer = spawn_viewer
+        self.ring = FrameRing(slots=slots, max_packets=max_packets, max_feeders=max(1, len(feeders)))
+        self._source_index: Dict[str, int] = {f.id: i for i, f in enumerate(feeders)}
+        self._process: Optional[multiprocessing.Process] = None
+        self.published = 0
+        self.publish_seconds = 0.0
+        self.truncated_frames = 0
+
+    @staticmethod
+    def build_layout(segment_positions: list, segment_colors: List[str], feeders: List,
+                     feeder_positions: List[tuple], feeder_colors: List[str]) -> dict:
+        """
+        Görüntüleyiciye gönderilecek düz (pickle edilebilir) hat yerleşimi.
+
+        Args:
+            segment_positions: MultiSegmentSimulation.calculate_segment_positions() çıktısı
+            segment_colors: Segment başına renk
+            feeders: FeederLine listesi
+            feeder_positions: Feeder başına (x, y) koordinatı
+            feeder_colors: Feeder başına renk
+        """
+        segments = [{
+            'id': p['segment'].id,
+            'start_offset': p['segment'].start_offset,
+            'length': p['segment'].length,
+            'start_x': p['start_x'], 'start_y': p['start_y'],
+            'end_x': p['end_x'], 'end_y': p['end_y'],
+            'direction': p['direction'],
+            'color': color,
+        } for p, color in zip(segment_positions, segment_colors)]
+        xs = [s['start_x'] for s in segments] + [s['end_x'] for s in segments]
+        ys = [s['start_y'] for s in segments] + [s['end_y'] for s in segments]
+        return {
+            'segments': segments,
+            'feeders': [{'id': f.id, 'x': xy[0], 'y': xy[1], 'color': color}
+                        for f, xy, color in zip(feeders, feeder_positions, feeder_colors)],
+            'xlim': (min(xs) - 5, max(xs) + 5),
+            'ylim': (min(ys) - 5, max(ys) + 5),
+        }
+
+    def publish(self) -> int:
+        """Hattın anlık durumunu halkaya yazar"""
+        started = time.perf_counter()
+        packets = self.line.packets_in_transit
+        count = len(packets)
+        if count > self.ring.max_packets:
+            self.truncated_frames += 1
+        positions = np.fromiter((p.position for p in packets), dtype=np.float32, count=count)
+        lengths = np.fromiter((p.length for p in packets), dtype=np.float32, count=count)
+        sources = np.fromiter((self._source_index.get(p.source_feeder, UNKNOWN_SOURCE) for p in packets),
+                              dtype=np.uint8, count=count)
+        queues = np.fromiter((len(f.queue) for f in self.feeders), dtype=np.uint32, count=len(self.feeders))
+        blocked = np.fromiter((f.is_blocked for f in self.feeders), dtype=np.uint8, count=len(self.feeders))
+        n = self.ring.publish(self.env.now, self.line.total_packets_processed,
+                              positions, lengths, sources, queues, blocked)
+        self.published = n
+        self.publish_seconds += time.perf_counter() - started
+        return n
+
+    def _publish_loop(self):
+        while True:
+            self.publish()
+            yield self.env.timeout(self.interval)
+
+    def start(self):
+        """Görüntüleyici process'ini (spawn) ve yayın process'ini başlatır"""
+        if self.spawn_viewer and self._process is None:
+            # fork yerine spawn: SimPy durumu ve GUI backend'i kopyalanmaz
+            context = multiprocessing.get_context("spawn")
+            self._process = context.Process(target=run_viewer, name="live-viewer", daemon=True,
+                                            args=(self.ring.name, self.layout, self.render_fps))
+            self._process.start()
+        self.env.process(self._publish_loop())
+
+    def finish(self, wait: bool = True):
+        """
+        Son kareyi yazar ve koşunun bittiğini işaretler. wait ise görüntüleyici
+        penceresi kapanana kadar bekler; ardından halka silinir.
+        """
+        if self.ring.header is None:
+            return
+        if self.env.now > self.ring.frames['time'].max():
+            self.publish()
+        self.ring.mark_finished()
+        if self._process is not None:
+            if wait:
+                self._process.join()
+            else:
+                self._process.terminate()
+                self._process.join()
+            self._process = None
+        self.ring.close()
+
+    def get_statistics(self) -> dict:
+        return {
+            'published': self.published,
+            'publish_seconds': self.publish_seconds,
+            'truncated_frames': self.truncated_frames,
+        }
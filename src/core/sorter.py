@@ -0,0 +1,242 @@
+"""
+Sorter: Hat boyunca ayırıcı (diverter) noktaları ve sıralama hedefleri.
+
+Her ayırıcı bir veya daha fazla hedefe (dock, şut) hizmet eden bir yan
+hatta (divert lane) paket çeker. Karar, kurulumda bir kez hesaplanan
+hedef -> ayırıcı tablosuyla paket başına O(1) yapılır. Yan hat doluysa
+paket ayrılamaz (kaçırılan sıralama) ve hat sonunda devridaim hattı ile
+hat başına geri döner.
+"""
+
+import simpy
+from typing import Dict, List
+from .packet import Packet
+from .conveyor_line import ConveyorLine, EXIT_ABSORBED
+
+
+class Diverter:
+    """Hat üzerindeki tek bir ayırıcı ve onun yan hattı"""
+
+    def __init__(self, env: simpy.Environment, id: str, position: float,
+                 destinations: List[str], lane_capacity: int = 5, lane_rate: float = 0.5):
+        """
+        Args:
+            env: SimPy environment
+            id: Ayırıcı ID (örn: "DIV_1")
+            position: Hat üzerindeki global pozisyon (metre)
+            destinations: Bu ayırıcının hizmet ettiği hedefler
+            lane_capacity: Yan hatta bekleyebilecek en fazla paket
+            lane_rate: Yan hattın boşaltma hızı (paket/saniye)
+        """
+        self.env = env
+        self.id = id
+        self.position = position
+        self.destinations = list(destinations)
+        self.lane_capacity = lane_capacity
+        self.lane_rate = lane_rate
+
+        self.lane = simpy.Store(env, capacity=lane_capacity)
+        self._draining = 0             # Boşaltılmakta olan paket (Store'dan alınmış)
+
+        # Sayaçlar
+        self.total_diverted = 0
+        self.total_missed = 0          # Yan hat dolu olduğu için ayrılamayan
+        self.total_passed = 0          # Bu ayırıcıya ait olmayan, geçen paket
+
+    @property
+    def lane_occupancy(self) -> int:
+        """Yan hattaki paketler; boşaltılmakta olan paket de yer kaplar"""
+        return len(self.lane.items) + self._draining
+
+    def try_divert(self, packet: Packet) -> bool:
+        """Yan hatta yer varsa paketi ayırır"""
+        if self.lane_occupancy >= self.lane_capacity:
+            self.total_missed += 1
+            return False
+        self.lane.put(packet)
+        self.total_diverted += 1
+        return True
+
+    def drain_process(self):
+        """Yan hattı lane_rate hızıyla boşaltır (aşağı akış/operatör)"""
+        while True:
+            yield self.lane.get()
+            self._draining = 1
+            yield self.env.timeout(1.0 / self.lane_rate)
+            self._draining = 0
+
+    def get_statistics(self) -> dict:
+        return {
+            'id': self.id,
+            'position': self.position,
+            'destinations': self.destinations,
+            'diverted': self.total_diverted,
+            'missed': self.total_missed,
+            'passed': self.total_passed,
+            'lane_occupancy': self.lane_occupancy,
+        }
+
+    def __repr__(self) -> str:
+        return (f"Diverter({self.id} @ {self.position}m -> {self.destinations}, "
+                f"diverted={self.total_diverted})")
+
+
+class Sorter:
+    """
+    Bir hattın ayırıcılarını ve devridaimini yöneten sıralayıcı.
+
+    Kullanım:
+        sorter = Sorter(env, line, recirculate=True)
+        sorter.add_diverter("DIV_1", position=12.0, destinations=["DOCK_1"])
+        sorter.add_diverter("DIV_2", position=16.0, destinations=["DOCK_2"])
+        sorter.build_tables()
+        sorter.start()
+    """
+
+    def __init__(self, env: simpy.Environment, line: ConveyorLine,
+                 recirculate: bool = True, max_recirculations: int = 3,
+                 recirculation_time: float = 10.0):
+        """
+        Args:
+            env: SimPy environment
+            line: Ayırıcıların bulunduğu hat
+            recirculate: Ayrılamayan paketler hat başına geri dönsün mü
+            max_recirculations: Paket başına en fazla devridaim
+            recirculation_time: Devridaim hattındaki geçiş süresi (saniye)
+        """
+        self.env = env
+        self.line = line
+        self.recirculate = recirculate
+        self.max_recirculations = max_recirculations
+        self.recirculation_time = recirculation_time
+        self.recirculation_retry_interval = 0.5
+
+        self.diverters: List[Diverter] = []
+        # Hedef -> ayırıcı index'i (pozisyona göre sıralı ayırıcı listesinde)
+        self.destination_table: Dict[str, int] = {}
+        self._recirculations: Dict[str, int] = {}   # paket id -> devridaim sayısı
+        self._next_exit_handler = None
+
+        # Hedef bazında sayaçlar
+        self.sorted: Dict[str, int] = {}
+        self.missed: Dict[str, int] = {}              # Yan hat dolu (her deneme)
+        self.recirculated: Dict[str, int] = {}
+        self.unsorted: Dict[str, int] = {}            # Devridaim hakkı biten
+        self.in_recirculation = 0
+        self.total_unroutable = 0                     # Hiçbir ayırıcıya atanmamış hedef
+
+    def add_diverter(self, id: str, position: float, destinations: List[str],
+                     lane_capacity: int = 5, lane_rate: float = 0.5) -> Diverter:
+        """Hatta ayırıcı ekler (bkz. Diverter)"""
+        if not 0.0 <= position < self.line.total_length:
+            raise ValueError(f"Ayırıcı pozisyonu hat dışında: {id} ({position}m)")
+        diverter = Diverter(self.env, id, position, destinations, lane_capacity, lane_rate)
+        self.diverters.append(diverter)
+        return diverter
+
+    def load_config(self, entries: List[dict]):
+        """Config'deki [[diverters]] girdilerini ekler"""
+        for entry in entries:
+            self.add_diverter(
+                entry['id'], entry['position'], entry['destinations'],
+                lane_capacity=entry.get('lane_capacity', 5),
+                lane_rate=entry.get('lane_rate', 0.5)
+            )
+
+    def build_tables(self):
+        """
+        Ayırıcıları pozisyona göre sıralar, hedef -> ayırıcı tablosunu kurar
+        ve hattın ayırıcı noktalarını/çıkış işleyicisini bağlar.
+        """
+        self.diverters.sort(key=lambda d: d.position)
+        self.destination_table = {}
+        for index, diverter in enumerate(self.diverters):
+            for dest in diverter.destinations:
+                if dest in self.destination_table:
+                    raise ValueError(f"Hedef birden fazla ayırıcıya atanmış: {dest}")
+                self.destination_table[dest] = index
+                for counter in (self.sorted, self.missed, self.recirculated, self.unsorted):
+                    counter.setdefault(dest, 0)
+
+        self.line.set_divert_points([d.position for d in self.diverters], self._on_divert_point)
+        if self.line.exit_handler is not self._on_line_exit:
+            self._next_exit_handler = self.line.exit_handler
+            self.line.exit_handler = self._on_line_exit
+
+    def start(self):
+        """Yan hat boşaltma process'lerini başlatır"""
+        for diverter in self.diverters:
+            self.env.process(diverter.drain_process())
+
+    def _on_divert_point(self, packet: Packet, index: int) -> bool:
+        """Paket index'li ayırıcıyı geçerken çağrılır: O(1) tablo kararı"""
+        diverter = self.diverters[index]
+        if self.destination_table.get(packet.destination) != index:
+            diverter.total_passed += 1
+            return False
+
+        if diverter.try_divert(packet):
+            self.sorted[packet.destination] += 1
+            self._recirculations.pop(packet.id, None)
+            return True
+
+        self.missed[packet.destination] += 1
+        return False
+
+    def _on_line_exit(self, packet: Packet):
+        """
+        Hat sonuna gelen paket: devridaim veya hattan çıkış.
+        Devridaime alınan paket için EXIT_ABSORBED döner (çıkış sayılmaz).
+        """
+        dest = packet.destination
+        if dest in self.destination_table:
+            count = self._recirculations.get(packet.id, 0)
+            if self.recirculate and count < self.max_recirculations:
+                self._recirculations[packet.id] = count + 1
+                self.recirculated[dest] += 1
+                self.in_recirculation += 1
+                self.env.process(self._recirculate(packet))
+                return EXIT_ABSORBED
+            self._recirculations.pop(packet.id, None)
+            self.unsorted[dest] += 1
+        elif dest is not None:
+            self.total_unroutable += 1
+
+        if self._next_exit_handler is not None:
+            return self._next_exit_handler(packet)
+        return True
+
+    def _recirculate(self, packet: Packet):
+        """Devridaim hattından geçip hat başında yer açılınca geri girer"""
+        yield self.env.timeout(self.recirculation_time)
+        while not self.line.accept_packet(packet, 0.0):
+            yield self.env.timeout(self.recirculation_retry_interval)
+        self.in_recirculation -= 1
+
+    def get_statistics(self) -> dict:
+        """Hedef ve ayırıcı bazında sıralama istatistikleri"""
+        now = self.env.now
+        destinations = {}
+        for dest in self.destination_table:
+            attempts = self.sorted[dest] + self.missed[dest]
+            destinations[dest] = {
+                'sorted': self.sorted[dest],
+                'sort_rate': self.sorted[dest] / now if now > 0 else 0.0,
+                'missed': self.missed[dest],
+                'missed_sort_rate': self.missed[dest] / attempts if attempts else 0.0,
+                'recirculated': self.recirculated[dest],
+                'unsorted': self.unsorted[dest],
+            }
+        total_sorted = sum(self.sorted.values())
+        return {
+            'total_sorted': total_sorted,
+            'sort_rate': total_sorted / now if now > 0 else 0.0,
+            'total_recirculated': sum(self.recirculated.values()),
+            'in_recirculation': self.in_recirculation,
+            'total_unroutable': self.total_unroutable,
+            'destinations': destinations,
+            'diverters': [d.get_statistics() for d in self.diverters],
+        }
+
+    def __repr__(self) -> str:
+        return f"Sorter({self.line.id}, {len(self.diverters)} diverters)"
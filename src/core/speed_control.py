@@ -0,0 +1,125 @@
+"""
+Segment hız programı: VFD sürücülü bantların vardiya içindeki hız
+değişimleri (eco mod, aşağı akış sıkışmasında yavaşlama).
+
+Hız değişimi anlık veya rampa profiliyle yapılabilir. Rampa, hedef hıza
+birkaç kademede yaklaşır; her kademe ConveyorLine.set_segment_speed ile
+uygulanır, böylece sadece o segmentteki paketler yeniden planlanır.
+"""
+
+import simpy
+from typing import Callable, Dict, List
+from .conveyor_line import ConveyorLine
+
+
+def _linear(t: float) -> float:
+    return t
+
+
+def _s_curve(t: float) -> float:
+    """Yumuşak başlayıp yumuşak biten rampa (smoothstep)"""
+    return t * t * (3 - 2 * t)
+
+
+RAMP_PROFILES: Dict[str, Callable[[float], float]] = {
+    "linear": _linear,
+    "s_curve": _s_curve,
+}
+
+
+class SpeedChange:
+    """Programlanmış tek bir hız değişimi"""
+
+    def __init__(self, segment_id: str, at: float, speed: float,
+                 ramp: float = 0.0, profile: str = "linear",
+                 regime: str = None, ramp_steps: int = 10):
+        """
+        Args:
+            segment_id: Hızı değişecek segment
+            at: Değişimin başladığı simülasyon zamanı (saniye)
+            speed: Hedef hız (m/s)
+            ramp: Rampa süresi (saniye), 0 ise anlık değişim
+            profile: Rampa profili ("linear" veya "s_curve")
+            regime: Hedef hızdaki rejim adı (örn: "eco")
+            ramp_steps: Rampa kademe sayısı
+        """
+        if profile not in RAMP_PROFILES:
+            raise ValueError(f"Bilinmeyen rampa profili: {profile} "
+                             f"(geçerli: {', '.join(RAMP_PROFILES)})")
+        self.segment_id = segment_id
+        self.at = at
+        self.speed = speed
+        self.ramp = ramp
+        self.profile = profile
+        self.regime = regime
+        self.ramp_steps = max(1, ramp_steps)
+
+    def __repr__(self) -> str:
+        return (f"SpeedChange({self.segment_id} @ t={self.at}s -> {self.speed}m/s, "
+                f"ramp={self.ramp}s {self.profile})")
+
+
+class SpeedController:
+    """
+    Hat segmentlerinin hız programını yürütür.
+
+    Kullanım:
+        controller = SpeedController(env, line)
+        controller.schedule("SEGMENT_2", at=60.0, speed=0.5, ramp=5.0, regime="eco")
+        controller.start()
+    """
+
+    def __init__(self, env: simpy.Environment, line: ConveyorLine):
+        self.env = env
+        self.line = line
+        self.changes: List[SpeedChange] = []
+        self.total_speed_updates = 0
+
+    def schedule(self, segment_id: str, at: float, speed: float, **kwargs) -> SpeedChange:
+        """Hız değişimi programlar (bkz. SpeedChange)"""
+        self.line.get_segment(segment_id)  # Bilinmeyen segment erken hata versin
+        change = SpeedChange(segment_id, at, speed, **kwargs)
+        self.changes.append(change)
+        return change
+
+    def load_schedule(self, entries: List[dict]):
+        """Config'deki [[speed_schedule]] girdilerini programlar"""
+        for entry in entries:
+            self.schedule(
+                entry['segment'],
+                at=entry['at'],
+                speed=entry['speed'],
+                ramp=entry.get('ramp', 0.0),
+                profile=entry.get('profile', 'linear'),
+                regime=entry.get('regime'),
+                ramp_steps=entry.get('ramp_steps', 10)
+            )
+
+    def start(self):
+        """Programdaki her değişim için bir process başlatır"""
+        for change in sorted(self.changes, key=lambda c: c.at):
+            self.env.process(self._apply(change))
+
+    def _apply(self, change: SpeedChange):
+        """Değişim zamanını bekler, sonra anlık veya kademeli uygular"""
+        if change.at > self.env.now:
+            yield self.env.timeout(change.at - self.env.now)
+
+        segment = self.line.get_segment(change.segment_id)
+        if change.ramp > 0:
+            start_speed = segment.speed
+            shape = RAMP_PROFILES[change.profile]
+            step_time = change.ramp / change.ramp_steps
+            for step in range(change.ramp_steps):
+                # Her kademe, kendi aralığının ortasındaki profil değerini kullanır
+                fraction = shape((step + 0.5) / change.ramp_steps)
+                self._set(change.segment_id, start_speed + (change.speed - start_speed) * fraction, "ramp")
+                yield self.env.timeout(step_time)
+
+        self._set(change.segment_id, change.speed, change.regime)
+        print(f"⚙️  t={self.env.now:.1f}s: {change.segment_id} hızı {change.speed} m/s "
+              f"({segment.regime})")
+
+    def _set(self, segment_id: str, speed: float, regime: str):
+        self.line.set_segment_speed(segment_id, speed, regime)
+        self.total_speed_updates += 1
@@ -0,0 +1,301 @@
+"""
+Olay izi: Her paket yaşam döngüsü olayını (üretim, kuyruğa giriş, ana hatta
+aktarım, segment geçişi, çıkış, ayrılma, atılma) ve feeder blokaj
+başlangıç/bitişlerini sabit genişlikli ikili kayıtlar olarak bellek
+eşlemeli (memory-mapped) bir dosyaya yazar.
+
+Snapshot'lar durumu yalnızca snapshot_interval aralıkla örnekler; iki örnek
+arasındaki kısa blokajlar görünmez. İz her olayı tam zamanıyla tutar.
+
+Yazma tarafı kayıtları küçük bir tampon listesinde biriktirir ve tampon
+dolunca dosyanın bir sonraki parçasını (chunk) eşleyip tek NumPy atamasıyla
+yazar. Analiz tarafı dosyayı np.memmap ile açar ve parça parça vektörel
+işler: bellek kullanımı olay sayısıyla değil paket/segment sayısıyla orantılıdır.
+"""
+
+import json
+import struct
+import numpy as np
+from pathlib import Path
+from typing import Dict, List
+from .packet import Packet
+from .probes import (ProbeBus, CREATED, QUEUED, MERGED, SEGMENT, EXIT, DIVERTED, DROPPED,
+                     BLOCKED, UNBLOCKED, RECIRCULATED, EVENT_NAMES as PROBE_EVENT_NAMES)
+
+
+# Olay türleri gözlemci veri yolundan gelir (aynı numaralar kayda yazılır)
+TRACE_EVENTS = (CREATED, QUEUED, MERGED, SEGMENT, EXIT, DIVERTED, DROPPED, BLOCKED, UNBLOCKED,
+                RECIRCULATED)
+EVENT_NAMES = tuple(PROBE_EVENT_NAMES[kind] for kind in TRACE_EVENTS)
+
+RECORD_DTYPE = np.dtype([
+    ('t', '<f8'),
+    ('packet', '<u4'),
+    ('pos', '<f4'),
+    ('where', '<u2'),
+    ('kind', 'u1'),
+])
+
+MAGIC = b"CVTRACE1"
+HEADER = struct.Struct("<8sQI")         # magic, kayıt sayısı, kayıt boyu
+HEADER_SIZE = 64
+
+
+class EventTracer:
+    """
+    Paket olaylarını parça parça bellek eşlemeli ikili dosyaya yazar.
+
+    Kullanım:
+        tracer = EventTracer(env, "output/trace/events.bin")
+        tracer.attach(probes)           # ProbeBus (hat/feeder'lara bağlı)
+        env.run(until=duration)
+        tracer.close()
+        results = analyze_trace("output/trace/events.bin")
+    """
+
+    def __init__(self, env, path, chunk_records: int = 65536):
+        """
+        Args:
+            env: SimPy environment
+            path: İz dosyası (yanına aynı adla .json meta dosyası yazılır)
+            chunk_records: Parça başına kayıt (tampon ve eşleme boyu)
+        """
+        self.env = env
+        self.path = Path(path)
+        self.chunk_records = chunk_records
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._file = open(self.path, "w+b")
+        self._file.write(HEADER.pack(MAGIC, 0, RECORD_DTYPE.itemsize).ljust(HEADER_SIZE, b"\0"))
+        self._file.flush()
+
+        self._pending: List[tuple] = []
+        self.records_written = 0
+        self._packet_ids: Dict[str, int] = {}
+        self.packet_names: List[str] = []
+        self.packet_lengths: List[float] = []
+        self.feeders: List[str] = []
+        self.segments: List[str] = []
+        self.diverters: List[str] = []
+        self.layout: dict = {}          # Replay için hat geometrisi
+        self.closed = False
+
+    def attach(self, probes: ProbeBus):
+        """
+        İzleyiciyi veri yoluna abone eder; hat geometrisi ve feeder/ayırıcı
+        adları bağlı hat nesnelerinden okunur.
+        """
+        line = probes.line
+        self.segments = [s.id for s in line.segments]
+        self.layout = {
+            'total_length': line.total_length,
+            'min_gap': line.min_gap,
+            'segments': [
+                {'id': s.id, 'start': s.start_offset, 'end': s.end_offset,
+                 'speed': s.speed, 'kind': s.kind}
+                for s in line.segments
+            ],
+        }
+        self.feeders = [f.id for f in probes.feeders]
+        if probes.sorter is not None:
+            self.diverters = [d.id for d in probes.sorter.diverters]
+        self.subscription = probes.subscribe(TRACE_EVENTS, self.record)
+
+    def record(self, kind: int, packet: Packet, where: int):
+        """Tek olay kaydı (sıcak yol: sözlük araması + liste ekleme)"""
+        handle = self._packet_ids.get(packet.id)
+        if handle is None:
+            handle = len(self.packet_names)
+            self._packet_ids[packet.id] = handle
+            self.packet_names.append(packet.id)
+            self.packet_lengths.append(packet.length)
+        self._pending.append((self.env.now, handle, packet.position, where, kind))
+        if len(self._pending) >= self.chunk_records:
+            self._flush()
+
+    def _flush(self):
+        """Tampondaki kayıtları dosyanın sıradaki parçasına eşleyip yazar"""
+        count = len(self._pending)
+        if count == 0:
+            return
+        offset = HEADER_SIZE + self.records_written * RECORD_DTYPE.itemsize
+        self._file.truncate(offset + count * RECORD_DTYPE.itemsize)
+        window = np.memmap(self._file, dtype=RECORD_DTYPE, mode="r+", offset=offset, shape=(count,))
+        window[:] = np.array(self._pending, dtype=RECORD_DTYPE)
+        window.flush()
+        del window
+        self.records_written += count
+        self._pending = []
+
+    def close(self):
+        """Kalan kayıtları yazar, başlığı ve meta dosyasını günceller"""
+        if self.closed:
+            return
+        self._flush()
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, self.records_written, RECORD_DTYPE.itemsize))
+        self._file.close()
+        meta = {
+            'records': self.records_written,
+            'end_time': self.env.now,
+            'layout': self.layout,
+            'events': list(EVENT_NAMES),
+            'feeders': self.feeders,
+            'segments': self.segments,
+            'diverters': self.diverters,
+            'packets': self.packet_names,
+            'lengths': self.packet_lengths,
+        }
+        with open(self.path.with_suffix(".json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        self.closed = True
+
+    def __repr__(self) -> str:
+        return f"EventTracer({self.path}, records={self.records_written + len(self._pending)})"
+
+
+class TraceReader:
+    """İz dosyasını belleğe yüklemeden np.memmap ile açar"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            magic, count, itemsize = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Geçersiz iz dosyası: {self.path}")
+        if itemsize != RECORD_DTYPE.itemsize:
+            raise ValueError(f"Kayıt boyu uyumsuz: {itemsize} (beklenen {RECORD_DTYPE.itemsize})")
+        self.count = count
+        with open(self.path.with_suffix(".json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.records = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r",
+                                 offset=HEADER_SIZE, shape=(count,)) if count else \
+            np.zeros(0, dtype=RECORD_DTYPE)
+
+    def chunks(self, chunk_records: int = 1 << 20):
+        """Kayıtları zaman sırasıyla parça parça (memmap görünümleri) döndürür"""
+        for start in range(0, self.count, chunk_records):
+            yield self.records[start:start + chunk_records]
+
+    def __repr__(self) -> str:
+        return f"TraceReader({self.path}, records={self.count})"
+
+
+def _summary(values: np.ndarray) -> dict:
+    if values.size == 0:
+        return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+    return {
+        'count': int(values.size),
+        'mean': float(values.mean()),
+        'p50': float(np.percentile(values, 50)),
+        'p95': float(np.percentile(values, 95)),
+        'max': float(values.max()),
+    }
+
+
+def analyze_trace(path, chunk_records: int = 1 << 20) -> dict:
+    """
+    İz dosyasından paket gecikmesi, segment kalış süreleri ve merge
+    beklemelerini parça parça, vektörel hesaplar.
+
+    Paket başına durum (üretim/kuyruk zamanı, son segment girişi) parçalar
+    arasında taşınır; bellek paket ve segment sayısıyla orantılıdır.
+
+    Args:
+        path: EventTracer'ın yazdığı iz dosyası
+        chunk_records: Bir seferde işlenecek kayıt sayısı
+
+    Returns:
+        {'records', 'latency', 'segments': {id: ...}, 'merge_wait': {feeder: ...}, 'dropped': {feeder: n}}
+    """
+    reader = TraceReader(path)
+    meta = reader.meta
+    n_packets = len(meta['packets'])
+    n_segments = len(meta['segments'])
+    n_feeders = len(meta['feeders'])
+
+    created_t = np.full(n_packets, np.nan)
+    queued_t = np.full(n_packets, np.nan)
+    exit_t = np.full(n_packets, -np.inf)
+    last_t = np.zeros(n_packets)
+    last_seg = np.full(n_packets, -1, dtype=np.int64)      # -1: hatta değil
+
+    dwell_sum = np.zeros(n_segments)
+    dwell_count = np.zeros(n_segments, dtype=np.int64)
+    dwell_max = np.zeros(n_segments)
+    merge_waits: List[np.ndarray] = []
+    merge_feeders: List[np.ndarray] = []
+    dropped = np.zeros(n_feeders, dtype=np.int64)
+
+    for chunk in reader.chunks(chunk_records):
+        t = np.asarray(chunk['t'])
+        packet = np.asarray(chunk['packet']).astype(np.int64)
+        kind = np.asarray(chunk['kind'])
+        where = np.asarray(chunk['where']).astype(np.int64)
+
+        # Üretim / kuyruk / aktarım (merge bekleme = kuyruğa giriş -> ana hatta aktarım)
+        mask = kind == CREATED
+        created_t[packet[mask]] = t[mask]
+        mask = kind == QUEUED
+        queued_t[packet[mask]] = t[mask]
+        mask = kind == MERGED
+        merge_waits.append(t[mask] - queued_t[packet[mask]])
+        merge_feeders.append(where[mask])
+        mask = kind == DROPPED
+        dropped += np.bincount(where[mask], minlength=n_feeders)[:n_feeders]
+
+        # Çıkış zamanı (devridaim çıkış değildir)
+        mask = (kind == EXIT) | (kind == DIVERTED)
+        np.maximum.at(exit_t, packet[mask], t[mask])
+
+        # Segment kalış süreleri: segment girişi önceki segmenti kapatır, çıkış
+        # ve devridaim sonuncuyu
+        mask = (kind == SEGMENT) | (kind == EXIT) | (kind == DIVERTED) | (kind == RECIRCULATED)
+        if not mask.any():
+            continue
+        p, tt = packet[mask], t[mask]
+        seg = np.where(kind[mask] == SEGMENT, where[mask], -1)
+        order = np.argsort(p, kind="stable")
+        p, tt, seg = p[order], tt[order], seg[order]
+
+        same = np.zeros(p.size, dtype=bool)
+        same[1:] = p[1:] == p[:-1]
+        prev_t = np.where(same, np.roll(tt, 1), last_t[p])
+        prev_seg = np.where(same, np.roll(seg, 1), last_seg[p])
+        valid = prev_seg >= 0
+        dwell = tt[valid] - prev_t[valid]
+        closed = prev_seg[valid]
+        dwell_sum += np.bincount(closed, weights=dwell, minlength=n_segments)[:n_segments]
+        dwell_count += np.bincount(closed, minlength=n_segments)[:n_segments]
+        np.maximum.at(dwell_max, closed, dwell)
+
+        last = np.ones(p.size, dtype=bool)
+        last[:-1] = p[:-1] != p[1:]
+        last_t[p[last]] = tt[last]
+        last_seg[p[last]] = seg[last]
+
+    done = np.isfinite(exit_t) & ~np.isnan(created_t)
+    latency = exit_t[done] - created_t[done]
+
+    waits = np.concatenate(merge_waits) if merge_waits else np.zeros(0)
+    wait_feeders = np.concatenate(merge_feeders) if merge_feeders else np.zeros(0, dtype=np.int64)
+    waits_valid = ~np.isnan(waits)
+
+    return {
+        'records': reader.count,
+        'packets': n_packets,
+        'latency': _summary(latency),
+        'segments': {
+            seg_id: {
+                'count': int(dwell_count[i]),
+                'mean_dwell': float(dwell_sum[i] / dwell_count[i]) if dwell_count[i] else 0.0,
+                'max_dwell': float(dwell_max[i]),
+            }
+            for i, seg_id in enumerate(meta['segments'])
+        },
+        'merge_wait': {
+            feeder_id: _summary(waits[waits_valid & (wait_feeders == i)])
+            for i, feeder_id in enumerate(meta['feeders'])
+        },
+        'dropped': {feeder_id: int(dropped[i]) for i, feeder_id in enumerate(meta['feeders'])},
+    }
@@ -4,11 +4,17 @@ Farklı hızlara sahip segment'lerden oluşan konveyör hattı simülasyonu
 """
 
 import simpy
+import simpy.rt
+import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import matplotlib.animation as animation
-from typing import List
+import matplotlib.colors as mcolors
+from typing import Dict, List
+import os
 import sys
+import time
+from contextlib import redirect_stdout
 from pathlib import Path
 import tomllib
 
@@ -16,6 +22,30 @@ import tomllib
 sys.path.append(str(Path(__file__).parent))
 from core.conveyor_line import ConveyorLine
 from core.feeder import FeederLine
+from core.packet import resolve_packet_mix, PacketTracePolicy
+from core.speed_control import SpeedController
+from core.faults import FaultInjector
+from core.sorter import Sorter
+from core.parallel import ParallelLineEngine
+from core.batch import BatchedLineEngine, SNAPSHOT_KPIS, unsupported_reason
+from core.memory_report import MemoryReporter, SUBSYSTEMS
+from core.metrics import MetricsRegistry, MetricsServer, register_line_metrics
+from core.live_stream import LiveStream
+from core.shm_viewer import LiveViewer
+from core.probes import ProbeBus, FeederHistoryProbe, CREATED
+from core.latency import LatencyProbe
+from core.interference import BlockAttribution
+from core.trace import EventTracer, analyze_trace
+from core.replay import RunReplay
+from core.rollup import RollupRecorder, DEFAULT_RESOLUTIONS
+from core.raster import flatten_snapshots, time_edges_for, coverage_raster, compose_layers
+from core.merge_policy import MergeArbiter, create_merge_policy
+from core.merge_forecast import MergeSlotPlanner
+from core.run_store import RunStore
+
+# Simülasyon motoru sürümü - sonuçları değiştiren her motor değişikliğinde artırılır.
+# RunStore önbelleği bu sürümle anahtarlanır.
+ENGINE_VERSION = "3.5.1"
 
 
 def load_config(config_path: Path = None) -> dict:
@@ -30,12 +60,43 @@ def load_config(config_path: Path = None) -> dict:
 class MultiSegmentSimulation:
     """Multi-segment konveyör hattı simülasyonu"""
 
-    def __init__(self, config: dict = None):
+    def __init__(self, config: dict = None, observe: bool = True):
+        """
+        Args:
+            config: Simülasyon config'i (None ise config/simulation.toml)
+            observe: False ise snapshot ve rollup toplayıcıları bağlanmaz
+                     (sadece KPI gereken koşular; sonuçlar aynıdır)
+        """
         self.config = config if config is not None else load_config()
-        self.env = simpy.Environment()
+        self.observe = observe
+
+        # Gerçek zamanlı mod: simülasyon duvar saatine göre (speed kat hızlı) ilerler
+        self.realtime_cfg = self.config.get('realtime', {})
+        if self.realtime_cfg.get('enabled', False):
+            self.env = simpy.rt.RealtimeEnvironment(
+                factor=1.0 / self.realtime_cfg.get('speed', 1.0), strict=False)
+        else:
+            self.env = simpy.Environment()
         self.conveyor_line: ConveyorLine = None
+        self.probes = ProbeBus(self.env)
         self.feeders: List[FeederLine] = []
+        self.merge_arbiter: MergeArbiter = None
+        self.slot_planner: MergeSlotPlanner = None
+        self.speed_controller: SpeedController = None
+        self.fault_injector: FaultInjector = None
+        self.sorter: Sorter = None
+        self.memory_reporter: MemoryReporter = None
+        self.metrics_registry: MetricsRegistry = None
+        self.metrics_server: MetricsServer = None
+        self.live_stream: LiveStream = None
+        self.live_viewer: LiveViewer = None
+        self.tracer: EventTracer = None
+        self.latency: LatencyProbe = None
+        self.block_attribution: BlockAttribution = None
+        self.replay: RunReplay = None
+        self.rollups: RollupRecorder = None
         self.snapshots = []
+        self.seed = self.config.get('simulation', {}).get('seed', 0)
 
         # Visualization config
         vis_cfg = self.config.get('visualization', {})
@@ -53,16 +114,20 @@ class MultiSegmentSimulation:
 
         self.output_dir = Path(__file__).parent.parent / vis_cfg.get('output_dir', 'output/plots')
         self.dpi = vis_cfg.get('dpi', 150)
+        # Rasterleştirilmiş grafiklerin çözünürlüğü (piksel = bin)
+        self.raster_time_bins = vis_cfg.get('raster_time_bins', 800)
+        self.raster_position_bins = vis_cfg.get('raster_position_bins', 400)
 
         # Dark tema
         theme = vis_cfg.get('theme', 'dark')
         if theme == 'dark':
             plt.style.use('dark_background')
 
-    def setup(self):
-        """Simülasyonu hazırla"""
-        print("🏗️  Multi-Segment Sistem kuruluyor...")
-
+    def build_layout(self):
+        """
+        Hattı, segment'leri ve feeder'ları config'den kurar. Gözlemci,
+        dışa aktarıcı veya process açmaz; replay yalnızca bunu kullanır.
+        """
         # Config'den paket ayarları
         pkt_cfg = self.config.get('packet', {})
         min_gap = pkt_cfg.get('min_gap', 0.5)
@@ -85,7 +150,9 @@ class MultiSegmentSimulation:
                 length=seg_cfg['length'],
                 speed=seg_cfg['speed'],
                 description=seg_cfg.get('description', ''),
-                direction=seg_cfg.get('direction', 'horizontal')
+                direction=seg_cfg.get('direction', 'horizontal'),
+                segment_type=seg_cfg.get('type', 'continuous'),
+                zone_length=seg_cfg.get('zone_length')
             )
             dir_symbol = "↔" if segment.direction == "horizontal" else "↕"
             print(f"   {segment.id} {dir_symbol}:")
@@ -96,7 +163,8 @@ class MultiSegmentSimulation:
             print(f"      Açıklama: {segment.description}")
 
         print(f"\n📏 Toplam Hat Uzunluğu: {self.conveyor_line.total_length}m")
-        print(f"📦 Toplam Kapasite: {self.conveyor_line.capacity} paket")
+        print(f"📦 Nominal Kapasite: {self.conveyor_line.capacity} paket "
+              f"({default_packet_length}m paket + {min_gap}m boşluk)")
 
         # Feeder'ları oluştur
         print(f"\n✅ Feeder Lines:")
@@ -112,7 +180,11 @@ class MultiSegmentSimulation:
                 target_conveyor=self.conveyor_line,
                 production_rate=feeder_cfg['production_rate'],
                 entry_position=entry_position,
-                max_queue_size=feeder_cfg.get('max_queue_size', 100)
+                max_queue_size=feeder_cfg.get('max_queue_size', 100),
+                priority_weight=feeder_cfg.get('priority_weight', 1.0),
+                destinations=feeder_cfg.get('destinations'),
+                packet_mix=resolve_packet_mix(pkt_cfg.get('types', {}), feeder_cfg.get('packet_mix')),
+                seed=self.seed
             )
             self.feeders.append(feeder)
 
@@ -121,47 +193,310 @@ class MultiSegmentSimulation:
             print(f"      Üretim hızı: {feeder.production_rate:.3f} paket/s ({1.0/feeder.production_rate:.1f}s aralıkla)")
             print(f"      Bağlantı: Segment {segment_idx} ({segment.id if segment else 'N/A'})")
             print(f"      Global Pozisyon: {entry_position}m")
+            if feeder.packet_mix:
+                print(f"      Paket karışımı: {', '.join(t['name'] for t in feeder.packet_mix)}")
 
-    def snapshot_collector(self):
-        """Belirli aralıklarla sistem durumunu kaydet"""
-        interval = self.config['simulation']['snapshot_interval']
-        while True:
-            snapshot = {
-                'time': self.env.now,
-                'conveyor_line': {
-                    'packets': [
-                        {
-                            'id': p.id,
-                            'position': p.position,
-                            'source': p.source_feeder
-                        }
-                        for p in self.conveyor_line.packets_in_transit
-                    ],
-                    'utilization': self.conveyor_line.get_utilization(),
-                    'total_processed': self.conveyor_line.total_packets_processed,
-                    'segments': [
-                        {
-                            'id': s.id,
-                            'packets': len(s.packets),
-                            'utilization': s.get_utilization()
-                        }
-                        for s in self.conveyor_line.segments
-                    ]
-                },
-                'feeders': []
-            }
+    def setup(self):
+        """Simülasyonu hazırla"""
+        print("🏗️  Multi-Segment Sistem kuruluyor...")
+        self.build_layout()
 
+        # Paket geçmişi örneklemesi: seçilmeyen paketler sadece skaler toplam tutar
+        trace_policy = PacketTracePolicy.from_config(self.config.get('packet_trace'), seed=self.seed)
+        if trace_policy is not None:
+            for feeder in self.feeders:
+                feeder.trace_policy = trace_policy
+            print(f"\n🔎 Paket geçmişi örneklemesi: {trace_policy}")
+
+        # Merge arbitrajı ("none" ise her feeder kendi başına aktarım dener)
+        merge_cfg = self.config.get('merge', {})
+        policy_name = merge_cfg.get('policy', 'none')
+        merge_mode = merge_cfg.get('mode', 'poll')
+        if merge_mode not in ('poll', 'predictive'):
+            raise ValueError(f"Bilinmeyen merge modu: {merge_mode} (geçerli: poll, predictive)")
+        if merge_mode == 'predictive':
+            # Öngörülü merge: boşluklar analitik tahmin edilip rezerve edilir;
+            # çekişmeli boşluk ilk rezerve edene kalır (arbitraj politikası yerine)
+            self.slot_planner = MergeSlotPlanner(self.env, self.conveyor_line)
             for feeder in self.feeders:
-                snapshot['feeders'].append({
-                    'id': feeder.id,
-                    'queue_length': len(feeder.queue),
-                    'is_blocked': feeder.is_blocked,
-                    'total_produced': feeder.total_produced,
-                    'total_transferred': feeder.total_transferred
-                })
+                self.slot_planner.register(feeder)
+            print(f"\n🔮 Öngörülü merge: boşluk tahmini + slot rezervasyonu"
+                  f"{f' ({policy_name} politikası yerine)' if policy_name != 'none' else ''}")
+        elif policy_name != 'none':
+            self.merge_arbiter = MergeArbiter(self.env, create_merge_policy(policy_name))
+            for feeder in self.feeders:
+                self.merge_arbiter.register(feeder)
+            print(f"\n🔀 Merge politikası: {policy_name}")
+
+        # Segment hız programı (eco mod, yavaşlama rampaları)
+        schedule_cfg = self.config.get('speed_schedule', [])
+        if schedule_cfg:
+            self.speed_controller = SpeedController(self.env, self.conveyor_line)
+            self.speed_controller.load_schedule(schedule_cfg)
+            print(f"\n⚙️  Hız programı: {len(self.speed_controller.changes)} değişim")
+
+        # Ayırıcılar ve sıralama hedefleri
+        diverters_cfg = self.config.get('diverters', [])
+        if diverters_cfg:
+            sorter_cfg = self.config.get('sorter', {})
+            self.sorter = Sorter(
+                self.env, self.conveyor_line,
+                recirculate=sorter_cfg.get('recirculate', True),
+                max_recirculations=sorter_cfg.get('max_recirculations', 3),
+                recirculation_time=sorter_cfg.get('recirculation_time', 10.0)
+            )
+            self.sorter.load_config(diverters_cfg)
+            self.sorter.build_tables()
+            print(f"\n🔀 Ayırıcılar:")
+            for diverter in self.sorter.diverters:
+                print(f"   {diverter.id} @ {diverter.position}m -> {', '.join(diverter.destinations)} "
+                      f"(yan hat: {diverter.lane_capacity} paket, {diverter.lane_rate} paket/s)")
+
+        # Arıza enjeksiyonu (deterministik duruşlar veya MTBF/MTTR)
+        faults_cfg = self.config.get('faults', [])
+        if faults_cfg:
+            self.fault_injector = FaultInjector(self.env, self.conveyor_line, self.feeders, seed=self.seed)
+            self.fault_injector.load_config(faults_cfg)
+            print(f"\n⛔ Arıza programı: {len(faults_cfg)} tanım")
+
+        # Gözlemci veri yolu: izleyiciler/toplayıcılar olay türlerine abone olur,
+        # abonesi olmayan olay türü çekirdekte maliyetsizdir
+        self.probes.attach(self.conveyor_line, self.feeders, self.sorter)
+        probes_cfg = self.config.get('probes', {})
+        if probes_cfg.get('feeder_history', False):
+            FeederHistoryProbe(self.probes, every=probes_cfg.get('history_every', 1))
+
+        # Gecikme dağılımları (opsiyonel): sabit bellekli log-kovalı histogramlar
+        latency_cfg = self.config.get('latency', {})
+        if latency_cfg.get('enabled', False):
+            self.latency = LatencyProbe(
+                self.probes,
+                resolution=latency_cfg.get('resolution', 0.001),
+                max_value=latency_cfg.get('max_value', 86400.0),
+                significant_digits=latency_cfg.get('significant_digits', 2)
+            )
+
+        # Bloke kök neden ataması (opsiyonel): feeder-feeder girişim matrisi
+        interference_cfg = self.config.get('interference', {})
+        if interference_cfg.get('enabled', False):
+            self.block_attribution = BlockAttribution(
+                self.probes, keep_episodes=interference_cfg.get('keep_episodes', True))
+
+        # Bellek raporu (opsiyonel): alt sistem bazında canlı bayt/nesne sayısı
+        memory_cfg = self.config.get('memory', {})
+        if memory_cfg.get('enabled', False):
+            self.memory_reporter = MemoryReporter(
+                self.env,
+                interval=memory_cfg.get('interval', 10.0),
+                use_tracemalloc=memory_cfg.get('tracemalloc', False)
+            )
+            self.memory_reporter.track_packets(lambda: self.conveyor_line.packets_in_transit)
+            for feeder in self.feeders:
+                self.memory_reporter.track_packets(lambda f=feeder: f.queue)
+                self.memory_reporter.track_history('queue_length_history', feeder.queue_length_history)
+                self.memory_reporter.track_history('block_events', feeder.block_events)
+            if self.sorter is not None:
+                for diverter in self.sorter.diverters:
+                    self.memory_reporter.track_packets(lambda d=diverter: d.lane.items)
+            self.memory_reporter.track_history('snapshots', self.snapshots)
+            print(f"\n🧠 Bellek raporu: {self.memory_reporter.interval}s aralıkla"
+                  f"{' (tracemalloc)' if self.memory_reporter.use_tracemalloc else ''}")
+
+        # OpenMetrics dışa aktarımı (opsiyonel): değerler scrape anında okunur
+        metrics_cfg = self.config.get('metrics', {})
+        if metrics_cfg.get('enabled', False):
+            self.metrics_registry = register_line_metrics(
+                MetricsRegistry(), self.env, self.conveyor_line, self.feeders)
+            self.metrics_server = MetricsServer(
+                self.metrics_registry,
+                host=metrics_cfg.get('host', '127.0.0.1'),
+                port=metrics_cfg.get('port', 9108)
+            )
+
+        # Çok çözünürlüklü zaman serisi özetleri: uzun koşu grafikleri bunlardan çizilir
+        rollup_cfg = self.config.get('rollup', {})
+        if self.observe and rollup_cfg.get('enabled', True):
+            self.rollups = RollupRecorder(
+                self.env, self.conveyor_line, self.feeders,
+                interval=rollup_cfg.get('interval', 1.0),
+                resolutions=rollup_cfg.get('resolutions', DEFAULT_RESOLUTIONS)
+            )
+
+        # Ayrı process'te canlı görüntüleyici (opsiyonel): kareler paylaşımlı
+        # bellekteki halka tampona yazılır, çizim simülasyonu bekletmez
+        viewer_cfg = self.config.get('viewer', {})
+        if viewer_cfg.get('enabled', False):
+            segment_positions = self.calculate_segment_positions()
+            layout = LiveViewer.build_layout(
+                segment_positions,
+                [self.get_segment_color(p['segment'].speed) for p in segment_positions],
+                self.feeders,
+                [self.get_packet_2d_position(f.entry_position, segment_positions)[:2] for f in self.feeders],
+                [self.FEEDER_COLORS.get(f.id, '#FFFFFF') for f in self.feeders]
+            )
+            self.live_viewer = LiveViewer(
+                self.env, self.conveyor_line, self.feeders, layout,
+                interval=viewer_cfg.get('interval', 0.1),
+                render_fps=viewer_cfg.get('render_fps', 20.0),
+                slots=viewer_cfg.get('slots', 8),
+                max_packets=viewer_cfg.get('max_packets', 2048)
+            )
+
+        # Olay izi (opsiyonel): her paket olayı ikili, bellek eşlemeli dosyaya
+        trace_cfg = self.config.get('trace', {})
+        if trace_cfg.get('enabled', False):
+            self.tracer = EventTracer(
+                self.env,
+                Path(__file__).parent.parent / trace_cfg.get('path', 'output/trace/events.bin'),
+                chunk_records=trace_cfg.get('chunk_records', 65536)
+            )
+            self.tracer.attach(self.probes)
+            print(f"\n📼 Olay izi: {self.tracer.path}")
+
+        # Canlı yayın (gerçek zamanlı mod): tarayıcıya delta kareleri
+        if self.realtime_cfg.get('enabled', False):
+            self.live_stream = LiveStream(
+                self.env, self.conveyor_line, self.feeders,
+                fps=self.realtime_cfg.get('fps', 10.0),
+                speed=self.realtime_cfg.get('speed', 1.0),
+                host=self.realtime_cfg.get('host', '127.0.0.1'),
+                port=self.realtime_cfg.get('port', 8765)
+            )
+
+    def capture_snapshot(self) -> dict:
+        """Şu anki sistem durumunu snapshot sözlüğü olarak döndürür"""
+        snapshot = {
+            'time': self.env.now,
+            'conveyor_line': {
+                'packets': [
+                    {
+                        'id': p.id,
+                        'position': p.position,
+                        'length': p.length,
+                        'source': p.source_feeder
+                    }
+                    for p in self.conveyor_line.packets_in_transit
+                ],
+                'utilization': self.conveyor_line.get_utilization(),
+                'occupied_length': self.conveyor_line.occupied_length,
+                'total_processed': self.conveyor_line.total_packets_processed,
+                'segments': [
+                    {
+                        'id': s.id,
+                        'packets': len(s.packets),
+                        'occupied_length': s.occupied_length,
+                        'utilization': s.get_utilization()
+                    }
+                    for s in self.conveyor_line.segments
+                ]
+            },
+            'feeders': []
+        }
+
+        for feeder in self.feeders:
+            snapshot['feeders'].append({
+                'id': feeder.id,
+                'queue_length': len(feeder.queue),
+                'is_blocked': feeder.is_blocked,
+                'total_produced': feeder.total_produced,
+                'total_transferred': feeder.total_transferred,
+                'blocked_time': feeder.get_current_blocked_time()
+            })
+        return snapshot
+
+    def take_snapshot(self, now: float):
+        """Periyodik snapshot probe'u: sistem durumunu kaydet"""
+        self.snapshots.append(self.capture_snapshot())
+
+    def get_snapshot_interval(self) -> float:
+        """Snapshot'lar arası gerçek aralık (replay kare aralığı config'den farklı olabilir)"""
+        if len(self.snapshots) >= 2:
+            return self.snapshots[1]['time'] - self.snapshots[0]['time']
+        return self.config['simulation']['snapshot_interval']
+
+    def get_rollups(self) -> RollupRecorder:
+        """Koşu sırasında tutulan rollup'lar; yoksa (replay) snapshot'lardan kurulur"""
+        if self.rollups is None:
+            self.rollups = RollupRecorder.from_snapshots(
+                self.snapshots, self.config.get('rollup', {}).get('resolutions', DEFAULT_RESOLUTIONS))
+        return self.rollups
+
+    def _plot_rollup(self, ax, name: str, color: str, label: str = None,
+                     scale: float = 1.0, fill: bool = False, linewidth: float = 2):
+        """
+        Rollup serisini eksen genişliğine (piksel) sığan çözünürlükte çizer.
+        Kovalar birden fazla örnek içeriyorsa min-max aralığı bant olarak gösterilir.
+        """
+        fig = ax.get_figure()
+        max_points = int(ax.get_window_extent().width * self.dpi / fig.dpi)
+        rollups = self.get_rollups()
+        if name not in rollups.series:
+            return None
+        data = rollups.select(name, max_points)
+        times = data['time']
+        mean = data['mean'] * scale
+
+        if data['resolution'] > rollups.interval:
+            ax.fill_between(times, data['min'] * scale, data['max'] * scale,
+                            alpha=0.2, color=color, linewidth=0)
+        elif fill:
+            ax.fill_between(times, mean, alpha=0.3, color=color)
+        ax.plot(times, mean, color=color, linewidth=linewidth, label=label)
+        return data
+
+    def final_snapshot(self) -> dict:
+        """Koşu sonu durumu: replay yüklüyse izin sonundan, değilse canlı nesnelerden"""
+        if self.replay is not None:
+            return self.replay.snapshot_at(self.replay.end_time)
+        return self.capture_snapshot()
+
+    def verify_replay(self, path=None) -> Dict[str, List[float]]:
+        """
+        Koşunun olay izini replay ile oynatır ve canlı snapshot'larla
+        karşılaştırır (iz kaydı açık koşudan sonra).
 
-            self.snapshots.append(snapshot)
-            yield self.env.timeout(interval)
+        Args:
+            path: İz dosyası; None ise bu koşunun izi
+
+        Returns:
+            {alan: farkın görüldüğü zamanlar}; boşsa replay birebir aynı
+        """
+        if path is None:
+            if self.tracer is None or not self.tracer.closed:
+                raise ValueError("Replay doğrulaması için kapanmış olay izi gerekli ([trace] enabled)")
+            path = self.tracer.path
+        differences = RunReplay(path).mismatches(self.snapshots)
+        if differences:
+            print(f"⚠️  Replay canlı snapshot'lardan farklı: " + ", ".join(
+                f"{field} (t={times[0]:g}s, {len(times)} kare)" for field, times in differences.items()))
+        else:
+            print(f"✅ Replay canlı snapshot'larla aynı ({len(self.snapshots)} kare)")
+        return differences
+
+    def load_replay(self, path, frame_interval: float = None) -> RunReplay:
+        """
+        Kaydedilmiş bir koşunun olay izini yükler ve görselleştirme
+        snapshot'larını istenen kare aralığında izden üretir (simülasyon koşmaz).
+        Hat ve feeder yerleşimi config'den kurulur (build_layout); iz yazıcısı,
+        metrik sunucusu gibi gözlemciler açılmaz, config'de açık olsalar da.
+
+        Args:
+            path: EventTracer'ın yazdığı iz dosyası
+            frame_interval: Kare aralığı (saniye); None ise snapshot_interval
+        """
+        if self.tracer is not None and not self.tracer.closed and \
+                Path(self.tracer.path).resolve() == Path(path).resolve():
+            raise ValueError(f"Replay edilen iz bu koşunun açık iz dosyası: {path}")
+        if self.conveyor_line is None:
+            self.build_layout()
+        self.replay = RunReplay(path)
+        if frame_interval is None:
+            frame_interval = self.config['simulation']['snapshot_interval']
+        self.snapshots = self.replay.snapshots(frame_interval)
+        self.rollups = None     # Replay karelerinden yeniden kurulur
+        print(f"\n🎞️  Replay: {self.replay.path} → {len(self.snapshots)} kare "
+              f"({frame_interval}s aralık, {self.replay.end_time}s)")
+        return self.replay
 
     def run(self, duration: float = None):
         """Simülasyonu çalıştır"""
@@ -172,18 +507,199 @@ class MultiSegmentSimulation:
         print("=" * 70)
 
         # Process'leri başlat
-        self.env.process(self.snapshot_collector())
+        if self.observe:
+            self.probes.periodic(self.config['simulation']['snapshot_interval'], self.take_snapshot)
+        if self.rollups is not None:
+            self.rollups.start()
 
         for feeder in self.feeders:
             self.env.process(feeder.start_production())
             self.env.process(feeder.transfer_process())
 
+        if self.speed_controller is not None:
+            self.speed_controller.start()
+
+        if self.fault_injector is not None:
+            self.fault_injector.start()
+
+        if self.sorter is not None:
+            self.sorter.start()
+
+        if self.memory_reporter is not None:
+            self.memory_reporter.start()
+
+        if self.metrics_server is not None:
+            self.metrics_server.start()
+            print(f"📡 Metrikler: {self.metrics_server.url}")
+
+        if self.live_stream is not None:
+            self.live_stream.start()
+            print(f"🌐 Canlı görünüm: {self.live_stream.url} "
+                  f"(hız x{self.realtime_cfg.get('speed', 1.0)})")
+
+        if self.live_viewer is not None:
+            self.live_viewer.start()
+            print(f"🖥️  Görüntüleyici process başlatıldı "
+                  f"(halka: {self.live_viewer.ring.slots} kare, {self.live_viewer.interval}s aralık)")
+
         # Simülasyonu çalıştır
         self.env.run(until=duration)
 
+        if self.memory_reporter is not None:
+            self.memory_reporter.sample()
+            self.memory_reporter.stop()
+
+        if self.metrics_server is not None:
+            # Koşu bitti: sayaçlar artık değişmez, port ve thread serbest bırakılır
+            scrapes = self.metrics_server.scrapes
+            self.metrics_server.stop()
+            print(f"📡 Metrik sunucusu kapatıldı ({scrapes} scrape)")
+
+        if self.live_stream is not None:
+            self.live_stream.finish()
+
+        if self.tracer is not None:
+            self.tracer.close()
+
+        if self.live_viewer is not None:
+            viewer_stats = self.live_viewer.get_statistics()
+            print(f"🖥️  {viewer_stats['published']} kare yayınlandı "
+                  f"(yayın maliyeti {viewer_stats['publish_seconds'] * 1000:.1f} ms); "
+                  f"görüntüleyici penceresi kapatılınca devam edilir")
+            self.live_viewer.finish(wait=self.config.get('viewer', {}).get('wait', True))
+
         print("=" * 70)
         print(f"\n✅ Simülasyon tamamlandı!")
 
+    def shutdown(self):
+        """
+        Koşudan sonra açık kalan ağ kaynaklarını kapatır: metrik sunucusu
+        (run() sonunda zaten durur) ve son kareden sonra açık tutulan canlı
+        görünüm bağlantıları. Birden fazla çağrılabilir.
+        """
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        if self.live_stream is not None:
+            self.live_stream.stop()
+
+    def collect_kpis(self) -> dict:
+        """
+        Koşu sonu KPI'larını düz {isim: sayı} sözlüğü olarak döndürür.
+        RunStore'a yazılan ve sweep'lerde sorgulanan değerler bunlardır.
+        """
+        now = self.env.now
+        kpis = {
+            'line.total_processed': self.conveyor_line.total_packets_processed,
+            'line.throughput': self.conveyor_line.total_packets_processed / now if now > 0 else 0.0,
+            'line.packets_in_transit': len(self.conveyor_line.packets_in_transit),
+            'line.utilization': self.conveyor_line.get_utilization(),
+            'line.occupied_length': self.conveyor_line.occupied_length,
+        }
+
+        for segment_id, utilization in self.conveyor_line.get_segment_utilizations().items():
+            kpis[f'segment.{segment_id}.utilization'] = utilization
+
+        for segment in self.conveyor_line.segments:
+            for regime, rstats in segment.get_regime_statistics().items():
+                prefix = f'segment.{segment.id}.regime.{regime}'
+                kpis[f'{prefix}.duration'] = rstats['duration']
+                kpis[f'{prefix}.throughput'] = rstats['throughput']
+                kpis[f'{prefix}.belt_distance'] = rstats['belt_distance']
+
+        for feeder in self.feeders:
+            fstats = feeder.get_statistics()
+            prefix = f"feeder.{feeder.id}"
+            kpis[f'{prefix}.total_produced'] = fstats['total_produced']
+            kpis[f'{prefix}.total_transferred'] = fstats['total_transferred']
+            kpis[f'{prefix}.current_queue'] = fstats['current_queue']
+            kpis[f'{prefix}.total_blocked_time'] = fstats['total_blocked_time']
+            kpis[f'{prefix}.blocked_ratio'] = fstats['total_blocked_time'] / now if now > 0 else 0.0
+            kpis[f'{prefix}.utilization_rate'] = fstats['utilization_rate']
+            kpis[f'{prefix}.transfer_rate'] = fstats['transfer_rate']
+            kpis[f'{prefix}.block_events'] = fstats['block_events']
+            if self.slot_planner is not None:
+                kpis[f'{prefix}.slot_wait_time'] = fstats['slot_wait_time']
+
+        if self.sorter is not None:
+            sstats = self.sorter.get_statistics()
+            kpis['sorter.total_sorted'] = sstats['total_sorted']
+            kpis['sorter.sort_rate'] = sstats['sort_rate']
+            kpis['sorter.total_recirculated'] = sstats['total_recirculated']
+            for dest, dstats in sstats['destinations'].items():
+                prefix = f'sorter.{dest}'
+                kpis[f'{prefix}.sorted'] = dstats['sorted']
+                kpis[f'{prefix}.sort_rate'] = dstats['sort_rate']
+                kpis[f'{prefix}.missed_sort_rate'] = dstats['missed_sort_rate']
+                kpis[f'{prefix}.recirculated'] = dstats['recirculated']
+                kpis[f'{prefix}.unsorted'] = dstats['unsorted']
+
+        if self.fault_injector is not None:
+            fstats = self.fault_injector.get_statistics()
+            kpis['faults.count'] = fstats['fault_count']
+            kpis['faults.availability'] = fstats['availability']
+            kpis['faults.availability_adjusted_throughput'] = fstats['availability_adjusted_throughput']
+            kpis['faults.avg_recovery_time'] = fstats['avg_recovery_time']
+            kpis['faults.max_recovery_time'] = fstats['max_recovery_time']
+            kpis['faults.unrecovered'] = fstats['unrecovered']
+            for segment_id, fseg in fstats['segments'].items():
+                kpis[f'segment.{segment_id}.downtime'] = fseg['downtime']
+
+        if self.memory_reporter is not None:
+            mem = self.memory_reporter.get_statistics()
+            if mem is not None:
+                kpis['memory.total_bytes'] = mem['total_bytes']
+                kpis['memory.peak_total_bytes'] = mem['peak_total_bytes']
+                kpis['memory.growth_rate'] = mem['growth_rate']
+                for name in SUBSYSTEMS:
+                    sub = mem['subsystems'][name]
+                    kpis[f'memory.{name}.bytes'] = sub['bytes']
+                    kpis[f'memory.{name}.count'] = sub['count']
+                    kpis[f'memory.{name}.peak_bytes'] = sub['peak_bytes']
+                if 'traced' in mem:
+                    kpis['memory.traced.current'] = mem['traced']['current']
+                    kpis['memory.traced.peak'] = mem['traced']['peak']
+
+        if self.latency is not None:
+            lstats = self.latency.get_statistics()
+            groups = [('line.latency', lstats['line']['latency']),
+                      ('line.merge_wait', lstats['line']['merge_wait'])]
+            for feeder_id, fl in lstats['feeders'].items():
+                groups.append((f'feeder.{feeder_id}.merge_wait', fl['merge_wait']))
+                groups.append((f'feeder.{feeder_id}.blocked_wait', fl['blocked_wait']))
+                groups.append((f'feeder.{feeder_id}.latency', fl['latency']))
+            for segment_id, dwell in lstats['segments'].items():
+                groups.append((f'segment.{segment_id}.dwell', dwell))
+            for prefix, summary in groups:
+                for key in ('mean', 'p50', 'p95', 'p99', 'max'):
+                    kpis[f'{prefix}.{key}'] = summary[key]
+
+        if self.block_attribution is not None:
+            istats = self.block_attribution.get_statistics()
+            for victim, row in istats['matrix'].items():
+                for source, seconds in row.items():
+                    kpis[f'interference.{victim}.{source}'] = seconds
+            for source, seconds in istats['inflicted'].items():
+                kpis[f'interference.{source}.inflicted'] = seconds
+
+        if self.merge_arbiter is not None:
+            mstats = self.merge_arbiter.get_statistics()
+            kpis['merge.throughput'] = mstats['throughput']
+            kpis['merge.fairness_index'] = mstats['fairness_index']
+            for feeder_id, fm in mstats['feeders'].items():
+                kpis[f'merge.{feeder_id}.contested_grants'] = fm['contested_grants']
+                kpis[f'merge.{feeder_id}.avg_merge_wait'] = fm['avg_merge_wait']
+
+        return kpis
+
+    def record_run(self, store: RunStore) -> str:
+        """Tamamlanan koşunun KPI'larını RunStore'a yazar. Config hash döndürür."""
+        return store.record(
+            self.config, self.collect_kpis(),
+            engine_version=ENGINE_VERSION,
+            seed=self.seed,
+            duration=self.env.now
+        )
+
     def print_statistics(self):
         """Detaylı istatistikleri yazdır"""
         print("\n" + "=" * 70)
@@ -196,13 +712,20 @@ class MultiSegmentSimulation:
         print(f"   Segment Sayısı: {stats['segment_count']}")
         print(f"   Toplam işlenen paket: {stats['total_processed']}")
         print(f"   Halen üzerinde: {stats['packets_in_transit']} paket")
-        print(f"   Son doluluk oranı: {stats['utilization']:.2%}")
+        print(f"   Son doluluk oranı: {stats['utilization']:.2%} "
+              f"({stats['occupied_length']:.2f}m dolu)")
 
         print(f"\n📊 SEGMENT DETAYLARI:")
         for seg in stats['segments']:
             print(f"   {seg['id']} ({seg['description']}):")
             print(f"      Uzunluk: {seg['length']}m, Hız: {seg['speed']} m/s")
-            print(f"      Paket: {seg['packets']}, Doluluk: {seg['utilization']:.2%}")
+            print(f"      Paket: {seg['packets']}, Doluluk: {seg['utilization']:.2%} "
+                  f"({seg['occupied_length']:.2f}m), En uzun boşluk: {seg['largest_gap']:.2f}m")
+            if len(seg['regimes']) > 1:
+                for regime, rstats in seg['regimes'].items():
+                    print(f"      ⚙️  {regime}: {rstats['duration']:.1f}s, "
+                          f"ort. {rstats['avg_speed']:.2f} m/s, {rstats['throughput']:.3f} paket/s, "
+                          f"bant yolu {rstats['belt_distance']:.1f}m")
 
         print(f"\n📦 FEEDER LINES:")
         for feeder in self.feeders:
@@ -213,6 +736,116 @@ class MultiSegmentSimulation:
             print(f"      Kuyrukta: {fstats['current_queue']} paket")
             print(f"      Toplam bloke süresi: {fstats['total_blocked_time']:.1f}s")
             print(f"      Verimlilik: {fstats['utilization_rate']:.2%}")
+            print(f"      Aktarım denemesi: {fstats['transfer_attempts']} "
+                  f"({fstats['failed_attempts']} başarısız)")
+
+        if self.slot_planner is not None:
+            pstats = self.slot_planner.get_statistics()
+            print(f"\n🔮 ÖNGÖRÜLÜ MERGE:")
+            print(f"   Tahmin: {pstats['forecasts']}, sorgulamaya dönüş: {pstats['fallbacks']}, "
+                  f"tutmayan tahmin: {pstats['misses']}")
+            print(f"   Aktarım denemesi: {pstats['attempts']} ({pstats['failed_attempts']} başarısız)")
+            print(f"   Slot bekleme: {pstats['slot_wait_time']:.1f}s (bloke süresine dahil değil)")
+
+        if self.merge_arbiter is not None:
+            mstats = self.merge_arbiter.get_statistics()
+            print(f"\n🔀 MERGE POLİTİKASI: {mstats['policy']}")
+            print(f"   Throughput: {mstats['throughput']:.3f} paket/s")
+            print(f"   Adalet indeksi (Jain): {mstats['fairness_index']:.3f}")
+            print(f"   Tur: {mstats['total_rounds']}, boşlukla uyanma: {mstats['total_gap_wakeups']}")
+            for feeder_id, fm in mstats['feeders'].items():
+                print(f"   {feeder_id}: {fm['grants']} izin ({fm['contested_grants']} çekişmeli), "
+                      f"ort. merge bekleme {fm['avg_merge_wait']:.1f}s")
+
+        if self.sorter is not None:
+            sstats = self.sorter.get_statistics()
+            print(f"\n📬 SIRALAMA:")
+            print(f"   Sıralanan: {sstats['total_sorted']} paket ({sstats['sort_rate']:.3f} paket/s), "
+                  f"devridaim: {sstats['total_recirculated']}, devridaimde: {sstats['in_recirculation']}, "
+                  f"ayırıcısız hedef: {sstats['total_unroutable']}")
+            for dest, dstats in sstats['destinations'].items():
+                print(f"   {dest}: {dstats['sorted']} sıralandı ({dstats['sort_rate']:.3f} paket/s), "
+                      f"kaçırılan oran {dstats['missed_sort_rate']:.1%}, "
+                      f"devridaim {dstats['recirculated']}, sıralanamayan {dstats['unsorted']}")
+            for dv in sstats['diverters']:
+                print(f"   {dv['id']} @ {dv['position']}m: {dv['diverted']} ayrıldı, "
+                      f"{dv['missed']} yan hat dolu, {dv['passed']} geçti")
+
+        if self.fault_injector is not None:
+            fstats = self.fault_injector.get_statistics()
+            print(f"\n⛔ DURUŞLAR:")
+            print(f"   Duruş sayısı: {fstats['fault_count']}, hat duruş süresi: {fstats['line_downtime']:.1f}s")
+            print(f"   Erişilebilirlik: {fstats['availability']:.2%}")
+            print(f"   Throughput: {fstats['throughput']:.3f} paket/s "
+                  f"(erişilebilirliğe göre düzeltilmiş: {fstats['availability_adjusted_throughput']:.3f})")
+            print(f"   İş yükü toparlanma süresi: ort. {fstats['avg_recovery_time']:.1f}s, "
+                  f"maks. {fstats['max_recovery_time']:.1f}s, toparlanmayan: {fstats['unrecovered']}")
+            for record in fstats['records']:
+                recovery = (f"{record['recovery_time']:.1f}s" if record['recovery_time'] is not None
+                            else "toparlanmadı")
+                duration = f"{record['duration']:.1f}s" if record['duration'] is not None else "sürüyor"
+                print(f"   {record['segment']} @ t={record['start']:.1f}s ({record['kind']}): "
+                      f"{duration}, kuyruk {record['backlog_before']} -> {record['backlog_peak']}, "
+                      f"toparlanma {recovery}")
+
+        if self.latency is not None:
+            lstats = self.latency.get_statistics()
+
+            def fmt(summary: dict) -> str:
+                return (f"p50 {summary['p50']:.2f}s, p95 {summary['p95']:.2f}s, "
+                        f"p99 {summary['p99']:.2f}s, en fazla {summary['max']:.2f}s ({summary['count']})")
+
+            print(f"\n⏱️  GECİKME DAĞILIMLARI:")
+            print(f"   Üretim → çıkış: {fmt(lstats['line']['latency'])}")
+            print(f"   Merge bekleme: {fmt(lstats['line']['merge_wait'])}")
+            for feeder_id, fl in lstats['feeders'].items():
+                print(f"   {feeder_id} merge bekleme: {fmt(fl['merge_wait'])}")
+                print(f"   {feeder_id} bloke bekleme: {fmt(fl['blocked_wait'])}")
+                print(f"   {feeder_id} gecikme: {fmt(fl['latency'])}")
+            for segment_id, dwell in lstats['segments'].items():
+                print(f"   {segment_id} kalış: {fmt(dwell)}")
+
+        if self.block_attribution is not None:
+            istats = self.block_attribution.get_statistics()
+            columns = self.block_attribution.columns
+            print(f"\n🚧 BLOKE KÖK NEDENLERİ (satır: bloke olan, sütun: engelleyen kaynak, saniye):")
+            print(f"   {'':<12}" + "".join(f"{c[:12]:>13}" for c in columns))
+            for victim, row in istats['matrix'].items():
+                print(f"   {victim:<12}" + "".join(f"{row[c]:>13.1f}" for c in columns))
+            for source in self.block_attribution.feeder_ids:
+                print(f"   {source}: diğerlerini {istats['inflicted'][source]:.1f}s, "
+                      f"kendini {istats['self_inflicted'][source]:.1f}s bloke etti")
+            if istats['throttle_candidate'] is not None:
+                print(f"   👉 Kısılması önerilen feeder: {istats['throttle_candidate']}")
+
+        if self.tracer is not None and self.tracer.closed:
+            trace = analyze_trace(self.tracer.path)
+            latency = trace['latency']
+            print(f"\n📼 OLAY İZİ ({trace['records']} kayıt, {trace['packets']} paket):")
+            print(f"   Gecikme (üretim → çıkış): ort {latency['mean']:.1f}s, "
+                  f"p95 {latency['p95']:.1f}s, en fazla {latency['max']:.1f}s ({latency['count']} paket)")
+            for seg_id, seg in trace['segments'].items():
+                print(f"   {seg_id}: ort kalış {seg['mean_dwell']:.2f}s, en fazla {seg['max_dwell']:.2f}s")
+            for feeder_id, wait in trace['merge_wait'].items():
+                print(f"   {feeder_id}: merge bekleme ort {wait['mean']:.1f}s, p95 {wait['p95']:.1f}s, "
+                      f"atılan {trace['dropped'][feeder_id]}")
+
+        if self.memory_reporter is not None:
+            mem = self.memory_reporter.get_statistics()
+            if mem is not None:
+                print(f"\n🧠 BELLEK ({mem['sample_count']} örnek):")
+                print(f"   Toplam: {mem['total_bytes'] / 1024:.1f} KiB "
+                      f"(tepe {mem['peak_total_bytes'] / 1024:.1f} KiB), "
+                      f"büyüme {mem['growth_rate']:.1f} B/s")
+                for name, sub in mem['subsystems'].items():
+                    print(f"   {name}: {sub['count']} nesne, {sub['bytes'] / 1024:.1f} KiB "
+                          f"(tepe {sub['peak_bytes'] / 1024:.1f} KiB, {sub['growth_rate']:.1f} B/s)")
+                if 'traced' in mem:
+                    traced = mem['traced']
+                    files = ", ".join(f"{k} {v / 1024:.0f} KiB" for k, v in
+                                      sorted(traced['files'].items(), key=lambda kv: -kv[1]))
+                    print(f"   tracemalloc: {traced['current'] / 1024:.1f} KiB "
+                          f"(tepe {traced['peak'] / 1024:.1f} KiB) - {files}")
 
         print("\n" + "=" * 70)
 
@@ -318,6 +951,13 @@ class MultiSegmentSimulation:
                 )
                 ax.add_patch(seg_rect)
 
+                # ZPA bölge sınırları
+                if segment.kind == 'zpa':
+                    for k in range(1, segment.zone_count):
+                        zx = pos['start_x'] + k * segment.zone_length
+                        ax.plot([zx, zx], [pos['start_y'] - belt_width/2, pos['start_y'] + belt_width/2],
+                               color='white', linewidth=1, linestyle=':', alpha=0.6)
+
                 # Segment etiketi (üstte)
                 mid_x = (pos['start_x'] + pos['end_x']) / 2
                 ax.text(mid_x, pos['start_y'] + belt_width/2 + 0.8,
@@ -342,6 +982,13 @@ class MultiSegmentSimulation:
                 )
                 ax.add_patch(seg_rect)
 
+                # ZPA bölge sınırları
+                if segment.kind == 'zpa':
+                    for k in range(1, segment.zone_count):
+                        zy = pos['start_y'] + k * segment.zone_length
+                        ax.plot([pos['start_x'] - belt_width/2, pos['start_x'] + belt_width/2], [zy, zy],
+                               color='white', linewidth=1, linestyle=':', alpha=0.6)
+
                 # Segment etiketi (sağda)
                 mid_y = (pos['start_y'] + pos['end_y']) / 2
                 ax.text(pos['start_x'] + belt_width/2 + 0.8, mid_y,
@@ -411,14 +1058,16 @@ class MultiSegmentSimulation:
                 px, py, pdir = self.get_packet_2d_position(glob_pos, segment_positions)
                 color = self.FEEDER_COLORS.get(pkt_data['source'], '#FFFFFF')
 
+                # Paket boyu hat yönünde gerçek uzunluğuyla çizilir
+                pkt_len = pkt_data.get('length', 0.3)
                 if pdir == 'horizontal':
                     pkt_rect = patches.Rectangle(
-                        (px - 0.2, py - 0.4), 0.4, 0.8,
+                        (px - pkt_len / 2, py - 0.4), pkt_len, 0.8,
                         linewidth=1, edgecolor=color, facecolor=color, alpha=0.9
                     )
                 else:
                     pkt_rect = patches.Rectangle(
-                        (px - 0.4, py - 0.2), 0.8, 0.4,
+                        (px - 0.4, py - pkt_len / 2), 0.8, pkt_len,
                         linewidth=1, edgecolor=color, facecolor=color, alpha=0.9
                     )
                 ax.add_patch(pkt_rect)
@@ -584,14 +1233,15 @@ class MultiSegmentSimulation:
                 px, py, pdir = self.get_packet_2d_position(pkt['position'], segment_positions)
                 color = self.FEEDER_COLORS.get(pkt['source'], '#FFFFFF')
 
+                pkt_len = pkt.get('length', 0.3)
                 if pdir == 'horizontal':
                     pkt_rect = patches.Rectangle(
-                        (px - 0.15, py - 0.3), 0.3, 0.6,
+                        (px - pkt_len / 2, py - 0.3), pkt_len, 0.6,
                         linewidth=1, edgecolor=color, facecolor=color, alpha=0.9
                     )
                 else:
                     pkt_rect = patches.Rectangle(
-                        (px - 0.3, py - 0.15), 0.6, 0.3,
+                        (px - 0.3, py - pkt_len / 2), 0.6, pkt_len,
                         linewidth=1, edgecolor=color, facecolor=color, alpha=0.9
                     )
                 ax.add_patch(pkt_rect)
@@ -676,13 +1326,10 @@ class MultiSegmentSimulation:
         ax1 = axes[0, 0]
         ax1.set_facecolor('#1a1a1a')
 
-        times = [s['time'] for s in self.snapshots]
-        for i, segment in enumerate(self.conveyor_line.segments):
-            utilizations = [s['conveyor_line']['segments'][i]['utilization'] * 100
-                          for s in self.snapshots]
-            color = self.get_segment_color(segment.speed)
-            ax1.plot(times, utilizations, label=f"{segment.id} ({segment.speed}m/s)",
-                    color=color, linewidth=2)
+        for segment in self.conveyor_line.segments:
+            self._plot_rollup(ax1, f"segment.{segment.id}.utilization",
+                              self.get_segment_color(segment.speed),
+                              label=f"{segment.id} ({segment.speed}m/s)", scale=100)
 
         ax1.set_xlabel('Zaman (s)', color='white')
         ax1.set_ylabel('Doluluk (%)', color='white')
@@ -695,12 +1342,8 @@ class MultiSegmentSimulation:
         ax2 = axes[0, 1]
         ax2.set_facecolor('#1a1a1a')
 
-        packet_counts = [len(s['conveyor_line']['packets']) for s in self.snapshots]
-        processed = [s['conveyor_line']['total_processed'] for s in self.snapshots]
-
-        ax2.plot(times, packet_counts, label='Hatta', color='#3498DB', linewidth=2)
-        ax2.plot(times, processed, label='İşlenen (Toplam)', color='#2ECC71', linewidth=2)
-        ax2.fill_between(times, packet_counts, alpha=0.3, color='#3498DB')
+        self._plot_rollup(ax2, 'line.packets', '#3498DB', label='Hatta', fill=True)
+        self._plot_rollup(ax2, 'line.processed', '#2ECC71', label='İşlenen (Toplam)')
 
         ax2.set_xlabel('Zaman (s)', color='white')
         ax2.set_ylabel('Paket Sayısı', color='white')
@@ -738,10 +1381,10 @@ class MultiSegmentSimulation:
 
         summary = "📊 ÖZET İSTATİSTİKLER\n" + "=" * 35 + "\n\n"
 
-        stats = self.conveyor_line.get_statistics()
-        summary += f"Hat Toplam Uzunluk: {stats['total_length']}m\n"
-        summary += f"Toplam İşlenen: {stats['total_processed']} paket\n"
-        summary += f"Hatta Kalan: {stats['packets_in_transit']} paket\n\n"
+        final = self.final_snapshot()
+        summary += f"Hat Toplam Uzunluk: {self.conveyor_line.total_length}m\n"
+        summary += f"Toplam İşlenen: {final['conveyor_line']['total_processed']} paket\n"
+        summary += f"Hatta Kalan: {len(final['conveyor_line']['packets'])} paket\n\n"
 
         summary += "Segment Hızları:\n"
         for seg in self.conveyor_line.segments:
@@ -749,8 +1392,7 @@ class MultiSegmentSimulation:
             summary += f"  {seg.id}: {seg.length}m / {seg.speed}m/s = {travel_time:.1f}s\n"
 
         summary += f"\nFeeder Durumu:\n"
-        for feeder in self.feeders:
-            fstats = feeder.get_statistics()
+        for fstats in final['feeders']:
             summary += f"  {fstats['id']}: {fstats['total_transferred']}/{fstats['total_produced']} aktarıldı\n"
 
         ax4.text(0.1, 0.9, summary, transform=ax4.transAxes,
@@ -877,7 +1519,7 @@ class MultiSegmentSimulation:
             else:
                 ax.axis('off')
 
-        snapshot_interval = self.config['simulation']['snapshot_interval']
+        snapshot_interval = self.get_snapshot_interval()
         plt.suptitle(f'Snapshot Frames ({snapshot_interval}s aralik) - Sari border = Feeder bekliyor',
                     fontsize=14, fontweight='bold', color='white')
         plt.tight_layout()
@@ -887,6 +1529,121 @@ class MultiSegmentSimulation:
         print(f"📊 Snapshot frame'leri kaydedildi: {output_path}")
         plt.show()
 
+    def _packet_samples(self) -> dict:
+        """Snapshot'lardaki paket örnekleri (bant üzerindeki baş/son aralığıyla)"""
+        data = flatten_snapshots(self.snapshots, [f.id for f in self.feeders])
+        data['start'] = data['position'] - data['length'] / 2
+        data['end'] = data['position'] + data['length'] / 2
+        return data
+
+    def visualize_space_time(self, time_bins: int = None, position_bins: int = None):
+        """
+        Paket uzay-zaman diyagramı (pozisyon x zaman, kaynak feeder'a göre renkli).
+
+        Paketler 2D histogram ile piksel ızgarasına toplanır ve tek görüntü
+        olarak çizilir; maliyet paket sayısından bağımsızdır.
+        """
+        if not self.snapshots:
+            print("⚠️  Snapshot bulunamadı!")
+            return
+
+        data = self._packet_samples()
+        time_edges = time_edges_for(data['sample_times'], time_bins or self.raster_time_bins)
+        total_length = self.conveyor_line.total_length
+        pos_edges = np.linspace(0.0, total_length, (position_bins or self.raster_position_bins) + 1)
+
+        layers, colors = [], []
+        for i, feeder in enumerate(self.feeders):
+            mask = data['source'] == i
+            layers.append(coverage_raster(data['time'][mask], data['start'][mask], data['end'][mask],
+                                          data['sample_times'], time_edges, pos_edges))
+            colors.append(mcolors.to_rgb(self.FEEDER_COLORS.get(feeder.id, '#FFFFFF')))
+        # Ortalama kaplama genelde düşük kalır; renk aralığını en dolu hücreye göre ölçekle
+        peak = max((np.nanmax(layer) for layer in layers if np.isfinite(layer).any()), default=0.0)
+        if peak > 0:
+            layers = [layer / peak for layer in layers]
+        image = compose_layers(layers, colors, mcolors.to_rgb('#1a1a1a'))
+
+        fig, ax = plt.subplots(figsize=(16, 8))
+        fig.patch.set_facecolor('#1a1a1a')
+        ax.set_facecolor('#1a1a1a')
+        ax.imshow(image.transpose(1, 0, 2), origin='lower', aspect='auto', interpolation='nearest',
+                  extent=[time_edges[0], time_edges[-1], 0.0, total_length])
+
+        # Segment sınırları ve feeder giriş noktaları
+        for segment in self.conveyor_line.segments:
+            ax.axhline(segment.end_offset, color='#555555', linewidth=0.8)
+            ax.text(time_edges[-1], (segment.start_offset + segment.end_offset) / 2,
+                    f" {segment.id}\n {segment.speed}m/s", color=self.get_segment_color(segment.speed),
+                    fontsize=8, va='center', ha='left')
+        for feeder in self.feeders:
+            ax.axhline(feeder.entry_position, color=self.FEEDER_COLORS.get(feeder.id, '#FFFFFF'),
+                       linewidth=0.8, linestyle='--', alpha=0.6)
+
+        handles = [patches.Patch(color=self.FEEDER_COLORS.get(f.id, '#FFFFFF'), label=f.id)
+                   for f in self.feeders]
+        ax.legend(handles=handles, loc='upper left', facecolor='#222222', edgecolor='#555555')
+        ax.set_xlabel('Zaman (s)', color='white')
+        ax.set_ylabel('Hat Pozisyonu (m)', color='white')
+        ax.tick_params(colors='white')
+        ax.set_title(f'Uzay-Zaman Diyagramı ({data["time"].size} paket örneği, '
+                     f'{image.shape[0]}x{image.shape[1]} piksel)',
+                     fontsize=14, fontweight='bold', color='white')
+
+        output_path = self.output_dir / 'space_time.png'
+        plt.savefig(output_path, dpi=self.dpi, bbox_inches='tight',
+                   facecolor='#1a1a1a', edgecolor='none')
+        print(f"📊 Uzay-zaman diyagramı kaydedildi: {output_path}")
+        plt.show()
+
+    def visualize_occupancy_heatmaps(self, time_bins: int = None, position_bins: int = None):
+        """
+        Segment başına doluluk ısı haritası (segment içi pozisyon x zaman).
+
+        Hücre değeri, o zaman aralığında hücrenin paketlerle kaplı olduğu
+        ortalama orandır (0 = boş, 1 = tamamen dolu).
+        """
+        if not self.snapshots:
+            print("⚠️  Snapshot bulunamadı!")
+            return
+
+        data = self._packet_samples()
+        time_edges = time_edges_for(data['sample_times'], time_bins or self.raster_time_bins)
+        position_bins = position_bins or self.raster_position_bins
+        segments = self.conveyor_line.segments
+
+        fig, axes = plt.subplots(len(segments), 1, figsize=(16, 2.2 * len(segments) + 1),
+                                 sharex=True, squeeze=False)
+        fig.patch.set_facecolor('#1a1a1a')
+
+        image = None
+        for ax, segment in zip(axes[:, 0], segments):
+            ax.set_facecolor('#1a1a1a')
+            bins = max(8, int(round(position_bins * segment.length / self.conveyor_line.total_length)))
+            pos_edges = np.linspace(segment.start_offset, segment.end_offset, bins + 1)
+            occupancy = coverage_raster(data['time'], data['start'], data['end'],
+                                        data['sample_times'], time_edges, pos_edges)
+            image = ax.imshow(occupancy.T, origin='lower', aspect='auto', interpolation='nearest',
+                              cmap='inferno', vmin=0.0, vmax=1.0,
+                              extent=[time_edges[0], time_edges[-1], 0.0, segment.length])
+            mean = np.nanmean(occupancy) * 100 if np.isfinite(occupancy).any() else 0.0
+            ax.set_title(f"{segment.id} ({segment.speed}m/s) - ort. doluluk %{mean:.1f}",
+                        fontsize=10, color=self.get_segment_color(segment.speed), loc='left')
+            ax.set_ylabel('Pozisyon (m)', color='white')
+            ax.tick_params(colors='white')
+
+        axes[-1, 0].set_xlabel('Zaman (s)', color='white')
+        colorbar = fig.colorbar(image, ax=axes[:, 0].tolist(), fraction=0.02, pad=0.01)
+        colorbar.set_label('Doluluk', color='white')
+        colorbar.ax.tick_params(colors='white')
+        fig.suptitle('Segment Doluluk Isı Haritaları', fontsize=14, fontweight='bold', color='white')
+
+        output_path = self.output_dir / 'segment_occupancy.png'
+        plt.savefig(output_path, dpi=self.dpi, bbox_inches='tight',
+                   facecolor='#1a1a1a', edgecolor='none')
+        print(f"📊 Doluluk ısı haritaları kaydedildi: {output_path}")
+        plt.show()
+
     def visualize_executive_dashboard(self):
         """Yönetici özet dashboard'u - Tek bakışta tüm KPI'lar."""
         fig = plt.figure(figsize=(18, 12))
@@ -898,10 +1655,14 @@ class MultiSegmentSimulation:
         sim_cfg = self.config['simulation']
         duration = sim_cfg['duration']
 
+        # Koşu sonu değerleri (canlı koşu veya replay) tek snapshot'tan okunur
+        final = self.final_snapshot()
+        final_feeders = final['feeders']
+
         # KPI 1: Toplam İşlenen Paket
         ax_kpi1 = fig.add_subplot(gs[0, 0])
         ax_kpi1.set_facecolor('#2d2d2d')
-        total_processed = self.conveyor_line.total_packets_processed
+        total_processed = final['conveyor_line']['total_processed']
         ax_kpi1.text(0.5, 0.65, f"{total_processed}", fontsize=48, fontweight='bold',
                     color='#2ECC71', ha='center', va='center', transform=ax_kpi1.transAxes)
         ax_kpi1.text(0.5, 0.25, "Islenen Paket", fontsize=14, color='white',
@@ -913,8 +1674,8 @@ class MultiSegmentSimulation:
         # KPI 2: Sistem Verimliliği
         ax_kpi2 = fig.add_subplot(gs[0, 1])
         ax_kpi2.set_facecolor('#2d2d2d')
-        total_produced = sum(f.total_produced for f in self.feeders)
-        total_transferred = sum(f.total_transferred for f in self.feeders)
+        total_produced = sum(f['total_produced'] for f in final_feeders)
+        total_transferred = sum(f['total_transferred'] for f in final_feeders)
         system_efficiency = (total_transferred / total_produced * 100) if total_produced > 0 else 0
         eff_color = '#2ECC71' if system_efficiency >= 80 else '#F39C12' if system_efficiency >= 50 else '#E74C3C'
         ax_kpi2.text(0.5, 0.65, f"%{system_efficiency:.0f}", fontsize=48, fontweight='bold',
@@ -928,8 +1689,7 @@ class MultiSegmentSimulation:
         # KPI 3: Ortalama Doluluk
         ax_kpi3 = fig.add_subplot(gs[0, 2])
         ax_kpi3.set_facecolor('#2d2d2d')
-        utilizations = [s['conveyor_line']['utilization'] for s in self.snapshots]
-        avg_utilization = sum(utilizations) / len(utilizations) * 100 if utilizations else 0
+        avg_utilization = self.get_rollups().mean('line.utilization') * 100
         util_color = '#E74C3C' if avg_utilization >= 90 else '#F39C12' if avg_utilization >= 70 else '#2ECC71'
         ax_kpi3.text(0.5, 0.65, f"%{avg_utilization:.0f}", fontsize=48, fontweight='bold',
                     color=util_color, ha='center', va='center', transform=ax_kpi3.transAxes)
@@ -943,15 +1703,15 @@ class MultiSegmentSimulation:
         # KPI 4: Darboğaz Durumu
         ax_kpi4 = fig.add_subplot(gs[0, 3])
         ax_kpi4.set_facecolor('#2d2d2d')
-        bottleneck_feeder = max(self.feeders, key=lambda f: f.get_current_blocked_time())
-        bottleneck_time = bottleneck_feeder.get_current_blocked_time()
+        bottleneck_feeder = max(final_feeders, key=lambda f: f['blocked_time'])
+        bottleneck_time = bottleneck_feeder['blocked_time']
         bottleneck_pct = (bottleneck_time / duration * 100) if duration > 0 else 0
         bn_color = '#E74C3C' if bottleneck_pct >= 50 else '#F39C12' if bottleneck_pct >= 20 else '#2ECC71'
         ax_kpi4.text(0.5, 0.65, f"%{bottleneck_pct:.0f}", fontsize=48, fontweight='bold',
                     color=bn_color, ha='center', va='center', transform=ax_kpi4.transAxes)
         ax_kpi4.text(0.5, 0.25, "Darbogaz Orani", fontsize=14, color='white',
                     ha='center', va='center', transform=ax_kpi4.transAxes)
-        ax_kpi4.text(0.5, 0.08, f"({bottleneck_feeder.id})", fontsize=10,
+        ax_kpi4.text(0.5, 0.08, f"({bottleneck_feeder['id']})", fontsize=10,
                     color='#888888', ha='center', va='center', transform=ax_kpi4.transAxes)
         ax_kpi4.axis('off')
 
@@ -959,9 +1719,11 @@ class MultiSegmentSimulation:
         ax_perf = fig.add_subplot(gs[1, 0:2])
         ax_perf.set_facecolor('#1a1a1a')
 
-        feeder_names = [f.id.replace('FEEDER_', '') for f in self.feeders]
-        efficiencies = [f.get_utilization_rate() * 100 for f in self.feeders]
-        colors = [self.FEEDER_COLORS.get(f.id, '#FFFFFF') for f in self.feeders]
+        final_time = final['time']
+        feeder_names = [f['id'].replace('FEEDER_', '') for f in final_feeders]
+        efficiencies = [(1.0 - f['blocked_time'] / final_time if final_time > 0 else 1.0) * 100
+                        for f in final_feeders]
+        colors = [self.FEEDER_COLORS.get(f['id'], '#FFFFFF') for f in final_feeders]
 
         bars = ax_perf.barh(feeder_names, efficiencies, color=colors, alpha=0.8, height=0.6)
 
@@ -986,11 +1748,7 @@ class MultiSegmentSimulation:
         ax_trend = fig.add_subplot(gs[1, 2:4])
         ax_trend.set_facecolor('#1a1a1a')
 
-        times = [s['time'] for s in self.snapshots]
-        util_values = [s['conveyor_line']['utilization'] * 100 for s in self.snapshots]
-
-        ax_trend.fill_between(times, util_values, alpha=0.3, color='#9B59B6')
-        ax_trend.plot(times, util_values, color='#9B59B6', linewidth=2)
+        self._plot_rollup(ax_trend, 'line.utilization', '#9B59B6', scale=100, fill=True)
         ax_trend.axhline(y=80, color='#E74C3C', linestyle='--', linewidth=2, alpha=0.7)
 
         ax_trend.set_xlabel('Zaman (saniye)', fontsize=11, color='white')
@@ -1007,8 +1765,8 @@ class MultiSegmentSimulation:
         ax_pie = fig.add_subplot(gs[2, 0:2])
         ax_pie.set_facecolor('#1a1a1a')
 
-        total_in_queue = sum(len(f.queue) for f in self.feeders)
-        on_conveyor = len(self.conveyor_line.packets_in_transit)
+        total_in_queue = sum(f['queue_length'] for f in final_feeders)
+        on_conveyor = len(final['conveyor_line']['packets'])
 
         pie_data = [total_processed, on_conveyor, total_in_queue]
         pie_labels = ['Tamamlanan', 'Tasimada', 'Kuyrukta']
@@ -1055,7 +1813,7 @@ class MultiSegmentSimulation:
 
     def print_snapshot_summary(self):
         """Snapshot'ların özetini yazdırır"""
-        snapshot_interval = self.config['simulation']['snapshot_interval']
+        snapshot_interval = self.get_snapshot_interval()
         print("\n" + "="*70)
         print(f"📸 SNAPSHOT ÖZETİ ({snapshot_interval} saniyelik aralıklar)")
         print("="*70)
@@ -1065,6 +1823,286 @@ class MultiSegmentSimulation:
         print(f"Toplam süre: {self.snapshots[-1]['time'] if self.snapshots else 0:.0f} saniye")
 
 
+def open_run_store(config: dict) -> RunStore:
+    """Config'deki [run_store] ayarlarıyla RunStore açar (kapalıysa None)."""
+    store_cfg = config.get('run_store', {})
+    if not store_cfg.get('enabled', False):
+        return None
+    path = Path(__file__).parent.parent / store_cfg.get('path', 'output/runs.sqlite')
+    return RunStore(path, batch_size=store_cfg.get('batch_size', 50))
+
+
+def run_or_load(config: dict, store: RunStore, duration: float = None) -> dict:
+    """
+    Config'i koşar ve KPI'larını döndürür; aynı config/motor sürümü/seed ile
+    daha önce koşulmuşsa simülasyon yapmadan önbellekten döner.
+
+    Args:
+        config: Simülasyon config'i
+        store: Sonuç deposu
+        duration: Simülasyon süresi (None ise config'deki)
+
+    Returns:
+        KPI sözlüğü
+    """
+    if duration is not None:
+        config = {**config, 'simulation': {**config['simulation'], 'duration': duration}}
+
+    seed = config.get('simulation', {}).get('seed', 0)
+    cached = store.lookup(config, ENGINE_VERSION, seed)
+    if cached is not None:
+        return cached
+
+    domains = config.get('parallel', {}).get('domains', 1)
+    if domains > 1:
+        kpis = run_partitioned(config, domains=domains)
+        store.record(config, kpis, engine_version=ENGINE_VERSION, seed=seed,
+                     duration=config['simulation']['duration'])
+        return kpis
+
+    sim = MultiSegmentSimulation(config, observe=False)
+    sim.setup()
+    sim.run()
+    sim.record_run(store)
+    return sim.collect_kpis()
+
+
+def run_partitioned(config: dict, domains: int = None, duration: float = None,
+                    verify: bool = False) -> dict:
+    """
+    Config'i bölümlenmiş paralel motorla koşar ve KPI'larını döndürür.
+    Bölümleme sonucu değiştirecekse (sınırda geri basınç, desteklenmeyen
+    bölüm) sıralı motora döner; sonuç her durumda sıralı koşuyla aynıdır.
+
+    Args:
+        config: Simülasyon config'i
+        domains: Domain sayısı (None ise CPU sayısı)
+        duration: Simülasyon süresi (None ise config'deki)
+        verify: Sıralı koşuyu da yapıp KPI'ları birebir karşılaştır
+
+    Returns:
+        KPI sözlüğü
+    """
+    if duration is not None:
+        config = {**config, 'simulation': {**config['simulation'], 'duration': duration}}
+
+    engine = ParallelLineEngine(config, domains=domains)
+    kpis = engine.run()
+    if kpis is None:
+        print(f"↩️  Paralel koşu sıralı motora döndü: {engine.fallback_reason}")
+    else:
+        print(f"⚡ Paralel koşu: {len(engine.domain_starts)} domain, "
+              f"lookahead {engine.lookahead:.2f}s, {engine.window_count} pencere")
+        if not verify:
+            return kpis
+
+    sim = MultiSegmentSimulation(config, observe=False)
+    sim.setup()
+    sim.run()
+    sequential = sim.collect_kpis()
+    if kpis is not None:
+        mismatched = sorted(k for k in sequential.keys() | kpis.keys()
+                            if sequential.get(k) != kpis.get(k))
+        if mismatched:
+            print(f"❌ Paralel/sıralı KPI farkı: {', '.join(mismatched[:10])}")
+        else:
+            print(f"✅ Paralel koşu sıralı koşuyla birebir aynı ({len(sequential)} KPI)")
+    return sequential
+
+
+def compare_merge_policies(config: dict, policies: List[str] = None,
+                           duration: float = None) -> dict:
+    """
+    Aynı config'i farklı merge politikalarıyla koşar ve throughput/adalet
+    karşılaştırmasını yazdırır.
+
+    Returns:
+        {politika: arbiter istatistikleri}
+    """
+    if policies is None:
+        policies = ['fifo', 'round_robin', 'weighted', 'longest_queue']
+
+    results = {}
+    for policy in policies:
+        cfg = {**config, 'merge': {**config.get('merge', {}), 'policy': policy}}
+        sim = MultiSegmentSimulation(cfg, observe=False)
+        sim.setup()
+        sim.run(duration)
+        results[policy] = sim.merge_arbiter.get_statistics()
+
+    print("\n" + "=" * 70)
+    print("🔀 MERGE POLİTİKASI KARŞILAŞTIRMASI")
+    print("=" * 70)
+    print(f"   {'Politika':<15}{'Throughput':>12}{'Adalet':>10}{'Aktarım':>10}")
+    for policy, mstats in results.items():
+        print(f"   {policy:<15}{mstats['throughput']:>12.3f}"
+              f"{mstats['fairness_index']:>10.3f}{mstats['total_grants']:>10}")
+    print("=" * 70)
+    return results
+
+
+def compare_trace_policies(config: dict, policies: List[dict] = None,
+                           duration: float = None, repeats: int = 3) -> dict:
+    """
+    Paket geçmişi örnekleme politikalarının koşu süresi ve paket belleği
+    karşılaştırması (benchmark). Koşu çıktısı bastırılır; süre tekrarların
+    en kısasıdır, bellek ayrı bir koşuda bellek raporunun paket alt sistemi
+    tepesidir.
+
+    Args:
+        config: Simülasyon config'i
+        policies: [packet_trace] sözlükleri (None = tam geçmiş)
+        duration: Simülasyon süresi (None ise config'deki)
+        repeats: Süre ölçümü tekrarı
+
+    Returns:
+        {politika adı: {'seconds', 'traced', 'produced', 'packet_peak_bytes'}}
+    """
+    if policies is None:
+        policies = [None, {'every': 10, 'method': 'hash'}, {'every': 100, 'method': 'hash'},
+                    {'every': 0}]
+
+    def measure(cfg: dict) -> tuple:
+        sim = MultiSegmentSimulation(cfg, observe=False)
+        counts = {'traced': 0, 'produced': 0}
+
+        def count_created(event, packet, where):
+            counts['produced'] += 1
+            counts['traced'] += packet.traced
+
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            sim.setup()
+            sim.probes.subscribe(CREATED, count_created)
+            started = time.perf_counter()
+            sim.run(duration)
+            elapsed = time.perf_counter() - started
+        return sim, counts, elapsed
+
+    results = {}
+    for policy in policies:
+        cfg = {**config, 'packet_trace': policy, 'memory': {}}
+        name = str(PacketTracePolicy.from_config(policy)) if policy else "tam geçmiş"
+        # Süre bellek raporu kapalıyken ölçülür; bellek ayrı bir koşuda
+        seconds = min(measure(cfg)[2] for _ in range(repeats))
+        sim, counts, _ = measure({**cfg, 'memory': {
+            'enabled': True, 'interval': config.get('memory', {}).get('interval', 10.0)}})
+        mem = sim.memory_reporter.get_statistics()
+        results[name] = {
+            'seconds': seconds,
+            'traced': counts['traced'],
+            'produced': counts['produced'],
+            'packet_peak_bytes': mem['subsystems']['packets']['peak_bytes'] if mem else 0,
+        }
+
+    print("\n" + "=" * 70)
+    print("🔎 PAKET GEÇMİŞİ ÖRNEKLEME KARŞILAŞTIRMASI")
+    print("=" * 70)
+    print(f"   {'Politika':<34}{'İzlenen':>10}{'Süre (s)':>10}{'Paket KiB':>12}")
+    for name, r in results.items():
+        print(f"   {name:<34}{r['traced']:>5}/{r['produced']:<4}{r['seconds']:>10.3f}"
+              f"{r['packet_peak_bytes'] / 1024:>12.1f}")
+    print("=" * 70)
+    return results
+
+
+def _batch_differences(batch: dict, event: dict, tolerance: float) -> List[tuple]:
+    """
+    Toplu ve olay motoru KPI'larını karşılaştırır. Fark |b - e| >
+    tolerance * max(|e|, 1) ise (oranlar için mutlak, sayılar için göreli)
+    veya KPI bir tarafta yoksa (isim, toplu, olay) döner.
+    """
+    differences = []
+    for name in sorted(batch.keys() | event.keys()):
+        b, e = batch.get(name), event.get(name)
+        if b is None or e is None or abs(b - e) > tolerance * max(abs(e), 1.0):
+            differences.append((name, b, e))
+    return differences
+
+
+def evaluate_batch(configs: List[dict], duration: float = None,
+                   verify: bool = False, tolerance: float = 0.05) -> List[dict]:
+    """
+    Çok sayıda küçük config varyantını toplu vektörel motorla değerlendirir.
+    Toplu motorun desteklemediği varyantlar (ZPA, hız programı, arıza,
+    ayırıcı, fifo dışı merge politikası) tek tek sıralı motorla koşulur.
+
+    Args:
+        configs: Senaryo config'leri
+        duration: Simülasyon süresi (None ise her config'in kendi süresi)
+        verify: Toplu koşulan varyantları olay motoruyla da koşup KPI
+            isimlerini ve değerlerini karşılaştır (parite kontrolü)
+        tolerance: verify için izin verilen fark (bkz. _batch_differences)
+
+    Returns:
+        Config sırasıyla KPI sözlükleri
+    """
+    results: List[dict] = [None] * len(configs)
+    batchable = [i for i, c in enumerate(configs) if not unsupported_reason(c)]
+
+    # Toplu motor tek süre kullanır: aynı süreli varyantlar birlikte koşulur
+    by_duration = {}
+    for i in batchable:
+        d = duration if duration is not None else configs[i]['simulation']['duration']
+        by_duration.setdefault(d, []).append(i)
+    for d, indices in by_duration.items():
+        engine = BatchedLineEngine([configs[i] for i in indices], duration=d)
+        for i, kpis in zip(indices, engine.run()):
+            results[i] = kpis
+
+    sequential = [i for i in range(len(configs)) if results[i] is None]
+    for i in sequential:
+        sim = MultiSegmentSimulation(configs[i], observe=False)
+        sim.setup()
+        sim.run(duration)
+        results[i] = sim.collect_kpis()
+
+    print(f"\n🧮 Toplu değerlendirme: {len(batchable)} varyant vektörel, "
+          f"{len(sequential)} varyant sıralı motorla")
+
+    if verify:
+        for i in batchable:
+            sim = MultiSegmentSimulation(configs[i], observe=False)
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                sim.setup()
+                sim.run(duration)
+            differences = _batch_differences(results[i], sim.collect_kpis(), tolerance)
+            if not differences:
+                print(f"✅ Varyant {i}: toplu motor olay motoruyla uyumlu "
+                      f"({len(results[i])} KPI, tolerans {tolerance:.0%})")
+                continue
+            snapshot = sum(1 for name, _, _ in differences if name.endswith(SNAPSHOT_KPIS))
+            print(f"⚠️  Varyant {i}: {len(differences)}/{len(results[i])} KPI tolerans dışında"
+                  f"{f' ({snapshot} tanesi koşu sonu anlık durum, bilinen sapma)' if snapshot else ''}")
+            for name, b, e in differences[:10]:
+                print(f"      {name}: toplu {b if b is None else f'{b:.4g}'}, "
+                      f"olay {e if e is None else f'{e:.4g}'}")
+    return results
+
+
+def render_replay(trace_path, frame_interval: float = None, config: dict = None) -> MultiSegmentSimulation:
+    """
+    Kaydedilmiş bir koşunun görselleştirmelerini olay izinden, simülasyonu
+    yeniden koşmadan ve istenen kare aralığıyla üretir.
+
+    Args:
+        trace_path: [trace] ile yazılmış iz dosyası
+        frame_interval: Kare aralığı (saniye); None ise snapshot_interval
+        config: Koşunun config'i (yerleşim için); None ise varsayılan config
+    """
+    sim = MultiSegmentSimulation(config)
+    sim.load_replay(trace_path, frame_interval)
+
+    print("\n📊 Görselleştirmeler izden oluşturuluyor...")
+    sim.visualize_executive_dashboard()
+    sim.visualize_system_layout()
+    sim.visualize_speed_impact()
+    sim.visualize_snapshot_frames()
+    sim.visualize_space_time()
+    sim.visualize_occupancy_heatmaps()
+    sim.shutdown()
+    return sim
+
+
 def main():
     """Ana fonksiyon"""
     config = load_config()
@@ -1101,15 +2139,24 @@ def main():
     sim.print_statistics()
     sim.print_snapshot_summary()
 
+    store = open_run_store(config)
+    if store is not None:
+        digest = sim.record_run(store)
+        store.close()
+        print(f"\n🗄️  Koşu kaydedildi: {store.path} (config {digest[:12]})")
+
     # Görselleştirmeler
     print("\n📊 Görselleştirmeler oluşturuluyor...")
     sim.visualize_executive_dashboard()
     sim.visualize_system_layout()
     sim.visualize_speed_impact()
     sim.visualize_snapshot_frames()
+    sim.visualize_space_time()
+    sim.visualize_occupancy_heatmaps()
 
     print("\n▶️  Canlı simülasyon başlatılıyor...")
     sim.visualize_live(interval_ms=400)
+    sim.shutdown()
 
     print("\n✅ Simülasyon tamamlandı!")
     print(f"📁 Çıktılar: {sim.output_dir}")
@@ -1118,6 +2165,8 @@ def main():
     print("  - multisegment_layout.png")
     print("  - multisegment_analysis.png")
     print("  - snapshot_frames.png")
+    print("  - space_time.png")
+    print("  - segment_occupancy.png")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+"""
+Konveyör Ağı Simülasyonu
+Merge/divert noktalarıyla birbirine bağlı birden fazla konveyör hattı
+"""
+
+import simpy
+from typing import List
+import sys
+from pathlib import Path
+import tomllib
+
+# Core sınıfları import et
+sys.path.append(str(Path(__file__).parent))
+from core.conveyor_line import ConveyorLine
+from core.feeder import FeederLine
+from core.packet import resolve_packet_mix
+from core.network import ConveyorNetwork
+
+
+def load_config(config_path: Path = None) -> dict:
+    """TOML ağ config dosyasını yükler."""
+    if config_path is None:
+        config_path = Path(__file__).parent.parent / "config" / "network.toml"
+
+    with open(config_path, "rb") as f:
+        return tomllib.load(f)
+
+
+class NetworkSimulation:
+    """Çok hatlı konveyör ağı simülasyonu"""
+
+    def __init__(self, config: dict = None):
+        self.config = config if config is not None else load_config()
+        self.env = simpy.Environment()
+        self.network: ConveyorNetwork = None
+        self.feeders: List[FeederLine] = []
+
+    def setup(self):
+        """Ağı config'den kur ve yönlendirme tablolarını hesapla"""
+        print("🏗️  Konveyör ağı kuruluyor...")
+
+        pkt_cfg = self.config.get('packet', {})
+        min_gap = pkt_cfg.get('min_gap', 0.5)
+        default_packet_length = pkt_cfg.get('default_length', 0.3)
+
+        net_cfg = self.config.get('network', {})
+        self.network = ConveyorNetwork(self.env, net_cfg.get('id', 'NETWORK'))
+
+        for line_cfg in net_cfg.get('lines', []):
+            line = ConveyorLine(
+                env=self.env,
+                id=line_cfg['id'],
+                min_gap=min_gap,
+                default_packet_length=default_packet_length
+            )
+            for seg_cfg in line_cfg.get('segments', []):
+                line.add_segment(
+                    id=seg_cfg['id'],
+                    length=seg_cfg['length'],
+                    speed=seg_cfg['speed'],
+                    description=seg_cfg.get('description', ''),
+                    direction=seg_cfg.get('direction', 'horizontal'),
+                    segment_type=seg_cfg.get('type', 'continuous'),
+                    zone_length=seg_cfg.get('zone_length')
+                )
+            self.network.add_line(line)
+
+        for link_cfg in net_cfg.get('links', []):
+            target = self.network.lines[link_cfg['to']]
+            entry_position = target.get_global_entry_position(
+                link_cfg.get('entry_segment', 0), link_cfg.get('entry_offset', 0.0)
+            )
+            self.network.connect(link_cfg['from'], link_cfg['to'], entry_position)
+
+        for dest_cfg in net_cfg.get('destinations', []):
+            self.network.add_destination(dest_cfg['id'], dest_cfg['line'])
+
+        self.network.build_routing_tables()
+
+        for feeder_cfg in net_cfg.get('feeders', []):
+            line = self.network.lines[feeder_cfg['line']]
+            entry_position = line.get_global_entry_position(
+                feeder_cfg.get('connection_segment', 0), feeder_cfg.get('connection_offset', 0.0)
+            )
+            feeder = FeederLine(
+                env=self.env,
+                id=feeder_cfg['id'],
+                target_conveyor=line,
+                production_rate=feeder_cfg['production_rate'],
+                entry_position=entry_position,
+                max_queue_size=feeder_cfg.get('max_queue_size', 100),
+                destinations=feeder_cfg.get('destinations'),
+                packet_mix=resolve_packet_mix(pkt_cfg.get('types', {}), feeder_cfg.get('packet_mix')),
+                seed=self.config.get('simulation', {}).get('seed', 0)
+            )
+            self.feeders.append(feeder)
+
+        stats = self.network.get_statistics()
+        print(f"\n✅ {stats['line_count']} hat, {stats['link_count']} bağlantı, "
+              f"{len(self.network.destinations)} hedef, {len(self.feeders)} feeder")
+
+    def run(self, duration: float = None):
+        """Simülasyonu çalıştır"""
+        if duration is None:
+            duration = self.config['simulation']['duration']
+
+        print(f"\n🚀 Ağ simülasyonu başlıyor... (Süre: {duration} saniye)")
+        print("=" * 70)
+
+        for feeder in self.feeders:
+            self.env.process(feeder.start_production())
+            self.env.process(feeder.transfer_process())
+
+        self.env.run(until=duration)
+
+        print("=" * 70)
+        print(f"\n✅ Simülasyon tamamlandı!")
+
+    def print_statistics(self):
+        """Ağ istatistiklerini yazdır"""
+        stats = self.network.get_statistics()
+
+        print("\n" + "=" * 70)
+        print(f"📊 AĞ İSTATİSTİKLERİ: {stats['id']}")
+        print("=" * 70)
+        print(f"   Teslim edilen: {stats['total_delivered']} paket")
+        print(f"   Yönlendirilemeyen: {stats['total_unrouted']} paket")
+        print(f"   Ağda: {stats['packets_in_transit']} paket")
+        print(f"   Ort. ağ geçiş süresi: {stats['avg_transit_time']:.1f}s")
+
+        print(f"\n🎯 HEDEFLER:")
+        for dest, count in stats['delivered'].items():
+            print(f"   {dest} ({self.network.destinations[dest]}): {count} paket")
+
+        print(f"\n🔀 BAĞLANTILAR:")
+        for link in stats['links']:
+            print(f"   {link['id']} @ {link['entry_position']}m: "
+                  f"{link['transferred']} aktarım, {link['blocked_attempts']} bloke deneme")
+
+        print(f"\n📦 FEEDER LINES:")
+        for feeder in self.feeders:
+            fstats = feeder.get_statistics()
+            print(f"   {fstats['id']}: {fstats['total_transferred']}/{fstats['total_produced']} aktarıldı, "
+                  f"bloke {fstats['total_blocked_time']:.1f}s")
+
+        print("\n" + "=" * 70)
+
+
+def main():
+    """Ana fonksiyon"""
+    sim = NetworkSimulation(load_config())
+    sim.setup()
+    sim.run()
+    sim.print_statistics()
+
+
+if __name__ == "__main__":
+    main()